@@ -0,0 +1,285 @@
+import json
+import time
+
+from constants import MAX_BLOWS, NUMERIC_FIELDS
+from instrumentation import profiler
+from monster_record import Monster, split_flags
+
+
+class PatchError(ValueError):
+    """ Raised when a single patch operation cannot be applied. """
+
+
+class BatchReport:
+    """ Outcome of a batch run: applied operation count, per-operation errors and throughput. """
+
+    def __init__(self):
+        self.applied = 0
+        self.errors = []  # (line number, operation, message)
+        self.elapsed = 0.0
+
+    @property
+    def total(self):
+        return self.applied + len(self.errors)
+
+    def summary(self):
+        rate = self.total / self.elapsed if self.elapsed else float("inf")
+        return (f"Applied {self.applied}/{self.total} operations "
+                f"({len(self.errors)} failed) in {self.elapsed:.3f}s — {rate:,.0f} ops/s")
+
+
+class BatchEditor:
+    """ Applies a patch file of monster edits without prompting.
+
+    The patch is JSON Lines, one operation per line (blank lines and `#` comments are skipped):
+
+        {"op": "set", "monster": "Fang, Farmer Maggot's Dog", "field": "speed", "value": 130}
+        {"op": "add_flag", "monster": "...", "flag": "EVIL"}
+        {"op": "remove_flag", "monster": "...", "flag": "RAND_25"}
+        {"op": "add_blow", "monster": "...", "method": "BITE", "effect": "POISON", "power": "1d6"}
+        {"op": "edit_blow", "monster": "...", "index": 1, "effect": "HURT"}
+        {"op": "remove_blow", "monster": "...", "index": 2}
+        {"op": "rename", "monster": "...", "new_name": "Fang"}
+
+    Blow indexes are 1-based, as in the interactive editor. Validation uses the same rules as
+    `MonsterEditor`, and the file is parsed and saved once per batch.
+    """
+
+    def __init__(self, monster_parser, editor):
+        self.monster_parser = monster_parser
+        self.editor = editor
+        self._handlers = {
+            "set": self._set_field,
+            "add_flag": self._add_flag,
+            "remove_flag": self._remove_flag,
+            "add_blow": self._add_blow,
+            "edit_blow": self._edit_blow,
+            "remove_blow": self._remove_blow,
+            "rename": self._rename,
+        }
+
+    @staticmethod
+    def read_patch(path):
+        """ Yields (line number, operation) pairs from a JSON Lines patch file. """
+        with open(path, "r", encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, PatchError(f"Malformed JSON: {e}")
+
+    def apply(self, operations):
+        """ Applies (line number, operation) pairs and returns a BatchReport. """
+        report = BatchReport()
+        start = time.perf_counter()
+        for line_number, operation in operations:
+            try:
+                if isinstance(operation, PatchError):
+                    raise operation
+                self.apply_operation(operation)
+                report.applied += 1
+            except PatchError as e:
+                report.errors.append((line_number, operation, str(e)))
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def run(self, patch_path, dry_run=False):
+        """ Applies a patch file and saves once at the end (unless `dry_run` or nothing applied). """
+        with profiler.span("batch apply"):
+            report = self.apply(self.read_patch(patch_path))
+        for line_number, _, message in report.errors:
+            print(f"❌ Line {line_number}: {message}")
+        if report.applied and not dry_run:
+            self.monster_parser.save_monsters()
+        print(report.summary())
+        return report
+
+    def apply_operation(self, operation):
+        """ Applies a single operation dict, raising PatchError if it is invalid. """
+        if not isinstance(operation, dict):
+            raise PatchError("Operation must be a JSON object.")
+        op = operation.get("op")
+        handler = self._handlers.get(op) if isinstance(op, str) else None
+        if handler is None:
+            raise PatchError(f"Unknown operation '{operation.get('op')}'.")
+        name = self._require(operation, "monster")
+        if name not in self.monster_parser.monsters:
+            suggestions = self.editor.suggest_monsters(name, k=3)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            raise PatchError(f"Monster '{name}' not found.{hint}")
+        handler(name, self.monster_parser.monsters[name], operation)
+
+    @staticmethod
+    def _require(operation, field):
+        if field not in operation:
+            raise PatchError(f"Missing '{field}'.")
+        return str(operation[field]).strip()
+
+    def _set_field(self, name, monster, operation):
+        key = self._require(operation, "field")
+        value = operation.get("value")
+        if value is None:
+            raise PatchError("Missing 'value'.")
+
+        if key == "name":
+            self._rename(name, monster, {"new_name": value})
+            return
+        if key not in monster and key not in self.monster_parser.original_attributes.get(name, []):
+            raise PatchError(f"Invalid attribute '{key}'.")
+
+        if key in NUMERIC_FIELDS:
+            value = str(value).strip()
+            if not value.isdigit():
+                raise PatchError(f"'{value}' is not a valid number for {key}.")
+            value = int(value)
+        elif key == "flags":
+            flags = value if isinstance(value, list) else str(value).split(",")
+            flags = [str(flag).strip() for flag in flags if str(flag).strip()]
+            for flag in flags:
+                self._check_flag(flag)
+            value = flags
+        elif key == "blow":
+            raise PatchError("Use add_blow, edit_blow or remove_blow to change blows.")
+        else:
+            value = str(value)
+        self.monster_parser.set_field(name, key, value)  # ✅ Journaled and logged like an interactive edit
+
+    def _check_flag(self, flag):
+        """ Same rule as MonsterEditor.validate_flags, but reports instead of prompting. """
+        if flag not in self.monster_parser.valid_flags:
+            suggestion = self.editor.suggest_correction(flag, self.monster_parser.valid_flags)
+            hint = f" Did you mean '{suggestion}'?" if suggestion else ""
+            raise PatchError(f"'{flag}' is not a recognized flag.{hint}")
+
+    def put_monster(self, name, attributes):
+        """ Adds a monster, or makes an existing one match `attributes` exactly, after the editor's checks.
+
+        Returns "added", "changed" or "unchanged"; raises PatchError without touching anything
+        if a numeric field, flag or blow is invalid.
+        """
+        name = str(name).strip()
+        if not name:
+            raise PatchError("Monster name cannot be empty.")
+        for key, value in attributes.items():
+            values = value if isinstance(value, list) else [value]
+            if key in NUMERIC_FIELDS:
+                for item in values:
+                    if not str(item).strip().isdigit():
+                        raise PatchError(f"'{item}' is not a valid number for {key}.")
+            elif key == "flags":
+                for line in values:
+                    for flag in split_flags(str(line)):
+                        self._check_flag(flag)
+            elif key == "blow":
+                if len(values) > MAX_BLOWS:
+                    raise PatchError(f"'{name}' has more than {MAX_BLOWS} blows.")
+                for blow in values:
+                    parts = str(blow).split(":")
+                    self._check_blow(parts[0], parts[1] if len(parts) > 1 else "")
+
+        if name not in self.monster_parser.monsters:
+            self.monster_parser.add_monster(name, attributes)
+            return "added"
+        incoming = Monster(attributes)  # ✅ Compare in stored form, so "130" from a CSV equals 130
+        current = self.monster_parser.monsters[name]
+        changed = False
+        for key in [key for key in current if key != "original_name" and key not in incoming]:
+            changed |= self.monster_parser.set_field(name, key, None)
+        for key in incoming:
+            changed |= self.monster_parser.set_field(name, key, incoming[key])
+        return "changed" if changed else "unchanged"
+
+    @staticmethod
+    def _flag_lines(monster):
+        flags = monster.get("flags", [])
+        return [flags] if isinstance(flags, str) else list(flags)
+
+    def _add_flag(self, name, monster, operation):
+        flag = self._require(operation, "flag")
+        self._check_flag(flag)
+        lines = self._flag_lines(monster)
+        if any(flag in (token.strip() for token in line.split("|")) for line in lines):
+            raise PatchError(f"'{name}' already has flag '{flag}'.")
+        self.monster_parser.set_field(name, "flags", lines + [flag])
+
+    def _remove_flag(self, name, monster, operation):
+        flag = self._require(operation, "flag")
+        updated, removed = [], False
+        for line in self._flag_lines(monster):
+            tokens = [token.strip() for token in line.split("|")]
+            if flag in tokens:
+                tokens.remove(flag)
+                removed = True
+                if not tokens:
+                    continue
+                line = " | ".join(tokens)
+            updated.append(line)
+        if not removed:
+            raise PatchError(f"'{name}' does not have flag '{flag}'.")
+        self.monster_parser.set_field(name, "flags", updated or None)
+
+    @staticmethod
+    def _blows(monster):
+        blows = monster.get("blow", [])
+        return [blows] if isinstance(blows, str) else list(blows)
+
+    def _blow_index(self, blows, operation):
+        index = str(operation.get("index", "")).strip()
+        if not index.isdigit() or int(index) < 1 or int(index) > len(blows):
+            raise PatchError(f"Invalid blow index '{index}' (monster has {len(blows)} blows).")
+        return int(index) - 1
+
+    def _check_blow(self, method, effect):
+        if not self.editor.is_valid_blow_method(method):
+            raise PatchError(f"Invalid blow method '{method}'.")
+        if effect and not self.editor.is_valid_blow_effect(effect):
+            suggestion = self.editor.suggest_correction(effect, self.editor.game_data_loader.blow_effects)
+            hint = f" Did you mean '{suggestion}'?" if suggestion else ""
+            raise PatchError(f"Invalid blow effect '{effect}'.{hint}")
+
+    @staticmethod
+    def _format_blow(method, effect, power):
+        blow = method
+        if effect:
+            blow += f":{effect}"
+        if power:
+            blow += f":{power}"
+        return blow
+
+    def _add_blow(self, name, monster, operation):
+        blows = self._blows(monster)
+        if len(blows) >= MAX_BLOWS:
+            raise PatchError(f"'{name}' already has {MAX_BLOWS} blows.")
+        method = self._require(operation, "method")
+        effect = str(operation.get("effect", "")).strip()
+        power = str(operation.get("power", "")).strip()
+        self._check_blow(method, effect)
+        self.monster_parser.set_field(name, "blow", blows + [self._format_blow(method, effect, power)])
+
+    def _edit_blow(self, name, monster, operation):
+        blows = self._blows(monster)
+        index = self._blow_index(blows, operation)
+        parts = blows[index].split(":")
+        method = str(operation.get("method", parts[0])).strip()
+        effect = str(operation.get("effect", parts[1] if len(parts) > 1 else "")).strip()
+        power = str(operation.get("power", parts[2] if len(parts) > 2 else "")).strip()
+        self._check_blow(method, effect)
+        blows[index] = self._format_blow(method, effect, power)
+        self.monster_parser.set_field(name, "blow", blows)
+
+    def _remove_blow(self, name, monster, operation):
+        blows = self._blows(monster)
+        blows.pop(self._blow_index(blows, operation))
+        self.monster_parser.set_field(name, "blow", blows or None)
+
+    def _rename(self, name, monster, operation):
+        new_name = self._require(operation, "new_name")
+        if not new_name:
+            raise PatchError("New name cannot be empty.")
+        if new_name in self.monster_parser.monsters:
+            raise PatchError(f"A monster named '{new_name}' already exists.")
+        # ✅ rename_monster also fixes up `friends` references
+        self.monster_parser.rename_monster(name, new_name)
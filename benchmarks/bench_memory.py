@@ -0,0 +1,67 @@
+""" Per-monster memory footprint of plain attribute dicts versus compact Monster records.
+
+Usage: python3 benchmarks/bench_memory.py path/to/monster.txt
+       python3 benchmarks/bench_memory.py COUNT     (measures a synthetic file from generate.py)
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monster_parser import MonsterParser  # noqa: E402
+from monster_record import Monster  # noqa: E402
+
+
+def _record_lines(filepath):
+    """ Splits monster.txt into the line lists of each `name:` block. """
+    blocks, current = [], None
+    with open(filepath, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip().startswith("name:"):
+                current = [line]
+                blocks.append(current)
+            elif current is not None:
+                current.append(line)
+    return blocks
+
+
+def measure(build, blocks):
+    """ Returns (bytes retained per record, seconds) for building every record with `build`. """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = [build(lines) for lines in blocks]
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return retained / max(len(blocks), 1), elapsed
+
+
+def main(filepath):
+    parser = MonsterParser.__new__(MonsterParser)  # ✅ Only the record parsers are needed, not a loaded index
+    blocks = _record_lines(filepath)
+
+    dict_size, dict_time = measure(lambda lines: parser.parse_attributes(lines)[1], blocks)
+    record_size, record_time = measure(lambda lines: Monster(parser.parse_attributes(lines)[1]), blocks)
+
+    print(f"{len(blocks)} monsters from {filepath}")
+    print(f"dict records:    {dict_size:8.0f} bytes/monster  ({dict_time:.2f}s)")
+    print(f"Monster records: {record_size:8.0f} bytes/monster  ({record_time:.2f}s)")
+    print(f"saving:          {100 * (1 - record_size / dict_size):7.1f}%")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        raise SystemExit(2)
+    if sys.argv[1].isdigit():
+        from generate import generate
+        with tempfile.TemporaryDirectory() as directory:
+            main(generate(directory, int(sys.argv[1]))[0])
+    else:
+        main(sys.argv[1])
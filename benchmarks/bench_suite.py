@@ -0,0 +1,241 @@
+""" Times and measures memory of MFE's main operations on synthetic files of growing size.
+
+Usage:
+    python3 benchmarks/bench_suite.py [--sizes 1000,10000,100000,1000000] [--output results.json] [--no-memory]
+    python3 benchmarks/bench_suite.py --compare base.json new.json [--threshold 0.10]
+
+Each size gets a generated monster.txt and game data directory (see generate.py) in a temporary
+directory. Every benchmark is timed on its own, then (unless --no-memory) run again under
+tracemalloc for its peak allocation. Results are written as JSON so runs from different commits
+can be compared with --compare, which exits 1 if any benchmark got slower than the threshold.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate import generate  # noqa: E402
+from instrumentation import configure_logging  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+LOOKUPS = 200  # suggest_correction calls per lookup benchmark
+
+
+def _quiet():
+    """ Swallows the progress prints of the code under test. """
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _run(benchmark, memory):
+    """ Runs benchmark() -> (setup, action, teardown) and returns (seconds, peak bytes or None). """
+    setup, action, teardown = benchmark()
+    state = setup()
+    gc.collect()
+    start = time.perf_counter()
+    action(state)
+    seconds = time.perf_counter() - start
+    teardown(state)
+    if not memory:
+        return seconds, None
+
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    action(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    teardown(state)
+    return seconds, peak
+
+
+def _nothing(state):
+    pass
+
+
+def benchmarks(monster_path, game_data_path, names, workdir):
+    """ (name, factory, operations) triples; each factory returns (setup, action, teardown). """
+    from editor import MonsterEditor
+    from game_data_index import DEFINITION_FILES
+    from game_data_loader import GameDataLoader
+    from monster_parser import MonsterParser
+
+    def working_copy():
+        path = os.path.join(workdir, "work.txt")
+        shutil.copyfile(monster_path, path)
+        return path
+
+    def load(lazy, workers=None):
+        def action(path):
+            with _quiet():
+                MonsterParser(path, lazy=lazy, snapshot=workers is None, workers=workers)
+        return lambda: (working_copy, action, _nothing)
+
+    def save(edit_count):
+        def setup():
+            with _quiet():
+                parser = MonsterParser(working_copy(), lazy=True)
+            step = max(1, len(names) // edit_count)
+            for name in names[::step][:edit_count]:
+                parser.monsters[name]["speed"] = 111
+                parser.mark_dirty(name)
+            return parser
+
+        def action(parser):
+            with _quiet():
+                parser.save_monsters()
+        return lambda: (setup, action, _nothing)
+
+    def rename():
+        def setup():
+            with _quiet():
+                parser = MonsterParser(working_copy())
+            # ✅ The most referenced monster, so the friends fix-up does real work
+            target = max(names, key=lambda name: len(parser.friends_index.referrer_names(name)))
+            return parser, target
+
+        def action(state):
+            parser, target = state
+            with _quiet():
+                parser.rename_monster(target, target + " Renamed")
+        return lambda: (setup, action, _nothing)
+
+    def read_game_data(loader):
+        """ Reads every file the loader knows; tables are otherwise only built on first use. """
+        loader.valid_flags
+        for kind in DEFINITION_FILES:
+            loader.index.table(kind)
+
+    def game_data(use_cache):
+        def setup():
+            if use_cache:
+                with _quiet():
+                    read_game_data(GameDataLoader(game_data_path))  # ✅ Make sure the cache is warm
+            return None
+
+        def action(state):
+            with _quiet():
+                read_game_data(GameDataLoader(game_data_path, use_cache=use_cache))
+        return lambda: (setup, action, _nothing)
+
+    def suggest(kind):
+        def setup():
+            with _quiet():
+                parser = MonsterParser(working_copy(), lazy=True)
+                loader = GameDataLoader(game_data_path)
+            editor = MonsterEditor(parser, loader)
+            options = loader.valid_flags if kind == "flags" else list(parser.monsters)
+            queries = [option[:2] + option[3:] + "X" for option in options[::max(1, len(options) // LOOKUPS)]]
+            editor.suggest_correction(queries[0], options)  # ✅ Index build is not part of the lookup cost
+            return editor, options, queries[:LOOKUPS]
+
+        def action(state):
+            editor, options, queries = state
+            for query in queries:
+                editor.suggest_correction(query, options)
+        return lambda: (setup, action, _nothing)
+
+    return [
+        ("load_monsters (eager)", load(False), len(names)),
+        ("load_monsters (lazy)", load(True), len(names)),
+        ("load_monsters (serial parse)", load(False, 1), len(names)),
+        ("load_monsters (parse, one worker per CPU)", load(False, os.cpu_count() or 1), len(names)),
+        ("save_monsters (1 edit)", save(1), 1),
+        ("save_monsters (1% edited)", save(max(1, len(names) // 100)), max(1, len(names) // 100)),
+        ("rename_monster (with friends fix-up)", rename(), 1),
+        ("GameDataLoader (no cache)", game_data(False), 1),
+        ("GameDataLoader (cached)", game_data(True), 1),
+        ("suggest_correction (flags)", suggest("flags"), LOOKUPS),
+        ("suggest_correction (monster names)", suggest("names"), LOOKUPS),
+    ]
+
+
+def run_suite(sizes, memory=True, seed=0):
+    """ Runs every benchmark at every size and returns the result rows. """
+    results = []
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"mfe-bench-{size}-")
+        try:
+            start = time.perf_counter()
+            monster_path, game_data_path, names = generate(workdir, size, seed)
+            print(f"\n=== {size:,} monsters ({os.path.getsize(monster_path):,} bytes, "
+                  f"generated in {time.perf_counter() - start:.1f}s) ===")
+            for name, benchmark, operations in benchmarks(monster_path, game_data_path, names, workdir):
+                seconds, peak = _run(benchmark, memory)
+                results.append({"size": size, "benchmark": name, "seconds": seconds, "operations": operations,
+                                "per_operation": seconds / operations, "peak_bytes": peak})
+                peak_text = f"{peak / 2 ** 20:9.1f} MiB peak" if peak is not None else ""
+                print(f"{name:40} {seconds:9.4f}s {peak_text}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base_path, new_path, threshold):
+    """ Prints the relative change of every benchmark; returns 1 if any slowed down more than `threshold`. """
+    with open(base_path, encoding="utf-8") as file:
+        base = {(row["size"], row["benchmark"]): row for row in json.load(file)["results"]}
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)["results"]
+
+    regressions = 0
+    for row in new:
+        old = base.get((row["size"], row["benchmark"]))
+        if old is None or not old["seconds"]:
+            continue
+        change = row["seconds"] / old["seconds"] - 1
+        marker = "❌" if change > threshold else "✅"
+        regressions += change > threshold
+        print(f"{marker} {row['size']:>9,} {row['benchmark']:40} {old['seconds']:9.4f}s → {row['seconds']:9.4f}s "
+              f"({change:+.1%})")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                            help="comma-separated monster counts (default: %(default)s; add 1000000 for the full run)")
+    arg_parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    arg_parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression")
+    args = arg_parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    configure_logging(-1, change_log=None)  # ✅ Benchmark edits are not real changes; keep them out of the change log
+    output = os.path.abspath(args.output)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = run_suite(sizes, memory=not args.no_memory, seed=args.seed)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump({"commit": _commit(), "python": platform.python_version(), "platform": platform.platform(),
+                   "seed": args.seed, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results},
+                  file, indent=2)
+    print(f"\n✅ Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+""" Generates a realistic synthetic monster.txt and game data directory for benchmarks.
+
+Usage: python3 benchmarks/generate.py OUTPUT_DIR COUNT [--seed N]
+
+Writes OUTPUT_DIR/monster.txt with COUNT monsters (flags, up to four blows, friends links
+to other monsters, multi-line descriptions) and OUTPUT_DIR/gamedata/ with the monster_base,
+blow_methods, blow_effects, monster_property, object_property, object and object_base files GameDataLoader reads. The same
+seed always produces the same files.
+"""
+import os
+import random
+import sys
+
+BLOW_METHODS = ["HIT", "BITE", "CLAW", "STING", "TOUCH", "KICK", "BUTT", "CRUSH", "ENGULF", "GAZE",
+                "WAIL", "SPIT", "CRAWL", "DROOL", "BEG", "INSULT", "MOAN", "SPORE"]
+BLOW_EFFECTS = ["HURT", "POISON", "DISENCHANT", "EAT_GOLD", "EAT_ITEM", "EAT_FOOD", "EAT_LIGHT", "ACID",
+                "ELEC", "FIRE", "COLD", "BLIND", "CONFUSE", "TERRIFY", "PARALYZE", "LOSE_STR", "LOSE_INT",
+                "LOSE_WIS", "LOSE_DEX", "LOSE_CON", "LOSE_ALL", "SHATTER", "EXP_10", "EXP_20", "EXP_40",
+                "EXP_80", "HALLU", "DRAIN_CHARGES"]
+MONSTER_FLAGS = ["UNIQUE", "MALE", "FEMALE", "EVIL", "ANIMAL", "UNDEAD", "DEMON", "DRAGON", "ORC", "TROLL",
+                 "GIANT", "NEVER_BLOW", "NEVER_MOVE", "RAND_25", "RAND_50", "SMART", "INVISIBLE", "COLD_BLOOD",
+                 "EMPTY_MIND", "WEIRD_MIND", "MULTIPLY", "REGENERATE", "POWERFUL", "ONLY_GOLD", "ONLY_ITEM",
+                 "DROP_20", "DROP_40", "DROP_60", "DROP_1", "DROP_2", "DROP_GOOD", "DROP_GREAT", "OPEN_DOOR",
+                 "BASH_DOOR", "PASS_WALL", "KILL_WALL", "MOVE_BODY", "KILL_BODY", "TAKE_ITEM", "KILL_ITEM",
+                 "HURT_LIGHT", "HURT_ROCK", "HURT_FIRE", "HURT_COLD", "IM_ACID", "IM_ELEC", "IM_FIRE",
+                 "IM_COLD", "IM_POIS", "IM_NETHER", "IM_WATER", "IM_PLASMA", "NO_FEAR", "NO_STUN", "NO_CONF",
+                 "NO_SLEEP", "NO_HOLD", "GROUP_AI", "SPIRIT", "FORCE_SLEEP"]
+OBJECT_FLAGS = ["PROT_FEAR", "PROT_BLIND", "PROT_CONF", "PROT_STUN", "SLOW_DIGEST", "FEATHER", "REGEN",
+                "TELEPATHY", "SEE_INVIS", "FREE_ACT", "HOLD_LIFE", "IMPACT", "BLESSED", "BURNS_OUT",
+                "TAKES_FUEL", "NO_FUEL", "THROWING", "EXPLODE", "DIG_1", "DIG_2", "DIG_3"]
+BASES = ["canine", "feline", "person", "humanoid", "orc", "troll", "giant", "dragon", "ancient dragon",
+         "hydra", "spider", "insect", "centipede", "rodent", "snake", "reptile", "zephyr hound", "vortex",
+         "jelly", "mold", "mushroom", "ghost", "wraith", "lich", "vampire", "demon", "major demon", "golem",
+         "eye", "bird", "bat", "yeek", "kobold", "quylthulg", "mimic"]
+COLORS = "DwsorgbuUdWvyRGBpPmM"
+SYLLABLES = ["ang", "bor", "dur", "eth", "gor", "hel", "ith", "kar", "lug", "mor", "nar", "oth", "ril", "sar",
+             "thu", "ul", "vor", "wen", "yth", "zag", "gal", "dor", "fin", "mir", "ost", "bal", "rog", "cul"]
+TITLES = ["the Cruel", "of the North", "the Black", "Hound", "Warrior", "Priest", "Mage", "Archer", "Lord",
+          "Worm Mass", "Mold", "Spider", "Wolf", "Drake", "Wyrm", "Wight", "Shade", "Captain", "Chieftain"]
+WORDS = ["a", "the", "dark", "twisted", "creature", "that", "lurks", "in", "shadows", "of", "dungeon", "with",
+         "glowing", "eyes", "and", "sharp", "teeth", "it", "hungers", "for", "flesh", "its", "skin", "is",
+         "covered", "scales", "hide", "stench", "fills", "air", "ancient", "evil", "watches", "your", "every",
+         "move", "cold", "fire", "ichor", "drips", "from", "claws", "howl", "echoes", "through", "halls"]
+
+
+def monster_name(rng, index):
+    """ A readable, unique monster name. """
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))).capitalize()
+    return f"{word} {rng.choice(TITLES)} {index}"
+
+
+def power(rng):
+    return f"{rng.randint(1, 12)}d{rng.choice((2, 3, 4, 5, 6, 8, 10, 12))}"
+
+
+def monster_record(rng, name, earlier_names):
+    """ The lines of one monster, in the field order Angband's monster.txt uses. """
+    depth = rng.randint(0, 100)
+    lines = [f"name:{name}",
+             f"base:{rng.choice(BASES)}",
+             f"color:{rng.choice(COLORS)}",
+             f"speed:{rng.randint(100, 140)}",
+             f"hit-points:{rng.randint(1, 40) * max(depth, 1)}"]
+    if rng.random() < 0.6:
+        lines.append(f"light:{rng.randint(-2, 3)}")
+    lines += [f"hearing:{rng.randint(5, 40)}",
+              f"smell:{rng.randint(0, 30)}",
+              f"armor-class:{rng.randint(1, 180)}",
+              f"sleepiness:{rng.randint(0, 250)}",
+              f"depth:{depth}",
+              f"rarity:{rng.randint(1, 6)}",
+              f"experience:{rng.randint(0, 50) * max(depth, 1)}"]
+    for _ in range(rng.randint(0, 4)):
+        blow = rng.choice(BLOW_METHODS)
+        if rng.random() < 0.85:
+            blow += f":{rng.choice(BLOW_EFFECTS)}:{power(rng)}"
+        lines.append(f"blow:{blow}")
+    flags = rng.sample(MONSTER_FLAGS, rng.randint(1, 8))
+    while flags:
+        take = rng.randint(1, 4)
+        lines.append("flags:" + " | ".join(flags[:take]))
+        flags = flags[take:]
+    if rng.random() < 0.3:
+        lines.append(f"spell-power:{rng.randint(1, depth + 1)}")
+        lines.append(f"innate-freq:{rng.randint(2, 20)}")
+    if earlier_names and rng.random() < 0.25:
+        for friend in rng.sample(earlier_names, min(len(earlier_names), rng.randint(1, 2))):
+            lines.append(f"friends:{rng.choice((20, 40, 60, 80, 100))}:{rng.randint(1, 3)}d{rng.randint(2, 6)}:{friend}")
+    for _ in range(rng.randint(1, 3)):
+        words = rng.choices(WORDS, k=rng.randint(8, 20))
+        lines.append("desc:" + " ".join(words).capitalize() + ".")
+    return lines
+
+
+def write_monsters(path, count, seed=0):
+    """ Writes a monster.txt with `count` monsters; returns the list of names in file order. """
+    rng = random.Random(seed)
+    names = []
+    # ✅ Friends point at a pool of recent monsters, so popular targets get many referrers
+    recent = []
+    with open(path, "w", encoding="utf-8", newline="\n") as file:
+        file.write("# Synthetic monster.txt generated by benchmarks/generate.py\n"
+                   f"# {count} monsters, seed {seed}\n\n")
+        for index in range(count):
+            name = monster_name(rng, index)
+            file.write("\n".join(monster_record(rng, name, recent)) + "\n\n")
+            names.append(name)
+            recent.append(name)
+            if len(recent) > 200:
+                recent = recent[-100:]
+    return names
+
+
+def write_game_data(directory, count, seed=0):
+    """ Writes the game data files GameDataLoader reads, with an object list scaled to `count`. """
+    rng = random.Random(seed + 1)
+    os.makedirs(directory, exist_ok=True)
+
+    def write(filename, lines):
+        with open(os.path.join(directory, filename), "w", encoding="utf-8", newline="\n") as file:
+            file.write("\n".join(lines) + "\n")
+
+    write("monster_base.txt", [f"name:{base}\nglyph:{base[0]}\npain:1\n" for base in BASES])
+    write("blow_methods.txt", [f"name:{method}\ncross:{rng.choice(('true', 'false'))}\n" for method in BLOW_METHODS])
+    write("blow_effects.txt", [f"name:{effect}\npower:{rng.randint(0, 80)}\n" for effect in BLOW_EFFECTS])
+    write("monster_property.txt", [f"code:{flag}\n" for flag in MONSTER_FLAGS])
+    write("object_property.txt", [f"code:{flag}\ntype:flag\n" for flag in OBJECT_FLAGS])
+    write("object_base.txt", [f"name:{base}\ngraphics:~:{rng.choice(COLORS)}\nflags:{rng.choice(OBJECT_FLAGS)}\n"
+                              for base in ("sword", "polearm", "hafted", "bow", "shield", "helm", "boots")])
+    objects = []
+    for index in range(max(100, count // 10)):
+        flags = " | ".join(rng.sample(OBJECT_FLAGS, rng.randint(1, 3)))
+        objects.append(f"name:{rng.choice(SYLLABLES).capitalize()} Item {index}\nlevel:{rng.randint(1, 100)}\n"
+                       f"flags:{flags}\n")
+    write("object.txt", objects)
+
+
+def generate(directory, count, seed=0):
+    """ Writes DIRECTORY/monster.txt and DIRECTORY/gamedata/; returns (monster path, game data path, names). """
+    os.makedirs(directory, exist_ok=True)
+    monster_path = os.path.join(directory, "monster.txt")
+    game_data_path = os.path.join(directory, "gamedata")
+    names = write_monsters(monster_path, count, seed)
+    write_game_data(game_data_path, count, seed)
+    return monster_path, game_data_path, names
+
+
+def main(argv):
+    if len(argv) not in (2, 4) or (len(argv) == 4 and argv[2] != "--seed"):
+        print(__doc__)
+        return 2
+    monster_path, game_data_path, _ = generate(argv[0], int(argv[1]), int(argv[3]) if len(argv) == 4 else 0)
+    print(f"✅ Wrote {monster_path} ({os.path.getsize(monster_path):,} bytes) and {game_data_path}/")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
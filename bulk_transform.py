@@ -0,0 +1,206 @@
+import ast
+import time
+
+import numpy as np
+
+from constants import NUMERIC_FIELDS
+from monster_query import MISSING, QueryError
+
+
+def round_half_up(values):
+    """ Rounds to the nearest integer with halves going up (16.5 -> 17), unlike np.rint's half-to-even. """
+    return np.floor(np.asarray(values) + 0.5)
+
+# Functions usable in field expressions, all applied element-wise
+_FUNCTIONS = {
+    "min": np.minimum,
+    "max": np.maximum,
+    "clip": np.clip,
+    "abs": np.abs,
+    "round": round_half_up,
+    "floor": np.floor,
+    "ceil": np.ceil,
+}
+
+_BINARY = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide, ast.Mod: np.mod, ast.Pow: np.power,
+}
+
+
+class TransformError(ValueError):
+    """ Raised for an invalid assignment or expression. """
+
+
+class TransformPlan:
+    """ Computed but not yet written changes: per field, the affected rows and their new values. """
+
+    def __init__(self, query):
+        self.query = query
+        self.changes = {}  # field -> (rows, old values, new values), only rows whose value changes
+        self.errors = []  # (monster name, field, message)
+        self.elapsed = 0.0
+
+    def rows(self):
+        """ Yields (monster name, field, old value, new value) for every change. """
+        for field, (rows, old, new) in self.changes.items():
+            for row, before, after in zip(rows.tolist(), old.tolist(), new.tolist()):
+                yield self.query.names[row], field, before, after
+
+    @property
+    def change_count(self):
+        return sum(len(rows) for rows, _, _ in self.changes.values())
+
+    def monster_count(self):
+        if not self.changes:
+            return 0
+        return len(np.unique(np.concatenate([rows for rows, _, _ in self.changes.values()])))
+
+
+class BulkTransform:
+    """ Applies field formulas such as `hit-points = hit_points * 1.1` to every monster matching a filter.
+
+    Expressions are evaluated as NumPy array operations over the query engine's columns; fields
+    are referenced with underscores (`hit_points`). All assignments see the values from before
+    the transform, results are rounded to integers (halves up) and must pass the same check as
+    `MonsterEditor.validate_integer` (a non-negative whole number).
+    """
+
+    def __init__(self, monster_query):
+        self.query = monster_query
+        self.monster_parser = monster_query.monster_parser
+
+    @staticmethod
+    def parse_assignment(text):
+        """ Splits `field = expression` into (field, expression). """
+        field, separator, expression = text.partition("=")
+        field = field.strip()
+        if not separator or not expression.strip():
+            raise TransformError(f"Expected 'field = expression', got '{text}'.")
+        if field not in NUMERIC_FIELDS:
+            raise TransformError(f"'{field}' is not a numeric field. Choose from: {', '.join(NUMERIC_FIELDS)}")
+        return field, expression.strip()
+
+    def plan(self, where, assignments):
+        """ Computes the changes for `assignments` ({field: expression}) over monsters matching `where`. """
+        start = time.perf_counter()
+        plan = TransformPlan(self.query)
+        try:
+            selected = np.flatnonzero(self.query.where(where))
+        except QueryError as e:
+            raise TransformError(str(e)) from e
+
+        for field, expression in assignments.items():
+            if field not in NUMERIC_FIELDS:
+                raise TransformError(f"'{field}' is not a numeric field.")
+            tree = self._compile(expression)
+            used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id not in _FUNCTIONS}
+            columns = {name: self.query.column(name.replace("_", "-"))[selected] for name in used}
+
+            target = self.query.column(field)[selected]
+            usable = target != MISSING
+            for column in columns.values():
+                usable &= column != MISSING
+            self._record_errors(plan, selected[~usable], field, "field missing or not a whole number")
+
+            rows = selected[usable]
+            try:
+                with np.errstate(all="ignore"):
+                    result = self._evaluate(tree, {name: column[usable].astype(np.float64)
+                                                   for name, column in columns.items()})
+            except (TypeError, ValueError) as e:
+                raise TransformError(f"Cannot evaluate '{expression}': {e}") from e
+            result = np.broadcast_to(np.asarray(result, dtype=np.float64), rows.shape)
+
+            valid = np.isfinite(result) & (result >= 0)
+            self._record_errors(plan, rows[~valid], field, "result is not a non-negative whole number")
+            rows, old = rows[valid], target[usable][valid]
+            new = round_half_up(result[valid]).astype(np.int64)
+
+            changed = new != old
+            if changed.any():
+                plan.changes[field] = (rows[changed], old[changed], new[changed])
+
+        plan.elapsed = time.perf_counter() - start
+        return plan
+
+    def apply(self, plan):
+        """ Writes a plan's new values into the monster records and the query columns in one step.
+
+        The whole transform is one journal entry, so a single undo reverts it.
+        """
+        edits = []
+        for field, (rows, _, new) in plan.changes.items():
+            edits.extend(zip(self.query.names[rows].tolist(), [field] * len(rows), new.tolist()))
+        with self.query.suspended():
+            self.monster_parser.set_fields(edits)
+            for field, (rows, _, new) in plan.changes.items():
+                self.query.column(field)[rows] = new  # ✅ Patch the column in bulk instead of per row
+        return len({name for name, _, _ in edits})
+
+    def run(self, where, assignments, dry_run=False, preview=20):
+        """ Plans, prints a preview and (unless `dry_run`) applies the transform and saves once. """
+        plan = self.plan(where, assignments)
+        for index, (name, field, old, new) in enumerate(plan.rows()):
+            if index >= preview:
+                print(f"... and {plan.change_count - preview} more changes")
+                break
+            print(f"{name}: {field} {old} → {new}")
+        for name, field, message in plan.errors[:preview]:
+            print(f"⚠️ Skipped {name} ({field}): {message}")
+
+        print(f"{plan.change_count} changes to {plan.monster_count()} monsters computed in {plan.elapsed:.3f}s"
+              + (f", {len(plan.errors)} skipped" if plan.errors else ""))
+        if dry_run or not plan.change_count:
+            return plan
+
+        self.apply(plan)
+        self.monster_parser.save_monsters()
+        return plan
+
+    @staticmethod
+    def _record_errors(plan, rows, field, message):
+        for name in plan.query.names[rows].tolist():
+            plan.errors.append((name, field, message))
+
+    @staticmethod
+    def _compile(expression):
+        try:
+            tree = ast.parse(expression, mode="eval").body
+        except SyntaxError as e:
+            raise TransformError(f"Invalid expression '{expression}': {e.msg}") from e
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id not in _FUNCTIONS and node.id.replace("_", "-") not in NUMERIC_FIELDS:
+                raise TransformError(f"Unknown name '{node.id}' in '{expression}'.")
+            if isinstance(node, ast.Call) and (node.keywords or not (isinstance(node.func, ast.Name)
+                                                                     and node.func.id in _FUNCTIONS)):
+                raise TransformError(f"Only {', '.join(_FUNCTIONS)} can be called in '{expression}'.")
+            if not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Constant,
+                                     ast.Load, ast.operator, ast.unaryop)):
+                raise TransformError(f"Unsupported syntax in '{expression}'.")
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+                raise TransformError(f"Only numbers are allowed in '{expression}'.")
+            if isinstance(node, ast.UnaryOp) and not isinstance(node.op, (ast.USub, ast.UAdd)):
+                raise TransformError(f"Unsupported operator in '{expression}'.")
+            if isinstance(node, ast.BinOp) and type(node.op) not in _BINARY:
+                raise TransformError(f"Unsupported operator in '{expression}'.")
+        return tree
+
+    def _evaluate(self, node, columns):
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return columns[node.id]
+        if isinstance(node, ast.UnaryOp):
+            value = self._evaluate(node.operand, columns)
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.BinOp):
+            return _BINARY[type(node.op)](self._evaluate(node.left, columns), self._evaluate(node.right, columns))
+        arguments = [self._evaluate(argument, columns) for argument in node.args]
+        function = node.func.id
+        if function in ("min", "max") and len(arguments) > 2:
+            result = arguments[0]
+            for argument in arguments[1:]:
+                result = _FUNCTIONS[function](result, argument)
+            return result
+        return _FUNCTIONS[function](*arguments)
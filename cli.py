@@ -7,18 +7,33 @@ class CLI:
         self.monster_parser = monster_parser
         self.editor = editor
         self.game_data_loader = game_data_loader
+        self._query = None  # ✅ Column store built on the first query
+        self.monster_parser.watch()  # ✅ So outside rewrites reload only the records they touched
+
+    def check_for_changes(self):
+        """ Reloads monster.txt and the game data if another program changed them since the last look. """
+        if self.monster_parser.source_changed():
+            report = self.monster_parser.reload()
+            print(f"\n🔄 {self.monster_parser.filepath} was changed outside MFE and reloaded: {report.summary()}")
+            for name, reason in report.conflicts:
+                print(f"⚠️ Conflict: '{name}' was {reason}; keeping your version.")
+        changed = self.game_data_loader.reload()
+        if changed:
+            print(f"\n🔄 Game data reloaded ({', '.join(changed)} changed)")
 
     def main_menu(self):
         """ Displays the main menu and handles user input. """
         while True:
+            self.check_for_changes()
             print("\n=== Monster File Editor (MFE) ===")
             print("1. List Monsters")
             print("2. Search Monster")
             print("3. Edit Monster")
             print("4. View Valid Flags & Blows")
-            print("5. Save & Exit")
+            print("5. Query Monsters")
+            print("6. Save & Exit")
             
-            choice = input("Choose an option (1-5): ").strip()
+            choice = input("Choose an option (1-6): ").strip()
 
             if choice == "1":
                 self.list_monsters()
@@ -29,6 +44,8 @@ class CLI:
             elif choice == "4":
                 self.view_valid_options()
             elif choice == "5":
+                self.query_monsters()
+            elif choice == "6":
                 self.save_and_exit()
                 break
             else:
@@ -41,18 +58,69 @@ class CLI:
             print(f"- {name}")
 
     def search_monster(self):
-        """ Allows searching for a monster by name """
-        name = input("\nEnter monster name: ").strip()
-        if name in self.monster_parser.monsters:
-            print(f"\n{name} found: {self.monster_parser.monsters[name]}")
-        else:
-            print("Monster not found!")
+        """ Finds a monster by exact name, or searches names, descriptions and other text """
+        query = input("\nEnter monster name or search words (\"phrase\", prefix*): ").strip()
+        if query in self.monster_parser.monsters:
+            print(f"\n{query} found: {self.monster_parser.monsters[query]}")
+            return
+
+        # ✅ Ranked full-text matches with the matching words highlighted
+        hits = self.monster_parser.text_index.search(query, limit=10) if query else []
+        for hit in hits:
+            print(f"- {hit.name}")
+            for field, snippet in hit.highlights.items():
+                if field != "name":
+                    print(f"    {field}: {snippet}")
+        if hits:
+            return
+
+        print("Monster not found!")
+        # ✅ Offer prefix/substring matches and typo suggestions
+        suggestions = self.editor.suggest_monsters(query) if query else []
+        if suggestions:
+            print("Did you mean:")
+            for suggestion in suggestions:
+                print(f"- {suggestion}")
 
     def edit_monster(self):
         """ Allows editing of a selected monster """
         name = input("\nEnter monster name to edit: ").strip()
         self.editor.edit_monster(name)
 
+    def query_monsters(self):
+        """ Filters, sorts and summarizes monsters by numeric fields and flags """
+        try:
+            from monster_query import MonsterQuery, QueryError
+        except ImportError:
+            print("⚠️ Queries need NumPy. Install it with: pip install numpy")
+            return
+
+        if self._query is None:
+            self._query = MonsterQuery(self.monster_parser)
+
+        print("\nFilter examples: depth 20..40, speed > 120, EVIL, !NEVER_MOVE")
+        expression = input("Enter filter (press Enter for all monsters): ").strip()
+        sort_by = input("Sort by numeric field (press Enter for file order): ").strip() or None
+        try:
+            mask = self._query.where(expression)
+            names = self._query.select(expression, sort_by=sort_by, descending=True, limit=50)
+        except QueryError as e:
+            print(f"⚠️ {e}")
+            return
+
+        print(f"\n{int(mask.sum())} monsters match" + (" (showing first 50)" if mask.sum() > 50 else ""))
+        for name in names:
+            record = self.monster_parser.monsters[name]
+            print(f"- {name} (depth {record.get('depth', '?')}, speed {record.get('speed', '?')}, "
+                  f"hp {record.get('hit-points', '?')})")
+
+        for field in ("depth", "speed", "hit-points"):
+            stats = self._query.stats(field, mask)
+            if stats["count"]:
+                print(f"{field}: min {stats['min']}, max {stats['max']}, mean {stats['mean']:.1f}")
+        for start, count in self._query.histogram("depth", band=10, mask=mask):
+            print(f"depth {start:>3}-{start + 9:<3} {'#' * min(count, 60)} {count}")
+
     def view_valid_options(self):
         """ Displays valid flags, blows, and effects """
         self.game_data_loader.list_available_options()
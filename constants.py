@@ -17,3 +17,12 @@ VALID_BLOW_EFFECTS = {
     "BLIND", "CONFUSE", "TERRIFY", "PARALYZE", "HALLUCINATE",
     "DRAIN_EXP", "DISENCHANT", "LOSE_STR", "LOSE_INT", "LOSE_WIS"
 }
+
+# Monster fields that hold plain integers
+NUMERIC_FIELDS = (
+    "speed", "hit-points", "depth", "rarity", "experience",
+    "armor-class", "smell", "hearing", "sleepiness"
+)
+
+# Most blows a monster can have
+MAX_BLOWS = 4
@@ -1,15 +1,48 @@
-from difflib import get_close_matches
+from constants import MAX_BLOWS, NUMERIC_FIELDS
+from fuzzy_index import FuzzyIndex
+from instrumentation import profiler
 
 class MonsterEditor:
     def __init__(self, monster_parser, game_data_loader):
         self.monster_parser = monster_parser
         self.game_data_loader = game_data_loader
+        if game_data_loader is not None and monster_parser.game_data_loader is None:
+            monster_parser.game_data_loader = game_data_loader
+        self._fuzzy_indexes = {}  # id(option collection) -> (collection, size, FuzzyIndex)
+        monster_parser.add_listener(self._on_change)
+
+    def _on_change(self, event, name, new_name=None):
+        if event in ("added", "removed", "renamed"):
+            self._fuzzy_indexes.clear()  # ✅ A rename changes a name collection without changing its size
+
+    def fuzzy_index(self, valid_options):
+        """ Returns a cached FuzzyIndex over a collection of valid options (rebuilt when it or the monster names change). """
+        if isinstance(valid_options, FuzzyIndex):
+            return valid_options
+        cached = self._fuzzy_indexes.get(id(valid_options))
+        if cached is None or cached[0] is not valid_options or cached[1] != len(valid_options):
+            cached = (valid_options, len(valid_options), FuzzyIndex(valid_options))
+            self._fuzzy_indexes[id(valid_options)] = cached
+        return cached[2]
 
     def suggest_correction(self, input_value, valid_options):
         """ Suggests the closest valid option if input is invalid """
-        suggestion = get_close_matches(input_value, valid_options, n=1, cutoff=0.6)
+        suggestion = self.suggest_corrections(input_value, valid_options, k=1)
         return suggestion[0] if suggestion else None
 
+    def suggest_corrections(self, input_value, valid_options, k=5):
+        """ Returns up to `k` valid options closest to the input, best first """
+        return self.fuzzy_index(valid_options).suggest(input_value, k=k)
+
+    def suggest_monsters(self, name, k=5):
+        """ Returns monster names close to `name`: prefix and substring matches first, then typo suggestions """
+        names = self.monster_parser.name_index
+        matches = names.prefix(name, limit=k)
+        for match in names.substring(name, limit=k) + names.suggest(name, k=k):
+            if match not in matches:
+                matches.append(match)
+        return matches[:k]
+
     def validate_integer(self, value, field_name):
         """ Ensures input is a valid integer """
         if not value.isdigit():
@@ -17,11 +50,20 @@ class MonsterEditor:
             return None
         return int(value)
 
+    def is_valid_blow_method(self, method):
+        """ True if the method is listed in blow_methods.txt """
+        return self.game_data_loader.index.lookup("blow_method", method) is not None
+
+    def is_valid_blow_effect(self, effect):
+        """ True if the effect is listed in blow_effects.txt """
+        return self.game_data_loader.index.lookup("blow_effect", effect) is not None
+
     def validate_flags(self, flags):
         """ Ensures only valid flags are accepted """
         valid_flags = self.monster_parser.valid_flags  # ✅ Fetch from MonsterParser
         new_flags = [flag.strip() for flag in flags.split(",") if flag.strip()]
         corrected_flags = []
+        profiler.count("flags validated", len(new_flags))
 
         for flag in new_flags:
             if flag in valid_flags:
@@ -40,9 +82,46 @@ class MonsterEditor:
         return corrected_flags if corrected_flags else None
 
 
+    def undo_redo(self, action):
+        """ Undoes or redoes the last journaled edit """
+        if self.monster_parser.journal is None:
+            print("⚠️ Undo is not available without an edit journal.")
+            return None
+        entry = self.monster_parser.undo() if action == "undo" else self.monster_parser.redo()
+        if entry is None:
+            print(f"⚠️ Nothing to {action}.")
+        else:
+            print(f"✅ {action.capitalize()}: {self.describe_edit(entry)}")
+        return entry
+
+    @staticmethod
+    def describe_edit(entry):
+        """ One-line description of a journal entry """
+        if entry["op"] == "set":
+            return f"{entry['monster']} {entry['field']}: {entry['old']} → {entry['new']}"
+        if entry["op"] == "rename":
+            return f"renamed '{entry['monster']}' → '{entry['new']}'"
+        if entry["op"] == "bulk":
+            return f"bulk edit of {len(entry['changes'])} values"
+        return f"{entry['op']} {entry['monster']}"
+
+    def _current_name(self, name):
+        """ Follows renames made by undo/redo so the edit loop keeps showing the same monster """
+        if name in self.monster_parser.monsters or self.monster_parser.journal is None:
+            return name
+        for entry in reversed(self.monster_parser.journal.done + self.monster_parser.journal.undone):
+            if entry["op"] == "rename" and name in (entry["monster"], entry["new"]):
+                other = entry["new"] if name == entry["monster"] else entry["monster"]
+                if other in self.monster_parser.monsters:
+                    return other
+        return name
+
     def edit_monster(self, name):
         if name not in self.monster_parser.monsters:
             print("❌ Monster not found!")
+            suggestions = self.suggest_monsters(name) if name else []
+            if suggestions:
+                print(f"Did you mean: {', '.join(suggestions)}?")
             return
         
         while True:
@@ -56,9 +135,14 @@ class MonsterEditor:
                     else:
                         print(f"{key}: {value}")
 
-            key = input("\nEnter attribute to edit (or type 'done' to finish, 'list' to view valid values): ").strip()
+            key = input("\nEnter attribute to edit (or type 'done' to finish, 'list' to view valid values, "
+                        "'undo'/'redo' to step through your edits): ").strip()
             if key.lower() == "done":
                 break
+            if key.lower() in ("undo", "redo"):
+                self.undo_redo(key.lower())
+                name = self._current_name(name)
+                continue
             if key.lower() == "list":
                 self.game_data_loader.list_available_options()
                 continue
@@ -87,14 +171,14 @@ class MonsterEditor:
 
 
             # ✅ Handle numerical inputs properly
-            if key in ["speed", "hit-points", "depth", "rarity", "experience", "armor-class", "smell", "hearing", "sleepiness"]:
+            if key in NUMERIC_FIELDS:
                 new_value = input(f"Enter new value for {key} (Current: '{old_value_str}', press Enter to keep): ").strip()
                 if new_value == "":
                     print(f"🔄 Keeping old value: {old_value_str}")
                     continue
                 validated_value = self.validate_integer(new_value, key)
                 if validated_value is not None:
-                    monster[key] = validated_value
+                    self.monster_parser.set_field(name, key, validated_value)
                     print(f"✅ Updated '{key}': {monster[key]}")
                 continue
 
@@ -114,7 +198,7 @@ class MonsterEditor:
                 if new_value == "":
                     print(f"🔄 Keeping old value: {old_value_str}")
                 else:
-                    monster[key] = new_value
+                    self.monster_parser.set_field(name, key, new_value)
                     print(f"✅ Updated '{key}': {monster[key]}")
 
                         # ✅ Ensure 'color' is editable even if missing
@@ -125,7 +209,7 @@ class MonsterEditor:
                 if new_color == "":
                     print(f"🔄 Keeping old color: {monster.get(key, 'N/A')}")
                 else:
-                    monster[key] = new_color
+                    self.monster_parser.set_field(name, key, new_color)
                     print(f"✅ Updated 'color': {monster[key]}")
                 continue  # ✅ Ensures loop continues instead of stopping
 
@@ -140,7 +224,7 @@ class MonsterEditor:
 
                 validated_flags = self.validate_flags(new_flags_input)
                 if validated_flags is not None:
-                    monster[key] = validated_flags
+                    self.monster_parser.set_field(name, key, validated_flags)
                     print(f"✅ Updated '{key}': {', '.join(monster[key])}")
                 else:
                     print(f"❌ No valid flags entered. Keeping old flags: {', '.join(monster[key])}")
@@ -153,7 +237,7 @@ class MonsterEditor:
                 if new_desc == "":
                     print(f"🔄 Keeping old description: {old_value_str}")
                 else:
-                    monster[key] = new_desc
+                    self.monster_parser.set_field(name, key, new_desc)
                     print(f"✅ Updated description: {monster[key]}")
                 continue
             # ✅ Handle `blow` editing with validation
@@ -193,13 +277,13 @@ class MonsterEditor:
 
                         # ✅ Validate `blow_methods`
                         new_method = input(f"Enter new method (Current: '{method}', press Enter to keep): ").strip() or method
-                        if new_method not in self.game_data_loader.blow_methods:
+                        if not self.is_valid_blow_method(new_method):
                             print("⚠️ Invalid blow method.")
                             continue
 
                         # ✅ Validate `blow_effects`
                         new_effect = input(f"Enter new effect (Current: '{effect}', press Enter to keep): ").strip() or effect
-                        if new_effect not in self.game_data_loader.blow_effects:
+                        if not self.is_valid_blow_effect(new_effect):
                             print("⚠️ Invalid blow effect.")
                             continue
 
@@ -207,15 +291,15 @@ class MonsterEditor:
                         blows[index] = f"{new_method}:{new_effect}:{new_power}" 
                         print(f"✅ Updated blow: {blows[index]}")
                     elif choice == "2":
-                        if len(blows) >= 4:
-                            print("⚠️ You cannot add more than 4 blows.")
+                        if len(blows) >= MAX_BLOWS:
+                            print(f"⚠️ You cannot add more than {MAX_BLOWS} blows.")
                             continue
 
                         # ✅ Method field is required
                         while True:
                             new_method = input("Enter new blow method: ").strip()
                             
-                            if new_method not in self.game_data_loader.blow_methods:
+                            if not self.is_valid_blow_method(new_method):
                                 print("⚠️ Invalid blow method.")
                                 continue  # Retry input
 
@@ -223,7 +307,7 @@ class MonsterEditor:
 
                         # ✅ Allow empty values for effect and power
                         new_effect = input("Enter new blow effect (Press Enter to leave empty): ").strip()
-                        if new_effect and new_effect not in self.game_data_loader.blow_effects:
+                        if new_effect and not self.is_valid_blow_effect(new_effect):
                             suggestion = self.suggest_correction(new_effect, self.game_data_loader.blow_effects)
                             if suggestion:
                                 confirm = input(f"Did you mean '{suggestion}'? (Y/N): ").strip().lower()
@@ -265,7 +349,7 @@ class MonsterEditor:
                         print("🔄 Exiting blow editing.")
                         break
 
-                monster[key] = blows
+                self.monster_parser.set_field(name, key, blows)
                 print(f"✅ Updated '{key}': {', '.join(monster[key])}")
 
         self.monster_parser.monsters[name] = monster  
@@ -0,0 +1,157 @@
+from collections import Counter
+
+from monster_record import split_flags
+
+
+class FlagVocabulary:
+    """ Interns flag names into bit positions, so a set of flags is one Python int. """
+
+    def __init__(self, flags=()):
+        self.bits = {}  # flag -> bit position
+        self.names = []  # bit position -> flag
+        self.update(flags)
+
+    def bit(self, flag):
+        """ Bit position of `flag`, assigning the next free one to a flag not seen before. """
+        bit = self.bits.get(flag)
+        if bit is None:
+            bit = self.bits[flag] = len(self.names)
+            self.names.append(flag)
+        return bit
+
+    def update(self, flags):
+        for flag in flags:
+            self.bit(flag)
+
+    def mask(self, flags):
+        """ Bitmask of `flags`, interning any new ones. """
+        mask = 0
+        for flag in flags:
+            mask |= 1 << self.bit(flag)
+        return mask
+
+    def known_mask(self, flags):
+        """ Bitmask of the `flags` already in the vocabulary, and whether every flag was known. """
+        mask, complete = 0, True
+        for flag in flags:
+            bit = self.bits.get(flag)
+            if bit is None:
+                complete = False
+            else:
+                mask |= 1 << bit
+        return mask, complete
+
+    def flags(self, mask):
+        """ The flags set in `mask`, in bit order. """
+        flags = []
+        while mask:
+            low = mask & -mask
+            flags.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return flags
+
+    def __contains__(self, flag):
+        return flag in self.bits
+
+    def __len__(self):
+        return len(self.names)
+
+
+class FlagIndex:
+    """ Every monster's flags as an integer bitmask, with per-flag counts.
+
+    Set-algebra queries are bitwise tests over the masks instead of splitting flag lines per
+    record. The index is built on first use and kept current through the parser's change
+    notifications; the records keep their flag lines, so saving is unaffected.
+    """
+
+    def __init__(self, monster_parser, vocabulary=None):
+        self.monster_parser = monster_parser
+        self.vocabulary = vocabulary if vocabulary is not None else FlagVocabulary(sorted(monster_parser.valid_flags))
+        self.masks = {}  # monster name -> flag bitmask
+        self._counts = []  # bit position -> number of monsters with that flag
+        flag_sets = Counter()
+        for name, record in monster_parser.monsters.items():
+            mask = self.masks[name] = self.mask_of_record(record)
+            flag_sets[mask] += 1
+        for mask, amount in flag_sets.items():
+            self._count(mask, amount)  # ✅ Once per distinct flag set rather than per monster
+        monster_parser.add_listener(self._on_change)
+
+    def mask_of_record(self, record):
+        """ Bitmask of a record's flags, interning any new ones. """
+        if hasattr(record, "flag_tokens"):
+            return self.vocabulary.mask(record.flag_tokens())
+        flags = record.get("flags", [])
+        return self.vocabulary.mask(token for line in ([flags] if isinstance(flags, str) else flags)
+                                    for token in split_flags(line))
+
+    def _store(self, name, record):
+        mask = self.mask_of_record(record)
+        self._count(self.masks.get(name, 0), -1)
+        self._count(mask, 1)
+        self.masks[name] = mask
+
+    def _count(self, mask, amount):
+        counts = self._counts
+        if mask.bit_length() > len(counts):
+            counts.extend([0] * (mask.bit_length() - len(counts)))
+        while mask:
+            low = mask & -mask
+            counts[low.bit_length() - 1] += amount
+            mask ^= low
+
+    def _on_change(self, event, name, new_name=None):
+        if event == "changed_many":
+            if "flags" not in new_name:
+                return
+            for each in name:
+                self._store(each, self.monster_parser.monsters[each])
+        elif event in ("changed", "added"):
+            self._store(name, self.monster_parser.monsters[name])
+        elif event == "removed":
+            self._count(self.masks.pop(name, 0), -1)
+        elif event == "renamed":
+            self.masks[new_name] = self.masks.pop(name, 0)
+
+    def mask_of(self, name):
+        """ The flag bitmask of one monster (0 if it has none). """
+        return self.masks.get(name, 0)
+
+    def flags_of(self, name):
+        """ The flags of one monster as a list, in bit order. """
+        return self.vocabulary.flags(self.masks.get(name, 0))
+
+    def _query(self, all_of, none_of, any_of):
+        required, complete = self.vocabulary.known_mask(all_of)
+        excluded, _ = self.vocabulary.known_mask(none_of)
+        wanted, _ = self.vocabulary.known_mask(any_of)
+        if not complete or (any_of and not wanted):
+            return None  # ✅ A required flag no monster has matches nothing
+        return required, excluded, wanted
+
+    def select(self, all_of=(), none_of=(), any_of=()):
+        """ Names of monsters with every flag in `all_of`, none in `none_of` and (if given) one of `any_of`. """
+        query = self._query(all_of, none_of, any_of)
+        if query is None:
+            return []
+        required, excluded, wanted = query
+        return [name for name, mask in self.masks.items()
+                if mask & required == required and not mask & excluded and (not wanted or mask & wanted)]
+
+    def count(self, all_of=(), none_of=(), any_of=()):
+        """ Number of monsters `select` would return. """
+        query = self._query(all_of, none_of, any_of)
+        if query is None:
+            return 0
+        required, excluded, wanted = query
+        return sum(1 for mask in self.masks.values()
+                   if mask & required == required and not mask & excluded and (not wanted or mask & wanted))
+
+    def counts(self):
+        """ {flag: number of monsters with it}, most common first. """
+        counts = {self.vocabulary.names[bit]: count for bit, count in enumerate(self._counts) if count}
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def __len__(self):
+        return len(self.masks)
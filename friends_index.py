@@ -0,0 +1,71 @@
+class FriendsIndex:
+    """ Reverse index of `friends:` entries: target monster name -> monsters whose entries point at it. """
+
+    def __init__(self):
+        self._by_target = {}  # target -> {referrer: [entries naming target]}
+        self._by_referrer = {}  # referrer -> [friends entries, in file order]
+
+    @staticmethod
+    def target_of(entry):
+        """ Returns the monster named by a friends entry such as `60:2d2:Grip, Farmer Maggot's Dog`. """
+        return entry.split(":")[-1]
+
+    def add(self, referrer, entry):
+        """ Records one friends entry of `referrer`. """
+        self._by_referrer.setdefault(referrer, []).append(entry)
+        self._by_target.setdefault(self.target_of(entry), {}).setdefault(referrer, []).append(entry)
+
+    def remove_referrer(self, referrer):
+        """ Forgets every friends entry of `referrer` (e.g. when the monster is deleted). """
+        for entry in self._by_referrer.pop(referrer, []):
+            target = self.target_of(entry)
+            referrers = self._by_target.get(target)
+            if referrers is None:
+                continue
+            referrers.pop(referrer, None)
+            if not referrers:
+                del self._by_target[target]
+
+    def set_referrer(self, referrer, entries):
+        """ Replaces the friends entries of `referrer` with `entries`. """
+        self.remove_referrer(referrer)
+        if isinstance(entries, str):
+            entries = [entries]
+        for entry in entries:
+            self.add(referrer, entry)
+
+    def rename_referrer(self, old_name, new_name):
+        """ Moves the outgoing entries of a renamed monster to its new name. """
+        entries = self._by_referrer.get(old_name)
+        if entries is None:
+            return
+        self.remove_referrer(old_name)
+        for entry in entries:
+            self.add(new_name, entry)
+
+    def referrers(self, target):
+        """ Returns (monster, friends-entry) pairs that point at `target`. """
+        return [(referrer, entry)
+                for referrer, entries in self._by_target.get(target, {}).items()
+                for entry in entries]
+
+    def referrer_names(self, target):
+        """ Returns the names of monsters with at least one entry pointing at `target`. """
+        return list(self._by_target.get(target, {}))
+
+    def dangling(self, monsters):
+        """ Returns (monster, friends-entry) pairs whose target is not a key of `monsters`. """
+        return [pair
+                for target in self._by_target if target not in monsters
+                for pair in self.referrers(target)]
+
+    def state(self):
+        """ The index as plain dicts, for the compiled snapshot. """
+        return self._by_target, self._by_referrer
+
+    def restore(self, state):
+        """ Replaces the index with a `state()` taken earlier. """
+        self._by_target, self._by_referrer = state
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._by_referrer.values())
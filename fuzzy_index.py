@@ -0,0 +1,151 @@
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+from operator import itemgetter
+
+POSTING_BUDGET = 2000  # term ids counted per lookup from the rarest trigrams, see FuzzyIndex.suggest
+SHORTLIST = 100  # best-counted candidates re-counted against every query trigram
+
+
+def _trigrams(text):
+    """ Trigrams of a lowercased, padded term (padding lets short terms and term edges match). """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """ Trigram index over a set of terms for ranked typo suggestions, prefix and substring search.
+
+    Candidates are gathered from the rarest trigram postings and only the best of those are
+    scored with the same ratio `difflib.get_close_matches` uses, so lookups do not scan every term.
+    """
+
+    def __init__(self, terms=()):
+        self._terms = []  # term id -> term (None once discarded)
+        self._lowered = []  # term id -> lowercased term
+        self._ids = {}  # term -> term id
+        self._grams = []  # term id -> trigram count
+        self._postings = {}  # trigram -> set of term ids
+        self._sorted = None  # sorted (lowercase term, term) pairs for prefix search, rebuilt on demand
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        """ Adds a term to the index (no-op if already present). """
+        if term in self._ids:
+            return
+        term_id = len(self._terms)
+        grams = _trigrams(term.lower())
+        self._terms.append(term)
+        self._lowered.append(term.lower())
+        self._grams.append(len(grams))
+        self._ids[term] = term_id
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(term_id)
+        self._sorted = None
+
+    def discard(self, term):
+        """ Removes a term from the index if present. """
+        term_id = self._ids.pop(term, None)
+        if term_id is None:
+            return
+        for gram in _trigrams(term.lower()):
+            self._postings[gram].discard(term_id)
+        self._terms[term_id] = None
+        self._sorted = None
+
+    def suggest(self, query, k=5, cutoff=0.6):
+        """ Returns up to `k` terms similar to `query`, best first.
+
+        Scores are difflib ratios (as in get_close_matches) on lowercased text, so `evil` suggests `EVIL`.
+        """
+        if not query:
+            return []
+        query = query.lower()
+        grams = _trigrams(query)
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+
+        # ✅ Count only the rarest trigrams, up to a budget of term ids; common ones (shared by
+        # thousands of names) are checked against the shortlist instead of counted for every term
+        counted, volume = 0, 0
+        for posting in postings:
+            if counted >= 2 and volume + len(posting) > POSTING_BUDGET:
+                break
+            counted += 1
+            volume += len(posting)
+        shared = Counter()
+        for posting in postings[:counted]:
+            shared.update(posting)
+        shortlist = dict(heapq.nlargest(SHORTLIST, shared.items(), key=itemgetter(1)))
+        for posting in postings[counted:]:
+            for term_id in shortlist.keys() & posting:
+                shortlist[term_id] += 1
+
+        # ✅ Re-rank by trigram overlap, then score the best with difflib's ratio, best bound first
+        query_size = len(grams)
+        candidates = heapq.nlargest(max(k * 4, 20), shortlist.items(),
+                                    key=lambda item: item[1] / (query_size + self._grams[item[0]]))
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        bounds = []
+        for term_id, _ in candidates:
+            matcher.set_seq1(self._lowered[term_id])
+            if matcher.real_quick_ratio() >= cutoff:
+                bound = matcher.quick_ratio()
+                if bound >= cutoff:
+                    bounds.append((bound, term_id))
+        bounds.sort(reverse=True)
+        best = []  # min-heap of the k best (score, term)
+        for bound, term_id in bounds:
+            if len(best) >= k and best[0][0] >= bound:
+                break  # ✅ quick_ratio is an upper bound of ratio: nothing left can make the top k
+            matcher.set_seq1(self._lowered[term_id])
+            score = matcher.ratio()
+            if score >= cutoff:
+                if len(best) < k:
+                    heapq.heappush(best, (score, self._terms[term_id]))
+                else:
+                    heapq.heappushpop(best, (score, self._terms[term_id]))
+        return [term for _, term in sorted(best, reverse=True)]
+
+    def _sorted_terms(self):
+        if self._sorted is None:
+            self._sorted = sorted((term.lower(), term) for term in self._ids)
+        return self._sorted
+
+    def prefix(self, query, limit=None):
+        """ Returns terms starting with `query` (case-insensitive), in alphabetical order. """
+        terms = self._sorted_terms()
+        query = query.lower()
+        results = []
+        for lowered, term in terms[bisect_left(terms, (query,)):]:
+            if not lowered.startswith(query) or (limit is not None and len(results) >= limit):
+                break
+            results.append(term)
+        return results
+
+    def substring(self, query, limit=None):
+        """ Returns terms containing `query` (case-insensitive), in alphabetical order. """
+        query = query.lower()
+        if len(query) < 3:
+            candidates = self._sorted_terms()
+        else:
+            # ✅ A term containing the query contains all of its (unpadded) trigrams
+            postings = [self._postings.get(query[i:i + 3], set()) for i in range(len(query) - 2)]
+            postings.sort(key=len)
+            candidate_ids = set.intersection(*postings)
+            candidates = sorted((self._lowered[term_id], self._terms[term_id]) for term_id in candidate_ids)
+        results = []
+        for lowered, term in candidates:
+            if query in lowered:
+                results.append(term)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def __contains__(self, term):
+        return term in self._ids
+
+    def __len__(self):
+        return len(self._ids)
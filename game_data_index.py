@@ -0,0 +1,133 @@
+from instrumentation import get_logger, profiler
+from monster_record import split_flags
+
+log = get_logger("game_data")
+
+# Game data files defining what monster records refer to, by the kind of reference
+DEFINITION_FILES = {
+    "base": "monster_base.txt",
+    "spell": "monster_spell.txt",
+    "object": "object.txt",
+    "blow_method": "blow_methods.txt",
+    "blow_effect": "blow_effects.txt",
+}
+
+
+def object_key(tval, name):
+    """ Lookup key of an object kind as `drop:` lines spell it: `tval:name`, without the `& ` article and `~` plural marks. """
+    name = name.strip()
+    if name.startswith("& "):
+        name = name[2:]
+    return f"{tval.strip()}:{name.replace('~', '')}"
+
+
+def references(key, value):
+    """ (kind, name) pairs of the game data one monster.txt `key:value` line refers to. """
+    if key == "base":
+        return [("base", value)]
+    if key == "spells":
+        return [("spell", spell) for spell in split_flags(value)]
+    if key == "drop":
+        parts = value.split(":")
+        return [("object", object_key(parts[0], parts[1]))] if len(parts) > 1 else []
+    if key == "blow":
+        parts = value.split(":")
+        found = [("blow_method", parts[0])]
+        if len(parts) > 1 and parts[1]:
+            found.append(("blow_effect", parts[1]))  # ✅ A blow without an effect is allowed
+        return found
+    return []
+
+
+class Definition:
+    """ One `name:` entry of a game data file, with where it is defined and its other fields. """
+
+    __slots__ = ("kind", "name", "filename", "line", "fields")
+
+    def __init__(self, kind, name, filename, line, fields):
+        self.kind = kind
+        self.name = name
+        self.filename = filename
+        self.line = line
+        self.fields = fields  # key -> value, a list for repeated keys
+
+    @property
+    def location(self):
+        return f"{self.filename}:{self.line}"
+
+    def __repr__(self):
+        return f"Definition({self.kind!r}, {self.name!r}, {self.location})"
+
+
+class GameDataIndex:
+    """ Hashed lookup tables of the game data monster records refer to.
+
+    Each table (DEFINITION_FILES) is read through the loader's cache the first time it is
+    needed, so an operation only parses the files it uses. Lookups are dict hits; objects
+    are keyed `tval:name` like the `drop:` lines naming them (see object_key).
+    """
+
+    def __init__(self, game_data_loader):
+        self.game_data_loader = game_data_loader
+        self._tables = {}  # kind -> {key: Definition}, in file order
+        self._names = {}  # kind -> list of keys, handed out by names()
+
+    def table(self, kind):
+        """ {key: Definition} for one kind, reading its file on first use (empty if the file is missing). """
+        table = self._tables.get(kind)
+        if table is not None:
+            return table
+        filename = DEFINITION_FILES[kind]
+        table = {}
+        with profiler.span("game data index"):
+            for name, line, fields in self.game_data_loader.definitions(filename):
+                key = object_key(fields.get("type", ""), name) if kind == "object" else name
+                if key in table:
+                    log.debug(f"Duplicate {kind} '{key}' at {filename}:{line}; keeping {table[key].location}")
+                    continue
+                table[key] = Definition(kind, name, filename, line, fields)
+        self._tables[kind] = table
+        self._names[kind] = list(table)
+        log.info(f"Indexed {len(table)} {kind} definitions from {filename}")
+        log.debug(f"{kind} ({len(table)}): {self._names[kind]}")
+        return table
+
+    def names(self, kind):
+        """ Keys of one kind in file order; the same list object until the file is reloaded. """
+        self.table(kind)
+        return self._names[kind]
+
+    def lookup(self, kind, name):
+        """ The Definition `name` refers to, or None. """
+        return self.table(kind).get(name)
+
+    def resolve(self, key, value):
+        """ (kind, name, Definition or None) for each reference on one monster.txt `key:value` line. """
+        return [(kind, name, self.table(kind).get(name)) for kind, name in references(key, value)]
+
+    def unresolved(self, record):
+        """ (field, value, kind, name) for each reference of a monster record that names nothing.
+
+        Kinds whose file is missing or empty are not checked, as in the validator.
+        """
+        problems = []
+        for key in ("base", "spells", "drop", "blow"):
+            value = record.get(key)
+            if value is None:
+                continue
+            for line in value if isinstance(value, list) else [value]:
+                for kind, name, definition in self.resolve(key, str(line)):
+                    if definition is None and self.table(kind):
+                        problems.append((key, line, kind, name))
+        return problems
+
+    def loaded(self):
+        """ Kinds whose file has been read. """
+        return list(self._tables)
+
+    def forget(self, filenames=None):
+        """ Drops the tables read from `filenames` (all tables if None); they are read again on next use. """
+        for kind in list(self._tables):
+            if filenames is None or DEFINITION_FILES[kind] in filenames:
+                del self._tables[kind]
+                del self._names[kind]
@@ -1,94 +1,231 @@
+import json
 import os
 
+from game_data_index import DEFINITION_FILES, GameDataIndex
+from instrumentation import get_logger, profiler
+
+log = get_logger("game_data")
+
+CACHE_FILENAME = ".mfe_cache.json"
+CACHE_VERSION = 2
+
+# ✅ Flags can be defined in any of these; monster_property.txt lists the monster flags
+FLAG_FILES = ["monster_property.txt", "object_property.txt", "object.txt", "object_base.txt"]
+
 class GameDataLoader:
-    def __init__(self, game_data_path):
+    def __init__(self, game_data_path, use_cache=True, rebuild_cache=False):
         self.game_data_path = game_data_path
-
-        # ✅ Load flags from multiple sources
-        self.valid_flags = self._load_flags_from_multiple_files([
-            "object_property.txt",
-            "object.txt",
-            "object_base.txt"
-        ])
-
-        # ✅ Load blow data
-        self.blow_methods = self._load_data("blow_methods.txt")
-        self.blow_effects = self._load_data("blow_effects.txt")
-
-        # ✅ Print loaded data for debugging
-        print("\n=== Loaded Dependencies ===")
-        print(f"Blow Methods ({len(self.blow_methods)}): {self.blow_methods}")
-        print(f"Blow Effects ({len(self.blow_effects)}): {self.blow_effects}")
-        print(f"Valid Flags ({len(self.valid_flags)}): {self.valid_flags}")
-
-    def _load_data(self, filename):
-        """ Load simple key-value formatted data from the game files. """
+        self.use_cache = use_cache  # ✅ False bypasses the parsed-data cache entirely
+        self.cache_path = os.path.join(game_data_path, CACHE_FILENAME)
+        self._cache = self._read_cache() if use_cache and not rebuild_cache else {}
+        self._cache_changed = rebuild_cache
+        self._sources = {}  # filename -> (size, mtime_ns) as read, None if missing; see changed_files
+        self.index = GameDataIndex(self)  # ✅ Definition tables, each read on first use
+        self._valid_flags = None  # ✅ Read on first use, see valid_flags
+        self.load()
+
+    def load(self):
+        """ Forgets everything read so far; each game data file is read (or taken from the cache) on first use. """
+        self._valid_flags = None
+        self.index.forget()
+
+    @property
+    def valid_flags(self):
+        """ Sorted flag names from the `code:` and `flags:` lines of FLAG_FILES. """
+        if self._valid_flags is None:
+            self._valid_flags = self._load_flags_from_multiple_files(FLAG_FILES)
+            self._flush_cache()
+            log.info(f"Loaded {len(self._valid_flags)} flags from {self.game_data_path}")
+            log.debug(f"Valid Flags ({len(self._valid_flags)}): {self._valid_flags}")
+        return self._valid_flags
+
+    @property
+    def blow_methods(self):
+        """ Blow method names from blow_methods.txt, in file order. """
+        return self.index.names("blow_method")
+
+    @property
+    def blow_effects(self):
+        """ Blow effect names from blow_effects.txt, in file order. """
+        return self.index.names("blow_effect")
+
+    def list_available_options(self):
+        """ Prints the valid flags, blow methods and effects, and the monster bases and spells if their files exist. """
+        sections = [("Flags", self.valid_flags),
+                    ("Blow methods", self.blow_methods),
+                    ("Blow effects", self.blow_effects)]
+        for title, kind in (("Monster bases", "base"), ("Spells", "spell")):
+            if os.path.exists(os.path.join(self.game_data_path, DEFINITION_FILES[kind])):
+                sections.append((title, self.index.names(kind)))
+        for title, options in sections:
+            print(f"\n{title} ({len(options)}):")
+            print(", ".join(options) if options else "(none)")
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def changed_files(self):
+        """ Names of the game data files created, deleted or modified since they were last read. """
+        return [filename for filename, seen in self._sources.items()
+                if self._stat(os.path.join(self.game_data_path, filename)) != seen]
+
+    def reload(self):
+        """ Forgets the data read from files that changed; they are parsed again on next use. """
+        changed = self.changed_files()
+        if changed:
+            log.info(f"Game data changed ({', '.join(changed)}); reloading")
+            for filename in changed:
+                del self._sources[filename]
+            if set(changed) & set(FLAG_FILES):
+                self._valid_flags = None
+            self.index.forget(changed)
+        return changed
+
+    def _read_cache(self):
+        """ Loads the parsed-data cache written by a previous run (empty if missing or unreadable). """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            return {}
+        return cache.get("files", {})
+
+    def _write_cache(self):
+        """ Atomically writes the parsed-data cache next to the game data files. """
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"version": CACHE_VERSION, "files": self._cache}, file)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            log.warning(f"⚠️ Warning: Could not write game data cache {self.cache_path}: {e}")
+
+    def _flush_cache(self):
+        """ Writes the cache if a file was parsed since it was last written. """
+        if self.use_cache and self._cache_changed:
+            self._write_cache()
+            self._cache_changed = False
+
+    def _cached(self, filename, path, kind, parse):
+        """ Returns parse(path), reusing the cached result while the file's size and mtime are unchanged. """
+        stat = os.stat(path)
+        self._sources[filename] = (stat.st_size, stat.st_mtime_ns)
+        key = f"{kind}:{filename}"  # ✅ object.txt is read both for flags and for definitions
+        entry = self._cache.get(key)
+        if (self.use_cache and entry is not None and entry.get("kind") == kind
+                and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns):
+            profiler.count("game data cache hits")
+            return entry["data"]
+
+        with profiler.span("read"):
+            data = parse(path, filename)
+        if self.use_cache:
+            self._cache[key] = {"kind": kind, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "data": data}
+            self._cache_changed = True
+        return data
+
+    def definitions(self, filename):
+        """ (name, line number, fields) of every `name:` entry in one game data file; empty if it is missing. """
         path = os.path.join(self.game_data_path, filename)
 
-        print(f"Checking file: {path}")  # Debugging output
+        log.debug(f"Checking file: {path}")
 
         if not os.path.exists(path):
-            print(f"⚠️ Warning: {filename} not found in {self.game_data_path}!")
+            self._sources[filename] = None
+            log.warning(f"⚠️ Warning: {filename} not found in {self.game_data_path}!")
             return []
 
         try:
-            with open(path, "r", encoding="utf-8") as file:
-                data = []
-                for line in file:
-                    line = line.strip()
-
-                    # Skip empty lines and comments
-                    if not line or line.startswith("#"):
-                        continue
-
-                    # Extract valid entries
-                    if "name:" in line:
-                        parts = line.split(":", 1)
-                        if len(parts) == 2:
-                            data.append(parts[1].strip())
-                        else:
-                            print(f"⚠️ Warning: Skipping malformed line in {filename} -> {line}")
-
-                return data
+            return self._cached(filename, path, "definitions", self._parse_definitions)
 
         except Exception as e:
-            print(f"❌ Error reading {filename}: {e}")
+            log.error(f"❌ Error reading {filename}: {e}")
             return []
 
+        finally:
+            self._flush_cache()
+
+    def _parse_definitions(self, path, filename):
+        """ Splits a file into `name:` entries: [name, line number, {key: value or list of values}]. """
+        with open(path, "r", encoding="utf-8") as file:
+            data = []
+            fields = None
+            for line_number, line in enumerate(file, 1):
+                line = line.strip()
+
+                # Skip empty lines and comments
+                if not line or line.startswith("#"):
+                    continue
+
+                if ":" not in line:
+                    log.warning(f"⚠️ Warning: Skipping malformed line in {filename} -> {line}")
+                    continue
+
+                key, value = line.split(":", 1)
+                key, value = key.strip(), value.strip()
+                if key == "name":
+                    fields = {}
+                    data.append([value, line_number, fields])
+                elif fields is None:
+                    continue  # ✅ Header lines before the first entry
+                elif key in fields:
+                    if not isinstance(fields[key], list):
+                        fields[key] = [fields[key]]
+                    fields[key].append(value)
+                else:
+                    fields[key] = value
+
+            return data
+
     def _load_flags_from_multiple_files(self, filenames):
         """ Extracts flag-like attributes from multiple files. """
         flags = set()  # Use a set to avoid duplicates
 
         for filename in filenames:
             path = os.path.join(self.game_data_path, filename)
-            print(f"Checking file: {path}")  # Debugging output
+            log.debug(f"Checking file: {path}")
 
             if not os.path.exists(path):
-                print(f"⚠️ Warning: {filename} not found! Skipping.")
+                self._sources[filename] = None
+                log.warning(f"⚠️ Warning: {filename} not found! Skipping.")
                 continue
 
             try:
-                with open(path, "r", encoding="utf-8") as file:
-                    for line in file:
-                        line = line.strip()
-
-                        # ✅ Extract flags from "code:" lines
-                        if line.startswith("code:"):
-                            flag_name = line.split(":", 1)[1].strip()
-                            flags.add(flag_name)
-
-                        # ✅ Extract flags from general key-value pairs
-                        elif ":" in line:
-                            key, value = line.split(":", 1)
-                            key = key.strip().lower()
-                            value = value.strip()
-
-                            # ✅ Consider only relevant keys
-                            if key in ["flags", "flag"]:
-                                for flag in value.split("|"):
-                                    flags.add(flag.strip())
+                flags.update(self._cached(filename, path, "flags", self._parse_flags))
 
             except Exception as e:
-                print(f"❌ Error reading {filename}: {e}")
+                log.error(f"❌ Error reading {filename}: {e}")
 
         return sorted(flags)  # Convert back to sorted list for consistency
+
+    def _parse_flags(self, path, filename):
+        """ Extracts flag names from the `code:` and `flags:` lines of one file. """
+        flags = set()
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+
+                # ✅ Extract flags from "code:" lines
+                if line.startswith("code:"):
+                    flag_name = line.split(":", 1)[1].strip()
+                    flags.add(flag_name)
+
+                # ✅ Extract flags from general key-value pairs
+                elif ":" in line:
+                    key, value = line.split(":", 1)
+                    key = key.strip().lower()
+                    value = value.strip()
+
+                    # ✅ Consider only relevant keys
+                    if key in ["flags", "flag"]:
+                        for flag in value.split("|"):
+                            flags.add(flag.strip())
+
+        return sorted(flags)
@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+CHANGE_LOG = os.path.join("logs", "mfe_changes.log")
+
+VERBOSITY_LEVELS = {-1: logging.ERROR, 0: logging.WARNING, 1: logging.INFO, 2: logging.DEBUG}
+
+
+def get_logger(name):
+    """ Logger under the `mfe` hierarchy, e.g. get_logger("parser") -> `mfe.parser`. """
+    return logging.getLogger(f"mfe.{name}")
+
+
+class _DefaultHandler(logging.Handler):
+    """ Prints warnings and errors to stderr until configure_logging() is called, unless the application
+    has set up the root logger itself (then the records reach its handlers instead). """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record):
+        if logging.getLogger().handlers:
+            return
+        try:
+            sys.stderr.write(self.format(record) + "\n")  # ✅ Looked up per record, so redirected stderr is honored
+        except Exception:
+            self.handleError(record)
+
+
+# ✅ Default for entry points that never call configure_logging() (importing the editor, running cli.py):
+# warnings still show, progress messages and the change log stay off
+logging.getLogger("mfe").addHandler(_DefaultHandler())
+
+
+class _ChangeLogHandler(logging.FileHandler):
+    """ File handler that creates the log directory when the first change is written. """
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def configure_logging(verbosity=0, change_log=CHANGE_LOG):
+    """ Sets up console output and the change log.
+
+    verbosity -1 shows only errors, 0 (default) warnings, 1 progress messages and 2 debug detail
+    such as every loaded flag. Edits and saves are appended to `change_log` (None disables it),
+    whose directory is only created once something is written.
+    """
+    root = logging.getLogger("mfe")
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.DEBUG)
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(VERBOSITY_LEVELS[max(-1, min(verbosity, 2))])
+    console.setFormatter(logging.Formatter("%(message)s"))
+    root.addHandler(console)
+
+    if change_log:
+        changes = _ChangeLogHandler(change_log, encoding="utf-8", delay=True)
+        changes.setLevel(logging.INFO)
+        changes.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        changes.addFilter(lambda record: record.name == "mfe.changes")
+        root.addHandler(changes)
+
+
+class Profiler:
+    """ Timing spans and counters per phase (file reads, parse, validation, rename fix-up, save).
+
+    Spans always record call counts and wall time, which costs two clock reads. Allocation
+    sizes are recorded only after `start(track_memory=True)`, which turns on tracemalloc.
+    """
+
+    def __init__(self):
+        self.spans = {}  # name -> [calls, seconds, allocated bytes]
+        self.counters = {}
+        self.track_memory = False
+        self._started = time.perf_counter()
+
+    def start(self, track_memory=True):
+        self.spans.clear()
+        self.counters.clear()
+        self._started = time.perf_counter()
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.track_memory = False
+
+    @contextmanager
+    def span(self, name):
+        """ Times the enclosed block under `name` (nested spans are each counted in full). """
+        memory = self.track_memory and tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if memory else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = [0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += time.perf_counter() - start
+            if memory:
+                stats[2] += tracemalloc.get_traced_memory()[0] - before
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """ The spans and counters as a JSON-ready dict. """
+        report = {
+            "elapsed": time.perf_counter() - self._started,
+            "spans": {name: {"calls": calls, "seconds": seconds, **({"allocated_bytes": allocated}
+                                                                    if self.track_memory else {})}
+                      for name, (calls, seconds, allocated) in self.spans.items()},
+            "counters": dict(self.counters),
+        }
+        if self.track_memory and tracemalloc.is_tracing():
+            report["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        return report
+
+    def summary(self):
+        """ The report as a table, slowest phase first. """
+        report = self.report()
+        lines = [f"=== Profile ({report['elapsed']:.3f}s total) ==="]
+        for name, stats in sorted(report["spans"].items(), key=lambda item: -item[1]["seconds"]):
+            allocated = stats.get("allocated_bytes")
+            memory = f" {allocated / 2 ** 20:9.2f} MiB" if allocated is not None else ""
+            lines.append(f"{name:28} {stats['calls']:8} calls {stats['seconds']:9.4f}s{memory}")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"{name:28} {value:8}")
+        if "peak_bytes" in report:
+            lines.append(f"{'peak traced memory':28} {report['peak_bytes'] / 2 ** 20:14.2f} MiB")
+        return "\n".join(lines)
+
+    def write(self, path):
+        """ Prints the summary (path "-") or writes the report as JSON. """
+        if path == "-":
+            print(self.summary(), file=sys.stderr)
+            return
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2)
+
+
+profiler = Profiler()
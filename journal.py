@@ -0,0 +1,143 @@
+import json
+import os
+
+from instrumentation import get_logger
+
+log = get_logger("journal")
+
+# Saved edits kept in the journal so they can still be undone after a save
+HISTORY_LIMIT = 1000
+
+
+class EditJournal:
+    """ Append-only JSON Lines log of field-level edits, kept next to monster.txt as `monster.txt.journal`.
+
+    Every edit is appended (and flushed) as it happens:
+
+        {"op": "set", "monster": "Grip", "field": "speed", "old": 120, "new": 130}
+        {"op": "rename", "monster": "Grip", "new": "Grip, Farmer Maggot's Dog"}
+        {"op": "add", "monster": "Wolf", "new": {...}}      {"op": "remove", "monster": "Wolf", "old": {...}}
+        {"op": "bulk", "monster": null, "changes": [["Grip", "speed", 120, 115], ...]}
+        {"op": "undo"}      {"op": "redo"}
+
+    A `base` line records the size and mtime of the monster file the following edits apply
+    to. Edits after the last `base` are unsaved: after a crash they are replayed on startup if
+    the monster file is still the one they were made against. Saving compacts the journal into
+    the applied edits (history, still undoable) followed by a new `base` line for the saved file.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.path = filepath + ".journal"
+        self.done = []  # ✅ Applied edits, oldest first (undo pops from the end)
+        self.undone = []  # ✅ Undone edits, most recent last (redo pops from the end)
+        self._file = None
+
+    @staticmethod
+    def fingerprint(filepath):
+        stat = os.stat(filepath)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def read(self):
+        """ Returns (history, pending) entry lists, or None if the journal does not match the monster file. """
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                lines = file.read().split("\n")
+        except FileNotFoundError:
+            return [], []
+
+        entries = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # ✅ A crash can leave the last line half written
+
+        bases = [i for i, entry in enumerate(entries) if entry.get("op") == "base"]
+        if not bases:
+            return None if entries else ([], [])
+        base = entries[bases[-1]]
+        fingerprint = self.fingerprint(self.filepath)
+        if base.get("size") != fingerprint["size"] or base.get("mtime_ns") != fingerprint["mtime_ns"]:
+            return None
+        history = [entry for entry in entries[:bases[-1]] if entry.get("op") != "base"]
+        return history, entries[bases[-1] + 1:]
+
+    def replay(self, pending, apply):
+        """ Rebuilds the undo/redo stacks from `pending` journal lines, calling apply(entry, reverse) for each. """
+        for entry in pending:
+            op = entry.get("op")
+            if op == "undo":
+                if self.done:
+                    self.undone.append(self.done.pop())
+                    apply(self.undone[-1], True)
+            elif op == "redo":
+                if self.undone:
+                    self.done.append(self.undone.pop())
+                    apply(self.done[-1], False)
+            else:
+                self.done.append(entry)
+                self.undone.clear()
+                apply(entry, False)
+
+    def open(self):
+        """ Loads the journal: returns the unsaved entries to replay (empty if none or if the file changed). """
+        journal = self.read()
+        if journal is None:
+            log.warning(f"⚠️ Warning: {self.path} does not match {self.filepath} (edited elsewhere?); "
+                        "starting a new journal.")
+            journal = [], []
+        history, pending = journal
+        self.done = history
+        if not os.path.exists(self.path) or journal == ([], []):
+            self.compact()
+        return pending
+
+    def _append(self, entry):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()  # ✅ Survives a crash of the editor itself
+
+    def record(self, entry):
+        """ Appends a new edit; it becomes the next undo step and clears the redo stack. """
+        self._append(entry)
+        self.done.append(entry)
+        self.undone.clear()
+
+    def undo(self):
+        """ Returns the edit to reverse (or None), logging the undo. """
+        if not self.done:
+            return None
+        self._append({"op": "undo"})
+        self.undone.append(self.done.pop())
+        return self.undone[-1]
+
+    def redo(self):
+        """ Returns the edit to re-apply (or None), logging the redo. """
+        if not self.undone:
+            return None
+        self._append({"op": "redo"})
+        self.done.append(self.undone.pop())
+        return self.done[-1]
+
+    def compact(self):
+        """ Rewrites the journal as the applied edits plus a `base` line for the monster file as it is now. """
+        self.close()
+        self.done = self.done[-HISTORY_LIMIT:]
+        self.undone.clear()  # ✅ Redo does not reach across a save
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for entry in self.done:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            file.write(json.dumps({"op": "base", **self.fingerprint(self.filepath)}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
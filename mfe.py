@@ -1,16 +1,343 @@
+import argparse
+
 from monster_parser import MonsterParser
 from editor import MonsterEditor
 from game_data_loader import GameDataLoader
+from batch_editor import BatchEditor
+from instrumentation import CHANGE_LOG, configure_logging, profiler
 
-if __name__ == "__main__":
+
+def interactive(args):
+    """ Prompts for the files and a monster, then edits it interactively. """
     monster_filepath = input("Enter the full path to your monster.txt file: ").strip()
     game_data_path = input("Enter the path to your game data directory: ").strip()
-    
+
     try:
-        parser = MonsterParser(monster_filepath)
-        game_data_loader = GameDataLoader(game_data_path)
+        parser = MonsterParser(monster_filepath, lazy=True, journal=True)  # ✅ Only the edited monster gets parsed
+        game_data_loader = load_game_data(game_data_path, args)
         editor = MonsterEditor(parser, game_data_loader)
         editor.edit_monster(input("Enter the monster name to edit: ").strip())
         parser.save_monsters()
     except FileNotFoundError:
         print("Error: File not found. Please provide a valid path.")
+
+
+def load_game_data(game_data_path, args):
+    """ Creates the GameDataLoader honouring the --no-cache / --rebuild-cache options. """
+    return GameDataLoader(game_data_path,
+                          use_cache=not getattr(args, "no_cache", False),
+                          rebuild_cache=getattr(args, "rebuild_cache", False))
+
+
+def add_output_options(arg_parser, subcommand=False):
+    """ Verbosity, profiling and change-log options; on subcommands they only override values given before the command. """
+    def default(value):
+        return argparse.SUPPRESS if subcommand else value
+
+    arg_parser.add_argument("-v", "--verbose", action="count", default=default(0),
+                            help="show progress (-v) or debug detail such as every loaded flag (-vv)")
+    arg_parser.add_argument("-q", "--quiet", action="store_true", default=default(False), help="only show errors")
+    arg_parser.add_argument("--profile", nargs="?", const="-", default=default(None), metavar="FILE.json",
+                            help="print per-phase timings and allocations, or write them to a JSON file")
+    arg_parser.add_argument("--log-file", default=default(CHANGE_LOG),
+                            help="where saved changes are logged (default: logs/mfe_changes.log)")
+
+
+def add_cache_options(arg_parser, default=False):
+    arg_parser.add_argument("--no-cache", action="store_true", default=default,
+                            help="parse the game data and monster files without reading or writing caches and snapshots")
+    arg_parser.add_argument("--rebuild-cache", action="store_true", default=default,
+                            help="re-parse every game data file and rewrite the cache")
+
+
+def batch(args):
+    """ Applies a patch file to monster.txt without prompting. """
+    parser = MonsterParser(args.monster_file, lazy=True)
+    editor = MonsterEditor(parser, load_game_data(args.gamedata, args))
+    report = BatchEditor(parser, editor).run(args.patch_file, dry_run=args.dry_run)
+    return 1 if report.errors else 0
+
+
+def query(args):
+    """ Prints monsters matching a filter expression, with optional statistics. """
+    try:
+        from monster_query import MonsterQuery, QueryError
+    except ImportError:
+        print("⚠️ Queries need NumPy. Install it with: pip install numpy")
+        return 1
+
+    parser = MonsterParser(args.monster_file, snapshot=not args.no_cache)
+    engine = MonsterQuery(parser)
+    try:
+        names = engine.select(args.filter, sort_by=args.sort, descending=args.desc, limit=args.limit)
+        for name in names:
+            print(name)
+        if args.stats:
+            mask = engine.where(args.filter)
+            for field in args.stats:
+                print(f"{field}: {engine.stats(field, mask)}")
+                for start, stats in engine.band_stats(field, mask=mask):
+                    print(f"  depth {start}+: {stats}")
+    except QueryError as e:
+        print(f"⚠️ {e}")
+        return 1
+    return 0
+
+
+def search(args):
+    """ Full-text search over monster names, descriptions and other text fields. """
+    parser = MonsterParser(args.monster_file, snapshot=not args.no_cache)
+    index = parser.text_index
+    hits = index.search(args.query, limit=args.limit)
+    for hit in hits:
+        print(f"{hit.score:7.2f}  {hit.name}")
+        for field, snippet in hit.highlights.items():
+            if field != "name":
+                print(f"         {field}: {snippet}")
+    print(f"{len(hits)} of {index.count(args.query)} monsters containing every word")
+    return 0 if hits else 1
+
+
+def transform(args):
+    """ Applies field formulas to every monster matching a filter, saving once at the end. """
+    try:
+        from bulk_transform import BulkTransform, TransformError
+        from monster_query import MonsterQuery
+    except ImportError:
+        print("⚠️ Transforms need NumPy. Install it with: pip install numpy")
+        return 1
+
+    parser = MonsterParser(args.monster_file, snapshot=not args.no_cache)
+    try:
+        assignments = dict(BulkTransform.parse_assignment(text) for text in args.set)
+        BulkTransform(MonsterQuery(parser)).run(args.where, assignments, dry_run=args.dry_run, preview=args.preview)
+    except TransformError as e:
+        print(f"⚠️ {e}")
+        return 1
+    return 0
+
+
+def validate(args):
+    """ Checks a whole monster file against the game data and optionally writes a JSON/CSV report. """
+    from validator import MonsterValidator
+
+    allowed_flags = [flag for flags in args.allow_flags for flag in flags.split(",") if flag.strip()]
+    validator = MonsterValidator(load_game_data(args.gamedata, args), [flag.strip() for flag in allowed_flags])
+    report = validator.validate(args.monster_file, workers=args.workers)
+    for issue in report.issues[:args.show]:
+        print(f"❌ Line {issue.line} ({issue.monster}): {issue.message}")
+    if len(report.issues) > args.show:
+        print(f"... and {len(report.issues) - args.show} more")
+    if args.report:
+        report.write(args.report, args.format)
+        print(f"✅ Report written to {args.report}")
+    print(report.summary())
+    return 1 if report.issues else 0
+
+
+def diff(args):
+    """ Prints the monsters added, removed, renamed and changed between two monster files. """
+    from monster_diff import diff_monsters
+
+    # ✅ Read-only inputs: no snapshot files are left next to them
+    result = diff_monsters(MonsterParser(args.old_file, snapshot=False).monsters,
+                           MonsterParser(args.new_file, snapshot=False).monsters)
+    for line in result.lines():
+        print(line)
+    print(result.summary())
+    return 1 if result else 0
+
+
+def merge(args):
+    """ Three-way merges their monster file into ours (or into --output); exits 1 on conflicts. """
+    import shutil
+
+    from monster_diff import apply_merge, merge_monsters
+
+    target = args.ours
+    if args.output:
+        shutil.copyfile(args.ours, args.output)
+        target = args.output
+    parser = MonsterParser(target, snapshot=not args.no_cache)  # ✅ Only the merged file gets a snapshot
+    result = merge_monsters(MonsterParser(args.base, snapshot=False).monsters, parser.monsters,
+                            MonsterParser(args.theirs, snapshot=False).monsters)
+    for conflict in result.conflicts:
+        print(f"⚠️ Conflict: {conflict}")
+    if apply_merge(parser, result):
+        parser.save_monsters()
+    print(result.summary())
+    return 1 if result.conflicts else 0
+
+
+def export(args):
+    """ Writes every monster to a JSON Lines, CSV or columnar file. """
+    from monster_export import export_monsters
+
+    parser = MonsterParser(args.monster_file, lazy=True)  # ✅ Records are streamed, not all kept in memory
+    try:
+        count = export_monsters(parser, args.output, args.format)
+    except ValueError as e:
+        print(f"⚠️ {e}")
+        return 1
+    print(f"✅ Exported {count} monsters to {args.output}")
+    return 0
+
+
+def import_(args):
+    """ Adds or updates monsters from an export file with the editor's checks, saving once at the end. """
+    from monster_export import import_monsters
+
+    parser = MonsterParser(args.monster_file, lazy=True)
+    batch_editor = BatchEditor(parser, MonsterEditor(parser, load_game_data(args.gamedata, args)))
+    try:
+        report = import_monsters(batch_editor, args.input, args.format)
+    except ValueError as e:
+        print(f"⚠️ {e}")
+        return 1
+    for row_number, _, message in report.errors:
+        print(f"❌ Row {row_number}: {message}")
+    if report.applied and not args.dry_run:
+        parser.save_monsters()
+    print(f"Imported {report.applied}/{report.total} monsters ({len(report.errors)} failed) in {report.elapsed:.3f}s")
+    return 1 if report.errors else 0
+
+
+def serve(args):
+    """ Keeps the monster file and game data loaded and answers requests from mfe_client.py. """
+    import server
+
+    try:
+        return server.run(args.monster_file, load_game_data(args.gamedata, args), socket_path=args.socket,
+                          port=args.port, flush_interval=args.flush_interval, snapshot=not args.no_cache)
+    except FileExistsError as e:
+        print(f"⚠️ {e}")
+        return 1
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(prog="mfe.py", description="Monster File Editor for Angband monster files. "
+                                         "Run without arguments for the interactive editor.")
+    add_cache_options(arg_parser)
+    add_output_options(arg_parser)
+    commands = arg_parser.add_subparsers(dest="command")
+
+    batch_parser = commands.add_parser("batch", help="apply a JSON Lines patch file of edits")
+    batch_parser.add_argument("monster_file", help="path to monster.txt")
+    batch_parser.add_argument("patch_file", help="JSON Lines file of edit operations")
+    batch_parser.add_argument("--gamedata", required=True, help="path to the game data directory")
+    batch_parser.add_argument("--dry-run", action="store_true", help="validate and apply in memory without saving")
+    add_cache_options(batch_parser, default=argparse.SUPPRESS)  # ✅ Accepted before or after the command
+    add_output_options(batch_parser, subcommand=True)
+    batch_parser.set_defaults(handler=batch)
+
+    query_parser = commands.add_parser("query", help="filter, sort and summarize monsters (needs NumPy)")
+    query_parser.add_argument("monster_file", help="path to monster.txt")
+    query_parser.add_argument("filter", nargs="?", default="",
+                              help="e.g. 'depth 20..40, speed > 120, EVIL, !NEVER_MOVE'")
+    query_parser.add_argument("--sort", help="numeric field to sort by")
+    query_parser.add_argument("--desc", action="store_true", help="sort descending")
+    query_parser.add_argument("--limit", type=int, help="print at most this many monsters")
+    query_parser.add_argument("--stats", nargs="+", metavar="FIELD",
+                              help="print min/max/mean of these fields, overall and per depth band")
+    add_output_options(query_parser, subcommand=True)
+    query_parser.set_defaults(handler=query)
+
+    search_parser = commands.add_parser("search", help="full-text search over names, descriptions and other text")
+    search_parser.add_argument("monster_file", help="path to monster.txt")
+    search_parser.add_argument("query", help='words, "quoted phrases" and prefix* terms, all of which must match')
+    search_parser.add_argument("--limit", type=int, default=10, help="number of ranked results to print")
+    add_cache_options(search_parser, default=argparse.SUPPRESS)
+    add_output_options(search_parser, subcommand=True)
+    search_parser.set_defaults(handler=search)
+
+    transform_parser = commands.add_parser("transform", help="apply formulas to many monsters at once (needs NumPy)")
+    transform_parser.add_argument("monster_file", help="path to monster.txt")
+    transform_parser.add_argument("--where", default="", help="filter selecting the monsters, as for 'query'")
+    transform_parser.add_argument("--set", action="append", required=True, metavar="FIELD=EXPR",
+                                  help="e.g. 'hit-points=hit_points*1.1' or 'speed=min(speed, 130)'; repeatable")
+    transform_parser.add_argument("--dry-run", action="store_true", help="only preview the changed rows")
+    transform_parser.add_argument("--preview", type=int, default=20, help="number of changed rows to print")
+    add_output_options(transform_parser, subcommand=True)
+    transform_parser.set_defaults(handler=transform)
+
+    validate_parser = commands.add_parser("validate", help="check a whole monster file against the game data")
+    validate_parser.add_argument("monster_file", help="path to monster.txt")
+    validate_parser.add_argument("--gamedata", required=True, help="path to the game data directory")
+    validate_parser.add_argument("--report", help="write every problem to this .json or .csv file")
+    validate_parser.add_argument("--format", choices=("json", "csv"), help="report format (default: from extension)")
+    validate_parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU; 1 = serial)")
+    validate_parser.add_argument("--show", type=int, default=20, help="number of problems to print")
+    validate_parser.add_argument("--allow-flags", action="append", default=[], metavar="FLAG,...",
+                                 help="flags to accept besides those defined in the game data; repeatable")
+    add_cache_options(validate_parser, default=argparse.SUPPRESS)
+    add_output_options(validate_parser, subcommand=True)
+    validate_parser.set_defaults(handler=validate)
+
+    diff_parser = commands.add_parser("diff", help="list monsters added, removed, renamed and changed between two files")
+    diff_parser.add_argument("old_file", help="path to the older monster.txt")
+    diff_parser.add_argument("new_file", help="path to the newer monster.txt")
+    add_cache_options(diff_parser, default=argparse.SUPPRESS)
+    add_output_options(diff_parser, subcommand=True)
+    diff_parser.set_defaults(handler=diff)
+
+    merge_parser = commands.add_parser("merge", help="three-way merge two edited copies of a monster file")
+    merge_parser.add_argument("base", help="the monster.txt both copies started from")
+    merge_parser.add_argument("ours", help="our copy; the merge is saved here unless --output is given")
+    merge_parser.add_argument("theirs", help="their copy")
+    merge_parser.add_argument("-o", "--output", help="write the merged file here instead")
+    add_cache_options(merge_parser, default=argparse.SUPPRESS)
+    add_output_options(merge_parser, subcommand=True)
+    merge_parser.set_defaults(handler=merge)
+
+    export_parser = commands.add_parser("export", help="write every monster to JSON Lines, CSV or a columnar file")
+    export_parser.add_argument("monster_file", help="path to monster.txt")
+    export_parser.add_argument("output", help="file to write (.jsonl, .csv or .mfecol)")
+    export_parser.add_argument("--format", choices=("jsonl", "csv", "columnar"),
+                               help="output format (default: from extension)")
+    add_output_options(export_parser, subcommand=True)
+    export_parser.set_defaults(handler=export)
+
+    import_parser = commands.add_parser("import", help="add or update monsters from an export file")
+    import_parser.add_argument("monster_file", help="path to monster.txt")
+    import_parser.add_argument("input", help="JSON Lines, CSV or columnar file written by 'export'")
+    import_parser.add_argument("--gamedata", required=True, help="path to the game data directory")
+    import_parser.add_argument("--format", choices=("jsonl", "csv", "columnar"),
+                               help="input format (default: from extension)")
+    import_parser.add_argument("--dry-run", action="store_true", help="validate and apply in memory without saving")
+    add_cache_options(import_parser, default=argparse.SUPPRESS)
+    add_output_options(import_parser, subcommand=True)
+    import_parser.set_defaults(handler=import_)
+
+    serve_parser = commands.add_parser("serve", help="keep the files loaded and answer requests on a local socket")
+    serve_parser.add_argument("monster_file", help="path to monster.txt")
+    serve_parser.add_argument("--gamedata", required=True, help="path to the game data directory")
+    address = serve_parser.add_mutually_exclusive_group()
+    address.add_argument("--socket", help="Unix socket to listen on (default: MONSTER_FILE.sock)")
+    address.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of a Unix socket")
+    serve_parser.add_argument("--flush-interval", type=float, default=5.0,
+                              help="seconds between batched saves of pending edits (default: %(default)s)")
+    add_cache_options(serve_parser, default=argparse.SUPPRESS)
+    add_output_options(serve_parser, subcommand=True)
+    serve_parser.set_defaults(handler=serve)
+
+    return arg_parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    configure_logging(-1 if args.quiet else args.verbose, change_log=args.log_file)
+    if args.profile:
+        profiler.start(track_memory=True)
+    try:
+        if args.command is None:
+            interactive(args)
+            return 0
+        return args.handler(args)
+    finally:
+        if args.profile:
+            profiler.write(args.profile)
+            profiler.stop()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+""" Thin client for a running `mfe serve`.
+
+Usage:
+    python3 mfe_client.py [--socket PATH | --port N] METHOD [JSON_PARAMS]
+
+    python3 mfe_client.py --socket monster.txt.sock get '{"monster": "Grip, Farmer Maggot\\'s Dog"}'
+    python3 mfe_client.py --port 8765 edit '{"op": "set", "monster": "Fang", "field": "speed", "value": 130}'
+    python3 mfe_client.py --port 8765 commit
+
+Only the standard library is used, so scripts and editor plugins can copy this file on its own.
+"""
+import argparse
+import itertools
+import json
+import socket
+import sys
+
+
+class ServerError(Exception):
+    """ The server answered a request with an error. """
+
+
+class MonsterClient:
+    """ One persistent connection to a MonsterServer; call(method, **params) returns the result. """
+
+    def __init__(self, socket_path=None, host="127.0.0.1", port=None, timeout=30.0):
+        if port is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(socket_path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._socket.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def call(self, method, **params):
+        request_id = next(self._ids)
+        self._file.write(json.dumps({"id": request_id, "method": method, "params": params}).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            raise ServerError(response["error"])
+        return response["result"]
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--socket", help="Unix socket of the server")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, help="TCP port of the server")
+    arg_parser.add_argument("method", help="ping, get, list, search, stats, edit, commit, validate or shutdown")
+    arg_parser.add_argument("params", nargs="?", default="{}", help="parameters as a JSON object")
+    args = arg_parser.parse_args(argv)
+    if not args.socket and args.port is None:
+        arg_parser.error("give --socket or --port")
+
+    try:
+        params = json.loads(args.params)
+        with MonsterClient(args.socket, args.host, args.port) as client:
+            result = client.call(args.method, **params)
+    except (OSError, ValueError, TypeError, ServerError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
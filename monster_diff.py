@@ -0,0 +1,292 @@
+from instrumentation import get_logger, profiler
+
+log = get_logger("diff")
+
+RENAME_THRESHOLD = 0.6  # Least share of (field, value) pairs a removed and an added record must have in common
+COMMON_VALUE_LIMIT = 64  # Values shared by more added records than this (rarity:1, base:person) do not propose renames
+
+
+def _fingerprint(record):
+    """ Frozenset of hashable (field, stored value) pairs; equal sets mean equal records, whatever the line order. """
+    keys, values = record.stored_form()
+    return frozenset((key, tuple(value) if value.__class__ is list else value)
+                     for key, value in zip(keys, values) if key != "original_name")
+
+
+def _retarget(entries, renames):
+    """ Friends entries with their target monsters renamed per `renames` (old name -> new name). """
+    if entries is None or not renames:
+        return entries
+    retargeted = []
+    for entry in [entries] if isinstance(entries, str) else entries:
+        parts = entry.split(":")
+        if parts[-1] in renames:
+            parts[-1] = renames[parts[-1]]
+        retargeted.append(":".join(parts))
+    return retargeted
+
+
+class MonsterDiff:
+    """ Record-level differences between two versions of a monster file.
+
+    `renamed` maps old to new names, `changed` maps a monster's new name to {field: (old, new)}
+    (a value of None means the field is absent). Friends entries that only follow a rename are
+    not reported as changes.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.renamed = {}
+        self.changed = {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed or self.changed)
+
+    def counterpart(self, name, other):
+        """ The name `name` (from the old version) has in the new one, or None if it was removed. """
+        new_name = self.renamed.get(name, name)
+        return new_name if new_name in other else None
+
+    def summary(self):
+        return (f"{len(self.added)} added, {len(self.removed)} removed, {len(self.renamed)} renamed, "
+                f"{len(self.changed)} changed")
+
+    def lines(self):
+        """ The diff as readable lines, in the order added, removed, renamed, changed. """
+        lines = [f"+ {name}" for name in self.added]
+        lines += [f"- {name}" for name in self.removed]
+        lines += [f"~ {old} → {new}" for old, new in self.renamed.items()]
+        for name, fields in self.changed.items():
+            lines.append(f"* {name}")
+            lines += [f"    {field}: {old} → {new}" for field, (old, new) in fields.items()]
+        return lines
+
+
+def diff_monsters(old, new):
+    """ Compares two monster mappings (name -> Monster) in time linear in their size.
+
+    Records are matched by name first. Each remaining removed record is then matched to an
+    added one with an identical fingerprint, or failing that to the added record sharing the
+    most (field, value) pairs if at least RENAME_THRESHOLD of them — a rename. Only records
+    whose fingerprints differ are compared field by field.
+    """
+    result = MonsterDiff()
+    with profiler.span("diff"):
+        new_fingerprints = {name: _fingerprint(record) for name, record in new.items()}
+        removed = {}
+        matched = []
+        for name, record in old.items():
+            fingerprint = _fingerprint(record)
+            if name in new:
+                if fingerprint != new_fingerprints[name]:
+                    matched.append((name, name, fingerprint))
+            else:
+                removed[name] = fingerprint
+        added = [name for name in new if name not in old]
+
+        by_fingerprint = {}
+        by_value = {}
+        for name in added:
+            by_fingerprint.setdefault(new_fingerprints[name], []).append(name)
+            for pair in new_fingerprints[name]:
+                by_value.setdefault(pair, []).append(name)
+
+        claimed = set()
+        for name, fingerprint in removed.items():
+            candidate = next((other for other in by_fingerprint.get(fingerprint, ()) if other not in claimed), None)
+            if candidate is None:
+                candidate = _closest(fingerprint, by_value, new_fingerprints, claimed)
+            if candidate is None:
+                result.removed.append(name)
+                continue
+            claimed.add(candidate)
+            result.renamed[name] = candidate
+            matched.append((name, candidate, fingerprint))
+        result.added = [name for name in added if name not in claimed]
+
+        for old_name, new_name, fingerprint in matched:
+            fields = _changed_fields(old[old_name], new[new_name], fingerprint ^ new_fingerprints[new_name],
+                                     result.renamed)
+            if fields:
+                result.changed[new_name] = fields
+    profiler.count("records diffed", len(old) + len(new))
+    return result
+
+
+def _closest(fingerprint, by_value, new_fingerprints, claimed):
+    """ The unclaimed added record most similar to `fingerprint`, if similar enough to be a rename. """
+    overlaps = {}
+    for pair in fingerprint:
+        names = by_value.get(pair, ())
+        if len(names) > COMMON_VALUE_LIMIT:
+            continue
+        for name in names:
+            if name not in claimed:
+                overlaps[name] = overlaps.get(name, 0) + 1
+    best, best_score = None, RENAME_THRESHOLD
+    for name in sorted(overlaps, key=overlaps.get, reverse=True)[:8]:
+        other = new_fingerprints[name]
+        score = len(fingerprint & other) / len(fingerprint | other)
+        if score >= best_score:
+            best, best_score = name, score
+    return best
+
+
+def _changed_fields(old_record, new_record, differing, renames):
+    """ {field: (old, new)} for the fields named in `differing` whose values really differ. """
+    fields = {}
+    for key in dict.fromkeys(key for key, _ in differing):
+        old_value, new_value = old_record.get(key), new_record.get(key)
+        if key == "friends" and _retarget(old_value, renames) == new_value:
+            continue
+        fields[key] = (old_value, new_value)
+    return fields
+
+
+class Conflict:
+    """ A field (or whole monster, field None) both sides changed differently. """
+
+    __slots__ = ("monster", "field", "base", "ours", "theirs", "kind")
+
+    def __init__(self, monster, field, base, ours, theirs, kind="field"):
+        self.monster = monster
+        self.field = field
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+        self.kind = kind
+
+    def __str__(self):
+        if self.kind == "field":
+            return (f"{self.monster}: {self.field} changed on both sides "
+                    f"(base {self.base}, ours {self.ours}, theirs {self.theirs}); kept ours")
+        if self.kind == "rename":
+            return f"{self.base}: renamed to '{self.ours}' by us and to '{self.theirs}' by them; kept ours"
+        if self.kind == "delete":
+            return f"{self.monster}: deleted on one side and changed on the other; kept the changed record"
+        return f"{self.monster}: added on both sides with different contents; kept ours"
+
+
+class MergeResult:
+    """ Outcome of a three-way merge: the edits to apply to our version, and the conflicts. """
+
+    def __init__(self):
+        self.renames = {}  # our name -> merged name
+        self.removed = []  # our names
+        self.fields = {}  # merged name -> {field: value, None = remove}
+        self.added = {}  # name -> attributes, taken from their version
+        self.conflicts = []
+
+    def summary(self):
+        edits = len(self.renames) + len(self.removed) + len(self.fields) + len(self.added)
+        return f"{edits} monsters merged from their version, {len(self.conflicts)} conflicts"
+
+
+def merge_monsters(base, ours, theirs):
+    """ Three-way merges the monster mappings `ours` and `theirs`, which both derive from `base`.
+
+    Each side's changes are found with diff_monsters. A field changed on one side only takes
+    that side's value; a field changed differently on both is a Conflict and keeps ours.
+    Renames from either side carry over, and friends entries on either side that name a
+    renamed monster are pointed at its merged name.
+    """
+    ours_diff, theirs_diff = diff_monsters(base, ours), diff_monsters(base, theirs)
+    result = MergeResult()
+
+    # ✅ Merged name of every base monster, so friends entries from any version can be retargeted
+    merged_names = {}
+    for name in base:
+        our_name, their_name = ours_diff.counterpart(name, ours), theirs_diff.counterpart(name, theirs)
+        if our_name is not None and their_name is not None and our_name != name != their_name != our_name:
+            result.conflicts.append(Conflict(our_name, None, name, our_name, their_name, "rename"))
+        merged_names[name] = our_name if our_name not in (None, name) else their_name or our_name
+    their_renames, our_renames = {}, {}
+    for name, merged_name in merged_names.items():
+        for diff, renames, other in ((theirs_diff, their_renames, theirs), (ours_diff, our_renames, ours)):
+            side_name = diff.counterpart(name, other)
+            if merged_name is not None and side_name not in (None, merged_name):
+                renames[side_name] = merged_name
+    base_renames = {name: new for name, new in merged_names.items() if new is not None and new != name}
+
+    for name in base:
+        our_name = ours_diff.counterpart(name, ours)
+        their_name = theirs_diff.counterpart(name, theirs)
+        merged_name = merged_names[name]
+        if our_name is None and their_name is None:
+            continue
+        if our_name is None or their_name is None:
+            kept = ours[our_name] if their_name is None else theirs[their_name]
+            changes = ours_diff.changed if their_name is None else theirs_diff.changed
+            if (our_name or their_name) not in changes:
+                if their_name is None:
+                    result.removed.append(our_name)
+                continue
+            result.conflicts.append(Conflict(our_name or their_name, None, None, None, None, "delete"))
+            if our_name is None:
+                result.added[their_name] = _attributes(kept, their_renames)
+            continue
+        if our_name != merged_name:
+            result.renames[our_name] = merged_name
+        their_fields = theirs_diff.changed.get(their_name)
+        if not their_fields:
+            continue
+        our_fields = ours_diff.changed.get(our_name, {})
+        base_record, our_record, their_record = base[name], ours[our_name], theirs[their_name]
+        for field in their_fields:
+            their_value = their_record.get(field)
+            if field == "friends":
+                their_value = _retarget(their_value, their_renames)
+                our_value = _retarget(our_record.get(field), our_renames)
+                base_value = _retarget(base_record.get(field), base_renames)
+            else:
+                our_value, base_value = our_record.get(field), base_record.get(field)
+            if our_value == their_value:
+                continue
+            if field in our_fields and our_value != base_value:
+                result.conflicts.append(Conflict(merged_name, field, base_value, our_value, their_value))
+                continue
+            result.fields.setdefault(merged_name, {})[field] = their_value
+
+    for name in theirs_diff.added:
+        attributes = _attributes(theirs[name], their_renames)
+        if name in ours:
+            if name not in ours_diff.added or _attributes(ours[name], our_renames) != attributes:
+                result.conflicts.append(Conflict(name, None, None, None, None, "add"))
+            continue
+        result.added[name] = attributes
+    return result
+
+
+def _attributes(record, renames):
+    """ Plain attribute dict of a record, friends retargeted per `renames`. """
+    attributes = {key: value for key, value in record.items() if key != "original_name"}
+    if "friends" in attributes:
+        attributes["friends"] = _retarget(attributes["friends"], renames)
+    return attributes
+
+
+def apply_merge(monster_parser, result):
+    """ Applies a MergeResult to the parser holding our version; returns how many monsters it touched. """
+    with profiler.span("merge apply"):
+        for name in result.removed:
+            monster_parser.delete_monster(name)
+        # ✅ A rename onto a name another rename is about to free goes through a temporary name
+        staged = {}
+        for old_name, new_name in result.renames.items():
+            if new_name in monster_parser.monsters:
+                temporary = f"{old_name} (merging)"
+                staged[temporary] = new_name
+                monster_parser.rename_monster(old_name, temporary)
+            else:
+                monster_parser.rename_monster(old_name, new_name)
+        for temporary, new_name in staged.items():
+            monster_parser.rename_monster(temporary, new_name)
+        for name, fields in result.fields.items():
+            for field, value in fields.items():
+                monster_parser.set_field(name, field, value)
+        for name, attributes in result.added.items():
+            monster_parser.add_monster(name, attributes)
+    touched = len(result.removed) + len(result.renames) + len(result.fields) + len(result.added)
+    log.info(f"Merged {touched} monsters with {len(result.conflicts)} conflicts")
+    return touched
@@ -0,0 +1,300 @@
+import csv
+import json
+import os
+import re
+import struct
+import time
+import zlib
+
+from batch_editor import BatchReport, PatchError
+from instrumentation import get_logger, profiler
+
+log = get_logger("export")
+
+FORMATS = ("jsonl", "csv", "columnar")
+EXTENSIONS = {".jsonl": "jsonl", ".json": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".mfecol": "columnar"}
+
+ALWAYS_LISTS = ("flags", "friends")  # ✅ The parser keeps these as lists even with a single line
+CSV_LINE_SEPARATOR = "\n"  # Joins the lines of a repeated field inside one CSV cell
+CSV_EMPTY_COLUMN = "_empty"  # Lists a row's cells that hold an empty value rather than an absent field
+
+# Columnar file: magic, row groups of compressed column chunks, JSON footer, footer length, magic
+COLUMNAR_MAGIC = b"MFECOL1\0"
+COLUMNAR_VERSION = 1
+ROW_GROUP_SIZE = 4096  # records per row group; one group is held in memory at a time
+_TRAILER = struct.Struct("<I8s")
+
+_BLOW_COLUMN = re.compile(r"blow_(\d+)_(method|effect|power)")
+
+
+def detect_format(path, fmt=None):
+    """ The export format for `path`: `fmt` if given, else chosen from the file extension. """
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}'; use one of {', '.join(FORMATS)}.")
+        return fmt
+    fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the format of '{path}'; use .jsonl, .csv or .mfecol, or give a format.")
+    return fmt
+
+
+def records(monster_parser):
+    """ Yields (name, plain attribute dict) for every monster, in file order, without keeping parsed records. """
+    for name, record in monster_parser.monsters.stream():
+        yield name, {key: value for key, value in record.items() if key != "original_name"}
+
+
+def _lines(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _from_lines(key, lines):
+    """ A field's value as the parser would hold it: a list for repeated (or always-list) fields, else one value. """
+    return lines if key in ALWAYS_LISTS or len(lines) > 1 else lines[0]
+
+
+# ----- JSON Lines -----
+
+def jsonl_lines(rows):
+    """ Yields one JSON object per monster: {"name": ..., field: value, ...} in the record's own field order. """
+    for name, attributes in rows:
+        yield json.dumps({"name": name, **attributes}, ensure_ascii=False) + "\n"
+
+
+def read_jsonl(file):
+    """ Yields (line number, (name, attributes) or PatchError) from a JSON Lines export. """
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, PatchError(f"Malformed JSON: {e}")
+            continue
+        if not isinstance(row, dict) or "name" not in row:
+            yield line_number, PatchError("Each line must be a JSON object with a 'name'.")
+            continue
+        name = row.pop("name")
+        yield line_number, (name, {key: value for key, value in row.items() if value is not None})
+
+
+# ----- CSV -----
+
+_BLOW_PARTS = ("method", "effect", "power")
+
+
+def _blow_cells(number, blow):
+    """ (column, cell) pairs of a blow's parts; a blow without an effect or power has no cell for it. """
+    return zip((f"blow_{number}_{part}" for part in _BLOW_PARTS), str(blow).split(":", 2))
+
+
+def _join_blow(parts):
+    """ A blow line from its {part: cell} columns, up to the first part it does not have. """
+    present = []
+    for part in _BLOW_PARTS:
+        if part not in parts:
+            break
+        present.append(parts[part])
+    return ":".join(present)
+
+
+def csv_columns(rows):
+    """ CSV header for `rows`: name, then every field in first-seen order, blows spread over method/effect/power columns. """
+    fields, blows = {}, 0
+    for _, attributes in rows:
+        for key, value in attributes.items():
+            fields[key] = None
+            if key == "blow":
+                blows = max(blows, len(_lines(value)))
+    columns = ["name"]
+    for key in fields:
+        if key == "blow":
+            columns += [f"blow_{number}_{part}" for number in range(1, blows + 1) for part in _BLOW_PARTS]
+        else:
+            columns.append(key)
+    return columns + [CSV_EMPTY_COLUMN]
+
+
+def csv_rows(rows):
+    """ Yields one flat dict per monster. Repeated lines share one cell, joined by CSV_LINE_SEPARATOR
+    (so flags keep their line grouping). An empty cell means the field is absent unless the
+    CSV_EMPTY_COLUMN cell names it, as for `desc:` or the effect of `HIT:`. """
+    for name, attributes in rows:
+        row = {"name": name}
+        for key, value in attributes.items():
+            if key == "blow":
+                for number, blow in enumerate(_lines(value), 1):
+                    row.update(_blow_cells(number, blow))
+            elif _lines(value):
+                row[key] = CSV_LINE_SEPARATOR.join(str(line) for line in _lines(value))
+        empty = [column for column, cell in row.items() if cell == ""]
+        if empty:
+            row[CSV_EMPTY_COLUMN] = " ".join(empty)
+        yield row
+
+
+def read_csv(file):
+    """ Yields (line number, (name, attributes) or PatchError) from a CSV export. """
+    reader = csv.DictReader(file)
+    for row in reader:
+        name = row.pop("name", None)
+        if not name:
+            yield reader.line_num, PatchError("Missing 'name'.")
+            continue
+        empty = set((row.pop(CSV_EMPTY_COLUMN, None) or "").split())  # ✅ Hand-written CSVs may not have it
+        attributes, blows = {}, {}
+        for column, cell in row.items():
+            if column is None or not (cell or column in empty):
+                continue
+            blow = _BLOW_COLUMN.fullmatch(column)
+            if blow:
+                blows.setdefault(int(blow.group(1)), {})[blow.group(2)] = cell
+                attributes.setdefault("blow", None)  # ✅ Keeps the field where its columns are
+            else:
+                attributes[column] = _from_lines(column, cell.split(CSV_LINE_SEPARATOR))
+        if blows:
+            attributes["blow"] = _from_lines("blow", [_join_blow(blows[number]) for number in sorted(blows)])
+        yield reader.line_num, (name, attributes)
+
+
+# ----- Columnar -----
+
+def write_columnar(rows, file, row_group_size=ROW_GROUP_SIZE):
+    """ Writes `rows` as row groups of zlib-compressed JSON column chunks; returns the number of rows.
+
+    Like Parquet, the footer lists every chunk's offset and length per row group, so a reader
+    can load just the columns it needs; only one row group is held in memory while writing.
+    """
+    file.write(COLUMNAR_MAGIC)
+    position = len(COLUMNAR_MAGIC)
+    schema, groups, total = {}, [], 0
+    batch = []
+
+    def flush():
+        nonlocal position
+        keys = {"name": None}
+        for _, attributes in batch:
+            keys.update(dict.fromkeys(attributes))
+        chunks = {}
+        for key in keys:
+            values = [name if key == "name" else attributes.get(key) for name, attributes in batch]
+            data = zlib.compress(json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            chunks[key] = [position, len(data)]
+            file.write(data)
+            position += len(data)
+        schema.update(keys)
+        groups.append({"rows": len(batch), "columns": chunks})
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        total += 1
+        if len(batch) == row_group_size:
+            flush()
+    if batch:
+        flush()
+
+    footer = json.dumps({"version": COLUMNAR_VERSION, "columns": list(schema), "row_groups": groups}).encode("utf-8")
+    file.write(footer)
+    file.write(_TRAILER.pack(len(footer), COLUMNAR_MAGIC))
+    return total
+
+
+def read_columnar_footer(file):
+    """ The footer of a columnar file: {"version", "columns", "row_groups": [{"rows", "columns": {name: [offset, length]}}]}. """
+    file.seek(0)
+    if file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar monster export (bad magic).")
+    file.seek(-_TRAILER.size, os.SEEK_END)
+    length, magic = _TRAILER.unpack(file.read(_TRAILER.size))
+    if magic != COLUMNAR_MAGIC:
+        raise ValueError("Columnar monster export is truncated.")
+    file.seek(-_TRAILER.size - length, os.SEEK_END)
+    footer = json.loads(file.read(length))
+    if footer.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar export version {footer.get('version')}.")
+    return footer
+
+
+def read_columns(file, columns=None):
+    """ Yields {column: values} per row group, decompressing only `columns` (all if None). """
+    for group in read_columnar_footer(file)["row_groups"]:
+        values = {}
+        for column, (offset, length) in group["columns"].items():
+            if columns is None or column in columns:
+                file.seek(offset)
+                values[column] = json.loads(zlib.decompress(file.read(length)))
+        yield values
+
+
+def read_columnar(file):
+    """ Yields (row number, (name, attributes)) from a columnar export. """
+    row_number = 0
+    for group in read_columns(file):
+        names = group.pop("name")
+        for position, name in enumerate(names):
+            row_number += 1
+            attributes = {key: values[position] for key, values in group.items() if values[position] is not None}
+            yield row_number, (name, attributes)
+
+
+# ----- Export / import -----
+
+def _open(path, fmt, mode):
+    if fmt == "columnar":
+        return open(path, mode + "b")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_monsters(monster_parser, path, fmt=None):
+    """ Streams every monster to `path` as JSON Lines, CSV or columnar; returns the number exported. """
+    fmt = detect_format(path, fmt)
+    count = 0
+    with profiler.span("export"):
+        with _open(path, fmt, "w") as file:
+            if fmt == "columnar":
+                count = write_columnar(records(monster_parser), file)
+            elif fmt == "jsonl":
+                for line in jsonl_lines(records(monster_parser)):
+                    file.write(line)
+                    count += 1
+            else:
+                # ✅ The header needs every field, so the records are streamed twice instead of kept
+                writer = csv.DictWriter(file, fieldnames=csv_columns(records(monster_parser)))
+                writer.writeheader()
+                for row in csv_rows(records(monster_parser)):
+                    writer.writerow(row)
+                    count += 1
+    profiler.count("records exported", count)
+    log.info(f"Exported {count} monsters to {path} ({fmt})")
+    return count
+
+
+def read_rows(file, fmt):
+    """ Yields (row number, (name, attributes) or PatchError) from an open export file. """
+    reader = {"jsonl": read_jsonl, "csv": read_csv, "columnar": read_columnar}[fmt]
+    return reader(file)
+
+
+def import_monsters(batch_editor, path, fmt=None):
+    """ Adds or updates the monsters in an export file through BatchEditor.put_monster; returns a BatchReport.
+
+    Each row is checked like an interactive edit; a bad row is reported and skipped. Nothing is saved.
+    """
+    fmt = detect_format(path, fmt)
+    report = BatchReport()
+    start = time.perf_counter()
+    with profiler.span("import"), _open(path, fmt, "r") as file:
+        for row_number, row in read_rows(file, fmt):
+            try:
+                if isinstance(row, PatchError):
+                    raise row
+                batch_editor.put_monster(*row)
+                report.applied += 1
+            except PatchError as e:
+                report.errors.append((row_number, row, str(e)))
+    report.elapsed = time.perf_counter() - start
+    profiler.count("records imported", report.applied)
+    return report
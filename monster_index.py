@@ -0,0 +1,392 @@
+import hashlib
+import mmap
+import re
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+from functools import lru_cache
+
+from instrumentation import profiler
+from monster_record import split_flags
+from monster_syntax import RecordSyntax
+
+
+@lru_cache(maxsize=None)
+def _scan_pattern(keys):
+    """ Regex matching `key:value` lines for the given keys; leading whitespace is allowed, like line.strip() in the parser. """
+    return re.compile(rb"^[^\S\n]*(" + b"|".join(keys) + rb"):(.*)$", re.M)
+
+
+def record_starts(data, start=0, end=None):
+    """ Offsets of the `name:` lines in data[start:end], which must begin at a line start. """
+    return [match.start() for match in _scan_pattern((b"name",)).finditer(data, start, len(data) if end is None else end)]
+
+
+def split_records(data, count):
+    """ Splits mapped file bytes into up to `count` (start, end) ranges of about equal size that each begin at a `name:` line. """
+    size = len(data)
+    if size == 0:
+        return []
+    starts = [0]
+    for i in range(1, count):
+        boundary = data.find(b"\nname:", max(size * i // count, starts[-1]))
+        if boundary == -1:
+            break
+        if boundary + 1 > starts[-1]:
+            starts.append(boundary + 1)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+class MonsterIndex(MutableMapping):
+    """ Ordered mapping of monster name -> attributes backed by a memory-mapped monster.txt.
+
+    A single scan records the byte offset of every `name:` block; a record is only parsed
+    into its attribute dict the first time it is read through `index[name]`.
+    """
+
+    def __init__(self, filepath, parse_record, valid_flags=None, friends=None, scan=True):
+        self.filepath = filepath
+        self._parse_record = parse_record
+        self._entries = {}  # name -> start offset in the mapped file (None for records created in memory)
+        self._records = {}  # name -> parsed attributes
+        self._starts = []  # sorted start offsets of every `name:` block, used to find record ends
+        self.original_keys = {}  # name -> attribute names as parsed from the file
+        self.dirty = set()  # names whose in-memory record differs from the file
+        self.deleted = {}  # name -> start offset of records still in the file but deleted in memory
+        self.renamed = {}  # new name -> name in the file, for records renamed in memory (they keep their place)
+        self._file_order = False  # True while iteration order matches the order of `_starts`
+        self._mm = None
+        self._size = 0
+        with profiler.span("read"):
+            self._open()
+            if scan:
+                self.scan(valid_flags, friends)
+
+    def _open(self):
+        """ Memory-maps the monster file (empty files cannot be mapped and are left unmapped). """
+        with open(self.filepath, "rb") as file:
+            try:
+                self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._size = len(self._mm)
+            except ValueError:
+                self._mm = None
+                self._size = 0
+
+    def scan(self, valid_flags=None, friends=None):
+        """ Records the offset of every monster without building records.
+
+        If given, flag names are collected into `valid_flags` and friends entries into the `friends` index.
+        """
+        if self._mm is None:
+            return
+
+        keys = (b"name",) + ((b"flags",) if valid_flags is not None else ()) + ((b"friends",) if friends is not None else ())
+        current = None
+        for match in _scan_pattern(keys).finditer(self._mm):
+            key = match.group(1)
+            value = match.group(2).decode("utf-8").strip()
+            if key == b"name":
+                current = value
+                self._starts.append(match.start())
+                if friends is not None and value in self._entries:
+                    friends.remove_referrer(value)  # ✅ A later duplicate replaces the earlier record
+                self._entries[value] = match.start()
+            elif current is None:
+                continue
+            elif key == b"friends":
+                friends.add(current, value)
+            else:
+                valid_flags.update(split_flags(value))  # ✅ Same flag tracking as the eager parser
+
+        # ✅ Duplicate names leave orphaned blocks in the file, so they rule out the in-order fast path
+        self._file_order = len(self._entries) == len(self._starts)
+
+    def digest(self):
+        """ Hash of the mapped file's bytes, used to tell whether a compiled snapshot is still fresh. """
+        return hashlib.blake2b(self._mm if self._mm is not None else b"", digest_size=16).digest()
+
+    def record_digests(self):
+        """ name -> hash of the record's bytes in the mapped file, to tell which records a rewrite changed. """
+        bounds = self._starts + [self._size]
+        digests = {}
+        if self._mm is None:
+            return digests
+        position = {start: index for index, start in enumerate(self._starts)}
+        for name, start in [*self._entries.items(), *self.deleted.items()]:
+            if start is not None:
+                index = position[start]
+                digests[self.renamed.get(name, name)] = hash(self._mm[start:bounds[index + 1]])
+        return digests
+
+    def file_names(self):
+        """ Names of the records that came from the mapped file, including ones deleted in memory since. """
+        return ({self.renamed.get(name, name) for name, start in self._entries.items() if start is not None}
+                | self.deleted.keys())
+
+    def adopt(self, fresh, records, removed, dirty):
+        """ Switches to `fresh`, a new scan of the same (externally rewritten) file.
+
+        `records` are the in-memory records to keep, including ones missing from the new file,
+        which are appended as new records. Names in `removed` are dropped from the new file's
+        order, and names in `dirty` are re-serialized on the next save.
+        """
+        self.close()
+        self._mm, self._size, self._starts = fresh._mm, fresh._size, fresh._starts
+        fresh._mm = None
+        entries = {name: start for name, start in fresh._entries.items() if name not in removed}
+        for name in records:
+            if name not in entries:
+                entries[name] = None
+        self._entries = entries
+        self._records = records
+        for name in list(self.original_keys):
+            if name not in records:
+                del self.original_keys[name]
+        self.dirty = set(dirty) | {name for name, start in entries.items() if start is None}
+        self.deleted = {name: fresh._entries[name] for name in removed}
+        self.renamed = {}
+        self._file_order = len(entries) == len(self._starts) and not any(start is None for start in entries.values())
+
+    def restore(self, names, entry_starts, starts, records):
+        """ Fills the index from a snapshot instead of `scan` + `materialize` (records in `names` order). """
+        self._entries = dict(zip(names, entry_starts))
+        self._starts = list(starts)
+        self._records = dict(zip(names, records))
+        self.original_keys = {name: record.key_set() for name, record in self._records.items()}
+        self.renamed = {}
+        self._file_order = len(self._entries) == len(self._starts)
+
+    def snapshot_state(self):
+        """ (names, record starts, every block start, records) of a fully materialized, unmodified index. """
+        names = tuple(self._entries)
+        return names, tuple(self._entries.values()), tuple(self._starts), [self._records[name] for name in names]
+
+    def span(self, name):
+        """ Returns the (start, end) byte range of a record in the mapped file, or None. """
+        start = self._entries.get(name)
+        if start is None:
+            return None
+        position = bisect_right(self._starts, start)
+        end = self._starts[position] if position < len(self._starts) else self._size
+        return start, end
+
+    def syntax(self, name):
+        """ RecordSyntax of a record's lines as they are in the mapped file, or None for a record created in memory. """
+        span = self.span(name)
+        if span is None:
+            return None
+        return RecordSyntax(self._mm[span[0]:span[1]].decode("utf-8"))
+
+    def _load(self, name):
+        start, end = self.span(name)
+        text = self._mm[start:end].decode("utf-8")
+        _, attributes = self._parse_record(text.split("\n"))
+        self._records[name] = attributes
+        self.original_keys[name] = attributes.key_set()
+        profiler.count("records parsed on demand")
+        return attributes
+
+    def mark_dirty(self, name):
+        """ Flags a record as changed so the next save re-serializes it. """
+        if name in self._entries:
+            self.dirty.add(name)
+
+    def mark_many_dirty(self, names):
+        """ mark_dirty for many records at once. """
+        entries = self._entries
+        self.dirty.update(name for name in names if name in entries)
+
+    def write(self, file, serialize_record):
+        """ Writes the index to a binary file, copying clean records straight from the map.
+
+        Dirty records that came from the file are rewritten as line edits of their original
+        text (see RecordSyntax), in their original place; only records created in memory are
+        passed through `serialize_record(name, attributes)` and appended. Adjacent clean
+        records are copied as a single byte range. Returns {name: new start offset}, in file order.
+        """
+        if self._file_order and self._mm is not None:
+            return self._write_in_file_order(file, serialize_record)
+
+        new_entries = {}
+        position = 0
+        run_start = run_end = None  # pending range of clean bytes to copy
+
+        def flush_run():
+            nonlocal position, run_start, run_end
+            if run_start is not None:
+                chunk = self._mm[run_start:run_end]
+                if not chunk.endswith(b"\n"):
+                    chunk += b"\n"  # ✅ Never glue the next record onto an unterminated last line
+                file.write(chunk)
+                position += len(chunk)
+                run_start = run_end = None
+
+        # ✅ Comments and blank lines before the first monster are kept as-is
+        header_end = self._starts[0] if self._starts else self._size
+        if header_end:
+            run_start, run_end = 0, header_end
+
+        # ✅ File records in file order (renamed ones included), then the records created in memory
+        in_file = sorted((start, name) for name, start in self._entries.items() if start is not None)
+        created = [(None, name) for name, start in self._entries.items() if start is None]
+        for start, name in in_file + created:
+            span = self.span(name)
+            if span is not None and name not in self.dirty:
+                if run_start is not None and run_end == span[0]:
+                    run_end = span[1]
+                else:
+                    flush_run()
+                    run_start, run_end = span
+                new_entries[name] = position + (run_end - run_start) - (span[1] - span[0])
+                continue
+
+            flush_run()
+            if span is not None:
+                text = self.syntax(name).render(name, self[name])
+                if not text.endswith("\n"):
+                    text += "\n"
+            else:
+                text = serialize_record(name, self[name]) + "\n"  # ✅ Ensure proper spacing between monsters
+            data = text.encode("utf-8")
+            new_entries[name] = position
+            file.write(data)
+            position += len(data)
+
+        flush_run()
+        return new_entries
+
+    def _write_in_file_order(self, file, serialize_record):
+        """ Fast path for `write` when no record was added, removed or duplicated since the scan.
+
+        Everything between two dirty records is copied as one range and the new offsets of the
+        clean records are shifted in bulk, so the cost is a file copy plus the dirty records.
+        """
+        new_starts = []
+        position = 0
+        copied_to = 0  # end of the last byte range taken from the map
+        next_index = 0  # index into `_starts` of the first record not yet placed
+
+        for start, name in sorted((self._entries[name], name) for name in self.dirty):
+            index = bisect_left(self._starts, start)
+            position = self._copy_range(file, copied_to, start, position, new_starts, next_index, index)
+
+            end = self._starts[index + 1] if index + 1 < len(self._starts) else self._size
+            data = self.syntax(name).render(name, self[name]).encode("utf-8")
+            new_starts.append(position)
+            file.write(data)
+            position += len(data)
+            copied_to, next_index = end, index + 1
+
+        self._copy_range(file, copied_to, self._size, position, new_starts, next_index, len(self._starts))
+        # ✅ Every block belongs to exactly one record here; renamed records keep their block
+        names = {start: name for name, start in self._entries.items()}
+        return {names[start]: new_start for start, new_start in zip(self._starts, new_starts)}
+
+    def _copy_range(self, file, begin, end, position, new_starts, first_index, last_index):
+        """ Copies mapped bytes [begin, end) to `file` and records the shifted offsets of the records inside. """
+        shift = position - begin
+        new_starts.extend([start + shift for start in self._starts[first_index:last_index]])
+        with memoryview(self._mm) as view:
+            file.write(view[begin:end])
+        return position + (end - begin)
+
+    def remap(self):
+        """ Maps the file at `filepath` again (after `close`). """
+        self.close()
+        self._open()
+
+    def reopen(self, new_entries):
+        """ Re-maps the file after it was rewritten by `write`, keeping the parsed records. """
+        self.remap()
+        self._entries = new_entries
+        self._starts = list(new_entries.values())
+        self._file_order = True
+        self.dirty.clear()
+        self.deleted.clear()
+        self.renamed.clear()
+
+    def is_loaded(self, name):
+        """ True if the record is already held in memory. """
+        return name in self._records
+
+    def materialize(self):
+        """ Parses every record that has not been read yet. """
+        pending = {start: name for name, start in self._entries.items() if start is not None and name not in self._records}
+        if not pending:
+            return
+
+        # ✅ Walk the file once in offset order instead of looking up each record's end
+        bounds = self._starts + [self._size]
+        for position, start in enumerate(self._starts):
+            name = pending.get(start)
+            if name is None:
+                continue
+            text = self._mm[start:bounds[position + 1]].decode("utf-8")
+            _, attributes = self._parse_record(text.split("\n"))
+            self._records[name] = attributes
+            self.original_keys[name] = attributes.key_set()
+
+    def stream(self):
+        """ Yields (name, record) in index order; records not yet loaded are parsed but not kept, so memory stays flat. """
+        for name in self._entries:
+            record = self._records.get(name)
+            if record is None:
+                start, end = self.span(name)
+                _, record = self._parse_record(self._mm[start:end].decode("utf-8").split("\n"))
+                profiler.count("records streamed")
+            yield name, record
+
+    def close(self):
+        """ Releases the memory map; only records already in memory remain readable. """
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __getitem__(self, name):
+        record = self._records.get(name)
+        if record is not None:
+            return record
+        if name not in self._entries:
+            raise KeyError(name)
+        return self._load(name)
+
+    def __setitem__(self, name, attributes):
+        if name not in self._entries:
+            self._entries[name] = None
+            self._file_order = False
+        if self._records.get(name) is not attributes:
+            self.dirty.add(name)
+        self._records[name] = attributes
+
+    def rename(self, old_name, new_name):
+        """ Gives a record a new name in place: it keeps its block in the file and is rewritten there on save. """
+        record = self[old_name]
+        start = self._entries.pop(old_name)
+        self._records.pop(old_name, None)
+        self.dirty.discard(old_name)
+        self._entries[new_name] = start
+        self._records[new_name] = record
+        self.dirty.add(new_name)
+        if start is not None:
+            file_name = self.renamed.pop(old_name, old_name)
+            if file_name != new_name:
+                self.renamed[new_name] = file_name
+
+    def __delitem__(self, name):
+        start = self._entries.pop(name)
+        if start is not None:
+            self.deleted[self.renamed.pop(name, name)] = start
+        self._file_order = False
+        self._records.pop(name, None)
+        self.dirty.discard(name)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"<MonsterIndex {self.filepath}: {len(self._entries)} monsters, {len(self._records)} loaded>"
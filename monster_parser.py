@@ -1,128 +1,588 @@
+import os
 import shutil
-import logging
+import tempfile
+
+from flag_index import FlagIndex, FlagVocabulary
+from friends_index import FriendsIndex
+from fuzzy_index import FuzzyIndex
+from instrumentation import get_logger, profiler
+from journal import EditJournal
+from monster_index import MonsterIndex
+from monster_record import Monster, split_flags
+from parallel_parse import parallel_workers, parse_parallel
+from snapshot import read_snapshot, write_snapshot
+
+log = get_logger("parser")
+changes = get_logger("changes")  # ✅ Written to logs/mfe_changes.log once logging is configured
+
+
+def parse_attributes(lines, valid_flags):
+    """ Parses the lines of a single `name:` block into (name, plain attribute dict), adding its flags to `valid_flags`. """
+    current_monster = None
+    attributes = None
+
+    for line in lines:
+        line = line.strip()
+
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith("name:"):
+            current_monster = line.split(":", 1)[1].strip()
+            attributes = {"original_name": current_monster}
+
+        elif current_monster:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip()
+                value = value.strip()
+
+                # ✅ Ensure flags are stored and tracked correctly
+                if key == "flags":
+                    valid_flags.update(split_flags(value))
+
+                    if key in attributes:
+                        attributes[key].append(value)
+                    else:
+                        attributes[key] = [value]
+
+                elif key == "friends":
+                    # ✅ Ensure friends are always stored as a list
+                    if key in attributes:
+                        attributes[key].append(value)
+                    else:
+                        attributes[key] = [value]
+
+                elif key in attributes:
+                    if isinstance(attributes[key], list):
+                        attributes[key].append(value)
+                    else:
+                        attributes[key] = [attributes[key], value]
+
+                else:
+                    attributes[key] = value
+
+    return current_monster, attributes
+
+
+def copy_owner(source, destination):
+    """ Gives `destination` the owner and group of `source` where allowed (keeping the group alone if only that is). """
+    if not hasattr(os, "chown"):
+        return
+    stat = os.stat(source)
+    for uid in (stat.st_uid, -1):
+        try:
+            os.chown(destination, uid, stat.st_gid)
+            return
+        except OSError:
+            continue
+
+
+class ReloadReport:
+    """ What an incremental reload found: records changed, added and removed in the file, and conflicts. """
+
+    def __init__(self):
+        self.changed = []
+        self.added = []
+        self.removed = []
+        self.conflicts = []  # (name, reason); the in-memory version is kept
+
+    def __bool__(self):
+        return bool(self.changed or self.added or self.removed or self.conflicts)
+
+    def summary(self):
+        return (f"{len(self.changed)} changed, {len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.conflicts)} conflicts")
 
-logging.basicConfig(filename="logs/mfe_changes.log", level=logging.INFO, format="%(asctime)s - %(message)s")
 
 class MonsterParser:
     valid_flags = set()  # ✅ Track valid flags
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, lazy=False, journal=False, snapshot=True, workers=None):
         self.filepath = filepath
+        self.workers = workers  # ✅ Parse processes for large files (None: one per CPU, 1: always serial)
+        self.lazy = lazy  # ✅ Parse records on first access instead of at startup
+        self.snapshot = snapshot and not lazy  # ✅ Eager loads reuse a compiled snapshot, see load_monsters
+        self.journal = EditJournal(filepath) if journal else None  # ✅ Field-level edit log, see set_field
+        self.friends_index = FriendsIndex()  # ✅ Filled by load_monsters()
+        self._name_index = None  # ✅ Built on first fuzzy lookup, see name_index
+        self._flag_index = None  # ✅ Built on first flag query, see flag_index
+        self.game_data_loader = None  # ✅ Set by MonsterEditor; its flags seed the flag vocabulary
+        self._text_index = None  # ✅ Built on first full-text search, see text_index
+        self._listeners = []  # ✅ Callbacks told about record changes, see add_listener
         self.monsters = self.load_monsters()
-        self.original_attributes = {name: set(attrs.keys()) for name, attrs in self.monsters.items()}  
+        self._source = self._source_stat()  # ✅ Compared on save and by source_changed() to spot outside rewrites
+        self._digests = None  # ✅ Record content hashes while watching, see watch()
+        self.original_attributes = self.monsters.original_keys  # ✅ Filled as records are parsed
+        self.recovered = self.recover() if self.journal else 0
+
+    def recover(self):
+        """ Replays edits a crashed session left unsaved in the journal; returns how many lines were replayed. """
+        pending = self.journal.open()
+        if pending:
+            self.journal.replay(pending, self._apply_entry)
+            log.warning(f"⚠️ Recovered {len(pending)} unsaved journal entries from a previous session.")
+        return len(pending)
+
+    def _source_stat(self):
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def source_changed(self):
+        """ True if monster.txt was rewritten by someone else since it was loaded or last saved. """
+        return self._source_stat() != self._source
+
+    def watch(self):
+        """ Hashes every record so a later reload() can tell exactly which ones an outside rewrite touched.
+
+        Without this, reload() still works when the file was replaced (the old mapping keeps the
+        old contents), but after an in-place rewrite it has to treat every record as changed.
+        """
+        self._digests = self.monsters.record_digests()
+
+    def reload(self):
+        """ Picks up an outside rewrite of monster.txt without losing in-memory edits; returns a ReloadReport.
+
+        Only records whose bytes changed are re-parsed; unchanged records keep their parsed form.
+        A record edited here and changed (or deleted) in the file is a conflict: the edit is kept
+        and will overwrite it on the next save.
+        """
+        report = ReloadReport()
+        stat = self._source_stat()
+        with profiler.span("reload"):
+            old = self._digests
+            if old is None and self._source is not None and stat is not None and stat[0] != self._source[0]:
+                old = self.monsters.record_digests()  # ✅ Replaced, not rewritten: the old mapping is intact
+            local = self.monsters
+            fresh = MonsterIndex(self.filepath, self.parse_record)
+            new = fresh.record_digests()
+            in_file = local.file_names()
+
+            records, removed, dirty = {}, set(), set(local.dirty)
+            for name in fresh:
+                unchanged = old is not None and name in old and old[name] == new[name]
+                if name in local:
+                    if name in dirty or name not in in_file:
+                        records[name] = local[name]
+                        if not unchanged:
+                            report.conflicts.append((name, "edited here and changed in the file"))
+                    elif unchanged:
+                        if local.is_loaded(name):
+                            records[name] = local[name]
+                    else:
+                        report.changed.append(name)
+                elif name in in_file:
+                    removed.add(name)  # ✅ Deleted or renamed here; stays deleted
+                    if not unchanged:
+                        report.conflicts.append((name, "deleted here and changed in the file"))
+                else:
+                    report.added.append(name)
+            for name in local:
+                if name in fresh:
+                    continue
+                if name in dirty or name not in in_file:
+                    records[name] = local[name]
+                    if name in in_file:
+                        report.conflicts.append((name, "edited here and deleted from the file"))
+                else:
+                    report.removed.append(name)
+
+            local.adopt(fresh, records, removed, dirty & set(records))
+            for name in report.removed:
+                self.friends_index.remove_referrer(name)
+                self.notify("removed", name)
+            for event, names in (("changed", report.changed), ("added", report.added)):
+                for name in names:
+                    self.friends_index.set_referrer(name, local[name].get("friends", []))
+                    self.notify(event, name)
+            self._source = stat
+            if self._digests is not None:
+                self._digests = new
+        profiler.count("records reloaded", len(report.changed) + len(report.added))
+        for name, reason in report.conflicts:
+            log.warning(f"⚠️ Conflict: '{name}' was {reason}; keeping the version edited here.")
+        log.info(f"Reloaded {self.filepath}: {report.summary()}")
+        return report
 
     def backup_file(self):
         """ Creates a backup of the existing monster.txt before modifying it. """
         backup_path = self.filepath + ".backup"
-        shutil.copy(self.filepath, backup_path)
-        print(f"✅ Backup created: {backup_path}")
+        if os.path.exists(backup_path):
+            os.remove(backup_path)
+        try:
+            # ✅ The file is replaced rather than rewritten on save, so a hard link keeps the old contents for free
+            os.link(self.filepath, backup_path)
+        except OSError:
+            shutil.copy(self.filepath, backup_path)
+        log.info(f"✅ Backup created: {backup_path}")
 
-    def load_monsters(self):
-        """ Reads monster.txt and parses monsters into a dictionary while handling duplicate attributes. """
-        monsters = {}
-        current_monster = None
+    def add_listener(self, callback):
+        """ Registers callback(event, name, new_name=None), called after a record is
+        "changed", "added", "removed" or "renamed" (to `new_name`). After a bulk edit (see set_fields)
+        it is called once with "changed_many", the list of names and the set of fields edited.
+        Derived indexes use it to stay current. """
+        self._listeners.append(callback)
 
-        with open(self.filepath, "r", encoding="utf-8") as file:
-            for line in file:
-                line = line.strip()
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
 
-                if not line or line.startswith("#"):
-                    continue
+    def notify(self, event, name, new_name=None):
+        for callback in list(self._listeners):
+            callback(event, name, new_name)
+
+    @property
+    def name_index(self):
+        """ FuzzyIndex over monster names, built on first use and kept in sync on rename/add/delete. """
+        if self._name_index is None:
+            self._name_index = FuzzyIndex(self.monsters)
+            self.add_listener(self._update_name_index)
+        return self._name_index
 
-                if line.startswith("name:"):
-                    current_monster = line.split(":", 1)[1].strip()
-                    monsters[current_monster] = {"original_name": current_monster}
-                
-                elif current_monster:
-                    if ":" in line:
-                        key, value = line.split(":", 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        # ✅ Ensure flags are stored and tracked correctly
-                        if key == "flags":
-                            if " | " in value:
-                                for flag in value.split(" | "):
-                                    self.valid_flags.add(flag)
-                            else:
-                                self.valid_flags.add(value)
-                            
-                            if key in monsters[current_monster]:
-                                monsters[current_monster][key].append(value)
-                            else:
-                                monsters[current_monster][key] = [value]
-                        
-                        elif key == "friends":
-                            # ✅ Ensure friends are always stored as a list
-                            if key in monsters[current_monster]:
-                                monsters[current_monster][key].append(value)
-                            else:
-                                monsters[current_monster][key] = [value]
-                        
-                        elif key in monsters[current_monster]:
-                            if isinstance(monsters[current_monster][key], list):
-                                monsters[current_monster][key].append(value)
-                            else:
-                                monsters[current_monster][key] = [monsters[current_monster][key], value]
-                                
-                        else:
-                            monsters[current_monster][key] = value
-        
-        print(f"Valid flags: {self.valid_flags}")  # ✅ Print all valid flags
+    def _update_name_index(self, event, name, new_name=None):
+        if event in ("removed", "renamed"):
+            self._name_index.discard(name)
+        if event == "added":
+            self._name_index.add(name)
+        elif event == "renamed":
+            self._name_index.add(new_name)
+
+    @property
+    def flag_index(self):
+        """ FlagIndex of every monster's flags as a bitmask, built on first use and kept in sync.
+
+        The vocabulary holds the game data flags (when a loader is attached) and then the flags
+        seen in the monster file, so bit positions do not depend on which monsters are loaded.
+        """
+        if self._flag_index is None:
+            game_flags = self.game_data_loader.valid_flags if self.game_data_loader is not None else ()
+            vocabulary = FlagVocabulary(sorted(game_flags))
+            vocabulary.update(sorted(self.valid_flags))
+            self._flag_index = FlagIndex(self, vocabulary)
+        return self._flag_index
+
+    @property
+    def text_index(self):
+        """ TextIndex over names, descriptions and other free text, built on first search and kept in sync. """
+        if self._text_index is None:
+            from text_index import TextIndex
+
+            self._text_index = TextIndex(self)
+        return self._text_index
+
+    def set_flags(self, name, flags):
+        """ Sets a monster's flags to `flags` (names, or a FlagIndex bitmask).
+
+        Existing `flags:` lines keep their text, order and grouping as far as they still apply,
+        so setting the flags a monster already has changes nothing; new flags go on one extra line.
+        """
+        if isinstance(flags, int):
+            flags = self.flag_index.vocabulary.flags(flags)
+        wanted = dict.fromkeys(flags)
+        current = self.monsters[name].get("flags", [])
+        lines, present = [], set()
+        for line in [current] if isinstance(current, str) else current:
+            tokens = split_flags(line)
+            kept = [token for token in tokens if token in wanted]
+            present.update(kept)
+            if kept == tokens:
+                lines.append(line)
+            elif kept:
+                lines.append(" | ".join(kept))
+        missing = [flag for flag in wanted if flag not in present]
+        if missing:
+            lines.append(" | ".join(missing))
+        return self.set_field(name, "flags", lines or None)
+
+    def mark_dirty(self, name):
+        """ Marks a monster as modified so the next save rewrites its record. """
+        self.monsters.mark_dirty(name)
+        if self.monsters.is_loaded(name):
+            self.friends_index.set_referrer(name, self.monsters[name].get("friends", []))
+        self.notify("changed", name)
+
+    def set_field(self, name, key, value):
+        """ Sets (or with value None, removes) one attribute of a monster, journaling the old and new value. """
+        monster = self.monsters[name]
+        old = monster.get(key)
+        if old == value:
+            return False
+        if self.journal:
+            self.journal.record({"op": "set", "monster": name, "field": key, "old": old, "new": value})
+        self._set(name, key, value)
+        changes.info(f"{name}: {key} {old} → {value}")
+        return True
+
+    def set_fields(self, edits):
+        """ Applies many (name, key, value) edits as one step; returns the number of values changed.
+
+        The whole batch is one journal entry (so one undo reverts it), one change-log line and
+        one "changed_many" notification, instead of one of each per value as with set_field.
+        """
+        monsters = self.monsters
+        applied = []
+        for name, key, value in edits:
+            old = monsters[name].get(key)
+            if old != value:
+                applied.append([name, key, old, value])
+        if not applied:
+            return 0
+        if self.journal:
+            self.journal.record({"op": "bulk", "monster": None, "changes": applied})
+        names = self._set_many(applied, reverse=False)
+        changes.info(f"Bulk edit: {len(applied)} values in {len(names)} monsters")
+        return len(applied)
+
+    def _set_many(self, applied, reverse):
+        """ Writes [name, key, old, new] edits (their old values if `reverse`); returns the names touched. """
+        monsters = self.monsters
+        names, fields = {}, set()
+        for name, key, old, new in reversed(applied) if reverse else applied:
+            value = old if reverse else new
+            if value is None:
+                monsters[name].pop(key, None)
+            else:
+                monsters[name][key] = value
+            if key == "friends":
+                self.friends_index.set_referrer(name, value or [])
+            names[name] = None
+            fields.add(key)
+        names = list(names)
+        monsters.mark_many_dirty(names)
+        self.notify("changed_many", names, fields)
+        return names
+
+    def _set(self, name, key, value):
+        monster = self.monsters[name]
+        if value is None:
+            monster.pop(key, None)
+        else:
+            monster[key] = value
+        self.mark_dirty(name)
+
+    def undo(self):
+        """ Reverts the most recent journaled edit; returns it, or None if there is nothing to undo. """
+        entry = self.journal.undo() if self.journal else None
+        if entry is not None:
+            self._apply_entry(entry, reverse=True)
+        return entry
+
+    def redo(self):
+        """ Re-applies the most recently undone edit; returns it, or None if there is nothing to redo. """
+        entry = self.journal.redo() if self.journal else None
+        if entry is not None:
+            self._apply_entry(entry, reverse=False)
+        return entry
+
+    def _apply_entry(self, entry, reverse):
+        """ Applies a journal entry (or its inverse) without journaling it again. """
+        journal, self.journal = self.journal, None
+        try:
+            op, name = entry["op"], entry["monster"]
+            if op == "bulk":
+                self._set_many(entry["changes"], reverse)
+            elif op == "set":
+                self._set(name, entry["field"], entry["old"] if reverse else entry["new"])
+            elif op == "rename":
+                old_name, new_name = (entry["new"], name) if reverse else (name, entry["new"])
+                self.rename_monster(old_name, new_name)
+            elif (op == "add") != reverse:
+                self.add_monster(name, entry["new"] if op == "add" else entry["old"])
+            else:
+                self.delete_monster(name)
+        finally:
+            self.journal = journal
+
+    def add_monster(self, name, attributes):
+        """ Adds a new monster record at the end of the file. """
+        if name in self.monsters:
+            log.warning(f"⚠️ Error: A monster named '{name}' already exists. Choose another name.")
+            return False
+
+        if self.journal:
+            self.journal.record({"op": "add", "monster": name, "new": dict(attributes)})
+        self.monsters[name] = Monster({"original_name": name, **attributes})
+        self.friends_index.set_referrer(name, attributes.get("friends", []))
+        self.notify("added", name)
+        return True
+
+    def delete_monster(self, name):
+        """ Removes a monster; `friends` entries that pointed at it become dangling. """
+        if name not in self.monsters:
+            log.warning(f"❌ Error: Monster '{name}' not found.")
+            return False
+
+        if self.journal:
+            attributes = {key: value for key, value in self.monsters[name].items() if key != "original_name"}
+            self.journal.record({"op": "remove", "monster": name, "old": attributes})
+        del self.monsters[name]
+        self.original_attributes.pop(name, None)
+        self.friends_index.remove_referrer(name)
+        self.notify("removed", name)
+        return True
+
+    def referrers_of(self, name):
+        """ Returns (monster, friends-entry) pairs that reference `name`. """
+        return self.friends_index.referrers(name)
+
+    def dangling_friends(self):
+        """ Returns (monster, friends-entry) pairs whose target monster does not exist. """
+        return self.friends_index.dangling(self.monsters)
+
+    def load_monsters(self):
+        """ Indexes monster.txt and parses monsters into a dictionary while handling duplicate attributes.
+
+        In lazy mode only the byte offsets of each record are read up front; records are parsed on first access.
+        Eager loads read `monster.txt.mfesnap` instead of parsing when its source hash matches the file,
+        and (re)write it after a parse. Large files are parsed in a process pool (see parallel_parse).
+        """
+        if self.lazy:
+            # ✅ Flags and friends are collected during the index scan since records are not parsed yet
+            monsters = MonsterIndex(self.filepath, self.parse_record, self.valid_flags, self.friends_index)
+        else:
+            monsters = MonsterIndex(self.filepath, self.parse_record, scan=False)
+            digest = monsters.digest() if self.snapshot else None
+            snapshot = read_snapshot(self.filepath, digest) if self.snapshot else None
+            if snapshot is not None:
+                names, entry_starts, starts, flags, friends_state, records = snapshot
+                monsters.restore(names, entry_starts, starts, records)
+                self.valid_flags.update(flags)
+                self.friends_index.restore(friends_state)
+            else:
+                workers = parallel_workers(self.filepath, self.workers)
+                with profiler.span("parse"):
+                    if workers > 1:
+                        *state, flags = parse_parallel(self.filepath, workers)
+                        monsters.restore(*state)
+                        self.valid_flags.update(flags)
+                    else:
+                        monsters.scan()
+                        monsters.materialize()
+                    for name, attributes in monsters.items():
+                        if "friends" in attributes:
+                            self.friends_index.set_referrer(name, attributes["friends"])
+                if self.snapshot:
+                    # ✅ Only this file's flags, collected the way parse_attributes does
+                    flags = {flag for record in monsters.values() for flag in record.flag_tokens()}
+                    write_snapshot(self.filepath, digest, *monsters.snapshot_state(), flags,
+                                   self.friends_index.state())
+
+        log.info(f"Loaded {len(monsters)} monsters from {self.filepath}")
+        log.debug(f"Valid flags: {self.valid_flags}")
         return monsters
 
+    def parse_record(self, lines):
+        """ Parses the lines of a single `name:` block into (name, Monster). """
+        name, attributes = self.parse_attributes(lines)
+        return name, Monster(attributes) if attributes is not None else None
+
+    def parse_attributes(self, lines):
+        """ Parses the lines of a single `name:` block into (name, plain attribute dict). """
+        return parse_attributes(lines, self.valid_flags)
+
     def rename_monster(self, old_name, new_name):
         """ Handles renaming a monster while updating all references in `friends`. """
         if new_name in self.monsters:
-            print(f"⚠️ Error: A monster named '{new_name}' already exists. Choose another name.")
+            log.warning(f"⚠️ Error: A monster named '{new_name}' already exists. Choose another name.")
             return False
 
         if old_name not in self.monsters:
-            print(f"❌ Error: Monster '{old_name}' not found.")
+            log.warning(f"❌ Error: Monster '{old_name}' not found.")
             return False
 
-        self.monsters[new_name] = self.monsters.pop(old_name)
+        if self.journal:
+            self.journal.record({"op": "rename", "monster": old_name, "new": new_name})
+        self.monsters.rename(old_name, new_name)  # ✅ Keeps the record's place (and layout) in the file
         self.monsters[new_name]["original_name"] = new_name  
 
         if old_name in self.original_attributes:
             self.original_attributes[new_name] = self.original_attributes.pop(old_name)
 
+        self.friends_index.rename_referrer(old_name, new_name)
+        self.notify("renamed", old_name, new_name)
         self.update_friends_references(old_name, new_name)
 
-        print(f"✅ Monster '{old_name}' successfully renamed to '{new_name}'!")
+        changes.info(f"✅ Monster '{old_name}' successfully renamed to '{new_name}'!")
         return True
 
     def update_friends_references(self, old_name, new_name):
         """ Updates all references of `old_name` in `friends` attributes of other monsters. """
-        print(f"\n🔍 Scanning for references to '{old_name}' in other monsters...")
-        for monster_name, monster in self.monsters.items():
-            if "friends" in monster:
+        updated = 0
+        with profiler.span("rename fix-up"):
+            # ✅ Only the monsters the reverse index lists as referrers are touched
+            for monster_name in self.friends_index.referrer_names(old_name):
+                monster = self.monsters[monster_name]
+                friends = monster["friends"] if isinstance(monster["friends"], list) else [monster["friends"]]
                 updated_friends = []
-                for friend in monster["friends"]:
+                for friend in friends:
                     parts = friend.split(":")
                     if parts[-1] == old_name:  
                         parts[-1] = new_name
-                        print(f"🔄 Updating friend reference in '{monster_name}': {friend} → {':'.join(parts)}")
+                        updated += 1
+                        log.debug(f"🔄 Updating friend reference in '{monster_name}': {friend} → {':'.join(parts)}")
                     updated_friends.append(":".join(parts))
                 monster["friends"] = updated_friends  
+                self.mark_dirty(monster_name)
+        profiler.count("friends references updated", updated)
+        log.info(f"🔍 Updated {updated} references to '{old_name}' in other monsters")
+
+    def serialize_record(self, name, attributes):
+        """ Formats a single monster back into monster.txt lines. """
+        lines = [f"name:{name}\n"]
+        for key, value in attributes.items():
+            if key != "original_name":
+                if isinstance(value, list):
+                    for item in value:
+                        lines.append(f"{key}:{item}\n")
+                else:
+                    lines.append(f"{key}:{value}\n")
+        return "".join(lines)
 
     def save_monsters(self):
-        """ Saves the modified monsters back to the file. """
-        self.backup_file()
+        """ Saves the modified monsters back to the file.
 
-        with open(self.filepath, "w", encoding="utf-8") as file:
-            for name, attributes in self.monsters.items():
-                file.write(f"name:{name}\n")
+        Unchanged records are copied through byte for byte. Records marked dirty get targeted
+        line edits in place, keeping their comments, key order and formatting, so saving an
+        unmodified file reproduces it exactly and a diff of the save shows only the edited lines. The new file is written next to the old one and swapped in atomically.
+        With a journal the saved edits stay undoable in it, so no backup copy is made.
+        """
+        if self.source_changed():
+            # ✅ Never overwrite someone else's rewrite: fold it in first, keeping the edits made here
+            log.warning(f"⚠️ {self.filepath} was changed by another program; merging before saving.")
+            self.reload()
+        dirty = len(self.monsters.dirty)
+        with profiler.span("save"):
+            target = os.path.realpath(self.filepath)  # ✅ Replace the file a symlink points to, not the link
+            fd, temp_path = tempfile.mkstemp(prefix=".monster-", suffix=".tmp", dir=os.path.dirname(target))
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    new_entries = self.monsters.write(file, self.serialize_record)
+                    file.flush()
+                    os.fsync(file.fileno())
+                if os.path.exists(target):
+                    shutil.copymode(target, temp_path)  # ✅ mkstemp makes the file owner-only
+                    copy_owner(target, temp_path)
 
-                for key, value in attributes.items():
-                    if key != "original_name":
-                        if isinstance(value, list):
-                            for item in value:
-                                file.write(f"{key}:{item}\n")
-                        else:
-                            file.write(f"{key}:{value}\n")
+                if not self.journal:
+                    self.backup_file()
+                self.monsters.close()  # ✅ Windows cannot replace a file that is still mapped
+                os.replace(temp_path, target)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                self.monsters.remap()
+                raise
 
-                file.write("\n")  # ✅ Ensure proper spacing between monsters
+            self.monsters.reopen(new_entries)
+            self._source = self._source_stat()
+            if self._digests is not None:
+                self.watch()
+            if self.journal:
+                self.journal.compact()  # ✅ Fold the unsaved edits into the file; they stay in the journal as history
+        profiler.count("records re-serialized", dirty)
 
-        logging.info(f"✅ Changes saved to {self.filepath}")
-        print(f"\n✅ Changes saved to {self.filepath}, and logged in logs/mfe_changes.log")
+        changes.info(f"✅ Changes saved to {self.filepath} ({dirty} monsters changed)")
+        print(f"\n✅ Changes saved to {self.filepath}")
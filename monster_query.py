@@ -0,0 +1,246 @@
+import re
+from contextlib import contextmanager
+
+import numpy as np
+
+from constants import NUMERIC_FIELDS
+from instrumentation import profiler
+
+MISSING = np.iinfo(np.int64).min  # marks a numeric field the monster does not have (or that is not an integer)
+_WORD = (1 << 64) - 1
+
+_COMPARISON = re.compile(r"^([a-z][a-z-]*)\s*(<=|>=|==|!=|<|>|=)\s*(-?\d+)$")
+_RANGE = re.compile(r"^([a-z][a-z-]*)\s+(-?\d+)\s*\.\.\s*(-?\d+)$")
+_FLAG = re.compile(r"^([!-]?)([A-Z][A-Z0-9_]*)$")
+
+_OPERATORS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "=": np.equal, "==": np.equal, "!=": np.not_equal,
+}
+
+
+class QueryError(ValueError):
+    """ Raised for a malformed filter expression or an unknown field. """
+
+
+class MonsterQuery:
+    """ Columnar NumPy view of the parser's numeric fields and flags for vectorized queries.
+
+    Columns are built on first use. Edited monsters are patched in place through the parser's
+    change notifications; added or removed monsters cause a rebuild on the next query. Flag
+    masks are the parser's FlagIndex bitmasks split into uint64 words, so both share one vocabulary.
+    """
+
+    def __init__(self, monster_parser):
+        self.monster_parser = monster_parser
+        self.names = None  # row -> monster name (object array)
+        self.columns = {}  # field -> int64 array, MISSING where absent
+        self.flag_words = None  # (rows, words) uint64 array of FlagIndex bitmasks
+        self._rows = {}  # monster name -> row
+        self._stale = True
+        self._suspended = False
+        monster_parser.add_listener(self._on_change)
+
+    @contextmanager
+    def suspended(self):
+        """ Ignores "changed" and "changed_many" notifications while the caller patches the columns itself. """
+        self._suspended = True
+        try:
+            yield
+        finally:
+            self._suspended = False
+
+    def _on_change(self, event, name, new_name=None):
+        if self._stale or (self._suspended and event in ("changed", "changed_many")):
+            return
+        if event == "changed":
+            self._patch_row(name)
+        elif event == "changed_many":
+            self._patch_rows(name, new_name)
+        elif event == "renamed":
+            row = self._rows.pop(name)
+            self._rows[new_name] = row
+            self.names[row] = new_name
+        else:
+            self._stale = True  # ✅ Row count changed; rebuild lazily
+
+    def _ensure_built(self):
+        if self._stale:
+            self.build()
+
+    def build(self):
+        """ (Re)builds every column from the parser's records. """
+        with profiler.span("query build"):
+            self._build()
+
+    def _build(self):
+        monsters = self.monster_parser.monsters
+        names = list(monsters)
+        values = {field: [] for field in NUMERIC_FIELDS}
+
+        for name in names:
+            record = monsters[name]
+            get = getattr(record, "stored", record.get)  # ✅ Monster records hand out ints without conversion
+            for field, column in values.items():
+                value = get(field)
+                column.append(value if value.__class__ is int else MISSING)
+
+        self.names = np.array(names, dtype=object)
+        self._rows = {name: row for row, name in enumerate(names)}
+        self.columns = {field: np.array(column, dtype=np.int64) for field, column in values.items()}
+        flag_index = self.monster_parser.flag_index
+        masks = [flag_index.mask_of(name) for name in names]
+        self.flag_words = np.zeros((len(names), self._word_count()), dtype=np.uint64)
+        for word in range(self.flag_words.shape[1]):
+            self.flag_words[:, word] = [(mask >> (64 * word)) & _WORD for mask in masks]
+        self._stale = False
+
+    @staticmethod
+    def _number(value):
+        return value if isinstance(value, int) else MISSING
+
+    @property
+    def flag_bits(self):
+        """ flag -> bit position in the flag masks (the FlagIndex vocabulary). """
+        return self.monster_parser.flag_index.vocabulary.bits
+
+    def _word_count(self):
+        return max(1, (len(self.flag_bits) + 63) // 64)
+
+    def _patch_row(self, name):
+        row = self._rows.get(name)
+        if row is None:
+            self._stale = True
+            return
+        record = self.monster_parser.monsters[name]
+        get = getattr(record, "stored", record.get)
+        for field, column in self.columns.items():
+            column[row] = self._number(get(field))
+
+        # ✅ From the record, not FlagIndex.masks: the index may hear about this change after us
+        mask = self.monster_parser.flag_index.mask_of_record(record)
+        missing_words = self._word_count() - self.flag_words.shape[1]
+        if missing_words > 0:
+            self.flag_words = np.hstack([self.flag_words, np.zeros((len(self.names), missing_words), dtype=np.uint64)])
+        self.flag_words[row] = [(mask >> (64 * word)) & _WORD for word in range(self.flag_words.shape[1])]
+
+    def _patch_rows(self, names, fields):
+        rows = [self._rows.get(name) for name in names]
+        if "flags" in fields or None in rows:
+            for name in names:
+                self._patch_row(name)
+            return
+        monsters = self.monster_parser.monsters
+        getters = [getattr(record, "stored", record.get) for record in map(monsters.__getitem__, names)]
+        for field in fields & self.columns.keys():
+            self.columns[field][rows] = [self._number(get(field)) for get in getters]
+
+    def column(self, field):
+        """ Returns the int64 column of a numeric field (MISSING where absent). """
+        self._ensure_built()
+        if field not in self.columns:
+            raise QueryError(f"Unknown numeric field '{field}'. Choose from: {', '.join(NUMERIC_FIELDS)}")
+        return self.columns[field]
+
+    def has_flag(self, flag):
+        """ Boolean mask of monsters that have `flag`. """
+        self._ensure_built()
+        bit = self.flag_bits.get(flag)
+        if bit is None:
+            return np.zeros(len(self.names), dtype=bool)
+        return (self.flag_words[:, bit // 64] & np.uint64(1 << (bit % 64))) != 0
+
+    def flag_mask(self, all_of=(), none_of=(), any_of=()):
+        """ Boolean mask of monsters with every flag in `all_of`, none in `none_of` and (if given) one of `any_of`. """
+        self._ensure_built()
+        mask = np.ones(len(self.names), dtype=bool)
+        for flag in all_of:
+            mask &= self.has_flag(flag)
+        for flag in none_of:
+            mask &= ~self.has_flag(flag)
+        if any_of:
+            mask &= np.logical_or.reduce([self.has_flag(flag) for flag in any_of])
+        return mask
+
+    def where(self, expression):
+        """ Boolean mask for a comma-separated filter such as `depth 20..40, speed > 120, EVIL, !NEVER_MOVE`. """
+        self._ensure_built()
+        mask = np.ones(len(self.names), dtype=bool)
+        for term in (term.strip() for term in expression.split(",")):
+            if not term:
+                continue
+            match = _RANGE.match(term)
+            if match:
+                column = self.column(match.group(1))
+                low, high = int(match.group(2)), int(match.group(3))
+                mask &= (column != MISSING) & (column >= low) & (column <= high)
+                continue
+            match = _COMPARISON.match(term)
+            if match:
+                column = self.column(match.group(1))
+                mask &= (column != MISSING) & _OPERATORS[match.group(2)](column, int(match.group(3)))
+                continue
+            match = _FLAG.match(term)
+            if match:
+                has = self.has_flag(match.group(2))
+                mask &= ~has if match.group(1) else has
+                continue
+            raise QueryError(f"Cannot understand filter term '{term}'.")
+        return mask
+
+    def select(self, expression="", sort_by=None, descending=False, limit=None):
+        """ Returns the names of monsters matching `expression`, optionally sorted by a numeric field. """
+        rows = np.flatnonzero(self.where(expression))
+        if sort_by:
+            keys = self.column(sort_by)[rows]
+            # ✅ Monsters without the field sort last either way
+            order = np.argsort(np.where(keys == MISSING, np.iinfo(np.int64).max, -keys if descending else keys),
+                               kind="stable")
+            rows = rows[order]
+        if limit is not None:
+            rows = rows[:limit]
+        return self.names[rows].tolist()
+
+    def stats(self, field, mask=None):
+        """ Count, min, max and mean of a numeric field over the selected monsters. """
+        values = self._values(field, mask)
+        if not len(values):
+            return {"count": 0, "min": None, "max": None, "mean": None}
+        return {"count": int(len(values)), "min": int(values.min()), "max": int(values.max()),
+                "mean": float(values.mean())}
+
+    def histogram(self, field="depth", band=10, mask=None):
+        """ Returns (band start, count) pairs of a numeric field split into bands of width `band`. """
+        values = self._values(field, mask)
+        if not len(values):
+            return []
+        bands = values // band
+        counts = np.bincount(bands - bands.min())
+        return [(int((bands.min() + i) * band), int(count)) for i, count in enumerate(counts) if count]
+
+    def band_stats(self, field, band=10, mask=None, band_field="depth"):
+        """ Per `band_field` band (default: depth in steps of 10), stats of `field` over the selected monsters. """
+        self._ensure_built()
+        selected = np.ones(len(self.names), dtype=bool) if mask is None else mask
+        bands_column = self.column(band_field)
+        values_column = self.column(field)
+        selected = selected & (bands_column != MISSING) & (values_column != MISSING)
+        bands = bands_column[selected] // band
+        values = values_column[selected]
+        result = []
+        for band_index in np.unique(bands):
+            in_band = values[bands == band_index]
+            result.append((int(band_index * band), {"count": int(len(in_band)), "min": int(in_band.min()),
+                                                   "max": int(in_band.max()), "mean": float(in_band.mean())}))
+        return result
+
+    def _values(self, field, mask):
+        column = self.column(field)
+        present = column != MISSING
+        if mask is not None:
+            present &= mask
+        return column[present]
+
+    def __len__(self):
+        self._ensure_built()
+        return len(self.names)
@@ -0,0 +1,213 @@
+import sys
+from collections.abc import MutableMapping
+
+from constants import NUMERIC_FIELDS
+
+# Values up to this length are interned so repeated vocabulary (bases, colours, spell names) is shared
+INTERN_MAX_LENGTH = 24
+
+
+class _Layout:
+    """ Shared, interned key order of a record; monsters with the same attribute order share one layout. """
+
+    _layouts = {}
+
+    __slots__ = ("keys", "index", "key_set", "_with", "_without")
+
+    def __init__(self, keys):
+        keys = tuple(sys.intern(key) for key in keys)
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+        self.key_set = frozenset(keys)
+        self._with = {}
+        self._without = {}
+
+    @classmethod
+    def get(cls, keys):
+        layout = cls._layouts.get(keys)
+        if layout is None:
+            layout = cls._layouts[keys] = cls(keys)
+        return layout
+
+    def with_key(self, key):
+        layout = self._with.get(key)
+        if layout is None:
+            layout = self._with[key] = _Layout.get(self.keys + (key,))
+        return layout
+
+    def without_key(self, key):
+        layout = self._without.get(key)
+        if layout is None:
+            layout = self._without[key] = _Layout.get(tuple(k for k in self.keys if k != key))
+        return layout
+
+
+def _intern(value):
+    return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+
+
+def _pack_number(value):
+    if isinstance(value, str):
+        try:
+            number = int(value)
+        except ValueError:
+            return _intern(value)
+        # ✅ Only canonical spellings become ints so the text round-trips exactly
+        return number if str(number) == value else _intern(value)
+    if isinstance(value, list):
+        return [_pack_number(item) if isinstance(item, str) else item for item in value]
+    return value
+
+
+def split_flags(line):
+    """ Flag names on one `flags:` line; `A | B`, `A|B` and `A |B` all give ["A", "B"]. """
+    return [token for token in (token.strip() for token in line.split("|")) if token]
+
+
+def _pack_flag_line(line):
+    tokens = tuple(sys.intern(token) for token in split_flags(line))
+    return tokens if " | ".join(tokens) == line else _intern(line)
+
+
+def _unpack_flag_line(line):
+    return line if isinstance(line, str) else " | ".join(line)
+
+
+def _pack_flags(value):
+    lines = [value] if isinstance(value, str) else value
+    return tuple(_pack_flag_line(str(line)) for line in lines)
+
+
+def _pack_blow(blow):
+    return tuple(sys.intern(part) for part in blow.split(":"))
+
+
+def _pack_blows(value):
+    if isinstance(value, (list, tuple)):
+        return [_pack_blow(str(blow)) for blow in value]
+    return _pack_blow(str(value))
+
+
+_PACKERS = {"flags": _pack_flags, "blow": _pack_blows}
+_PACKERS.update((field, _pack_number) for field in NUMERIC_FIELDS)
+
+
+def _pack(key, value):
+    """ Converts a text-form value (str or list of str) to its compact stored form. """
+    packer = _PACKERS.get(key)
+    if packer is not None:
+        return packer(value)
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+    if isinstance(value, list):
+        return [_intern(item) if isinstance(item, str) else item for item in value]
+    return value
+
+
+def _unpack(key, value):
+    """ Converts a stored value back to the form the parser has always exposed. """
+    if key == "flags":
+        return [_unpack_flag_line(line) for line in value]
+    if key == "blow":
+        if isinstance(value, list):
+            return [":".join(blow) for blow in value]
+        return ":".join(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class Monster(MutableMapping):
+    """ Compact monster record with a dict-like view.
+
+    Attribute names live in a shared layout, numeric fields are ints, flag tokens are interned
+    and blows are (method, effect, power) tuples. Reading `monster[key]` returns the same
+    text forms as before (str, or list of str for repeated keys; numeric fields as int),
+    and writing accepts them, so serializing through `save_monsters` is unchanged.
+    """
+
+    __slots__ = ("_layout", "_values")
+
+    def __init__(self, attributes=()):
+        if not isinstance(attributes, dict):
+            attributes = dict(attributes)
+        self._layout = _Layout.get(tuple(attributes))
+        values = []
+        for key, value in attributes.items():
+            packer = _PACKERS.get(key)
+            if packer is not None:
+                value = packer(value)
+            elif value.__class__ is str:
+                # ✅ Inlined fast path of _pack for plain text values
+                if len(value) <= INTERN_MAX_LENGTH:
+                    value = sys.intern(value)
+            else:
+                value = _pack(key, value)
+            values.append(value)
+        self._values = values
+
+    def flag_tokens(self):
+        """ Returns every flag on the monster as a list of interned tokens. """
+        tokens = []
+        for line in self.stored("flags", ()):
+            tokens.extend(line if isinstance(line, tuple) else split_flags(line))
+        return tokens
+
+    def blow_tuples(self):
+        """ Returns the monster's blows as tuples of (method, effect, power) parts. """
+        blows = self.stored("blow", [])
+        return list(blows) if isinstance(blows, list) else [blows]
+
+    def key_set(self):
+        """ Shared frozenset of the attribute names. """
+        return self._layout.key_set
+
+    def stored_form(self):
+        """ (interned key tuple, stored values) — the record as written to a compiled snapshot. """
+        return self._layout.keys, self._values
+
+    @classmethod
+    def from_stored_form(cls, keys, values):
+        """ Rebuilds a record from `stored_form()` output without re-packing the values. """
+        record = cls.__new__(cls)
+        record._layout = _Layout.get(keys)
+        record._values = values
+        return record
+
+    def stored(self, key, default=None):
+        """ Returns the compact stored value (int for numeric fields, tuples for flags and blows) without conversion. """
+        position = self._layout.index.get(key)
+        return default if position is None else self._values[position]
+
+    def __getitem__(self, key):
+        position = self._layout.index.get(key)
+        if position is None:
+            raise KeyError(key)
+        return _unpack(key, self._values[position])
+
+    def __setitem__(self, key, value):
+        position = self._layout.index.get(key)
+        if position is None:
+            self._layout = self._layout.with_key(key)
+            self._values.append(_pack(key, value))
+        else:
+            self._values[position] = _pack(key, value)
+
+    def __delitem__(self, key):
+        position = self._layout.index.get(key)
+        if position is None:
+            raise KeyError(key)
+        self._layout = self._layout.without_key(key)
+        del self._values[position]
+
+    def __contains__(self, key):
+        return key in self._layout.index
+
+    def __iter__(self):
+        return iter(self._layout.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -0,0 +1,83 @@
+def split_line(line):
+    """ The attribute key of a record line, or None for blank, comment and other lines the parser skips. """
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#") or ":" not in stripped:
+        return None
+    return stripped.split(":", 1)[0].strip()
+
+
+def _value_bounds(line):
+    """ (start, end) of the value text on a `key:value` line, leaving indentation, spacing and line ending outside. """
+    start = line.index(":") + 1
+    while start < len(line) and line[start] in " \t":
+        start += 1
+    return start, max(start, len(line.rstrip()))
+
+
+def _text_values(value):
+    return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+
+
+class RecordSyntax:
+    """ One `name:` block exactly as written: every line, and which lines hold which attribute.
+
+    `render` applies a record's current attributes to it as targeted line edits. Lines whose
+    value is unchanged are kept byte for byte, so comments, blank lines, key order,
+    interleaved repeated keys, spacing and line endings survive an edit.
+    """
+
+    __slots__ = ("lines", "keys", "last")
+
+    def __init__(self, text):
+        self.lines = text.split("\n")
+        self.keys = {}  # key -> indices of its lines, in file order
+        self.last = 0  # index of the last attribute line; new attributes go after it
+        for index, line in enumerate(self.lines):
+            key = split_line(line)
+            if key is not None:
+                self.keys.setdefault(key, []).append(index)
+                self.last = index
+
+    def values(self, key):
+        """ The text values of `key`'s lines, as the parser reads them. """
+        return [self._value(index) for index in self.keys.get(key, ())]
+
+    def _value(self, index):
+        start, end = _value_bounds(self.lines[index])
+        return self.lines[index][start:end]
+
+    def edits(self, name, attributes):
+        """ {line index: new text, or None to drop the line} and {line index: lines to insert after it}. """
+        wanted = {"name": [name]}
+        for key, value in attributes.items():
+            if key != "original_name":
+                wanted[key] = _text_values(value)
+
+        replaced, inserted = {}, {}
+        ending = "\r" if self.lines[0].endswith("\r") else ""  # ✅ Keep CRLF files CRLF
+        for key, indices in self.keys.items():
+            values = wanted.pop(key, [])
+            for index, value in zip(indices, values):
+                if self._value(index) != value:
+                    start, end = _value_bounds(self.lines[index])
+                    replaced[index] = self.lines[index][:start] + value + self.lines[index][end:]
+            for index in indices[len(values):]:
+                replaced[index] = None
+            if len(values) > len(indices):
+                inserted.setdefault(indices[-1], []).extend(f"{key}:{value}{ending}" for value in values[len(indices):])
+        for key, values in wanted.items():
+            inserted.setdefault(self.last, []).extend(f"{key}:{value}{ending}" for value in values)
+        return replaced, inserted
+
+    def render(self, name, attributes):
+        """ The block's text with `attributes` (and `name`) applied; the original text if nothing changed. """
+        replaced, inserted = self.edits(name, attributes)
+        if not replaced and not inserted:
+            return "\n".join(self.lines)
+        lines = []
+        for index, line in enumerate(self.lines):
+            line = replaced.get(index, line)
+            if line is not None:
+                lines.append(line)
+            lines.extend(inserted.get(index, ()))
+        return "\n".join(lines)
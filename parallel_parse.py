@@ -0,0 +1,82 @@
+import marshal
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import get_logger, profiler
+from monster_index import record_starts, split_records
+from monster_record import Monster
+
+log = get_logger("parallel_parse")
+
+# Files smaller than this are parsed (or validated) in-process; starting workers costs more than it saves
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+CHUNKS_PER_WORKER = 4  # ✅ Smaller chunks even out workers that draw record-heavy ranges
+
+MARSHAL_VERSION = 4
+
+
+def parallel_workers(filepath, workers=None):
+    """ How many processes to parse `filepath` with: 1 (serial) for small files or a single CPU. """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return 1
+    try:
+        size = os.path.getsize(filepath)
+    except OSError:
+        return 1
+    return workers if size >= PARALLEL_MIN_BYTES else 1
+
+
+def chunk_ranges(data, workers):
+    """ (start, end) byte ranges of a mapped monster file to spread over `workers` processes (one if serial). """
+    return split_records(data, workers * CHUNKS_PER_WORKER if workers > 1 else 1)
+
+
+def parse_parallel(filepath, workers):
+    """ Parses every record of `filepath` in a process pool.
+
+    The file is split at `name:` lines, each worker parses its byte ranges exactly as the
+    serial parser parses a block, and the results come back as marshalled stored forms.
+    Returns (names, entry starts, block starts, records, flags) for MonsterIndex.restore:
+    as with the serial scan a later duplicate name replaces the earlier record in place,
+    and `flags` are those of the records kept.
+    """
+    with open(filepath, "rb") as file:
+        try:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                ranges = chunk_ranges(data, workers)
+        except ValueError:
+            ranges = []  # ✅ Empty file
+
+    with profiler.span("parallel parse"), ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_parse_chunk, [(filepath, start, end) for start, end in ranges]))
+
+    starts, entries, records = [], {}, {}
+    for payload in results:
+        for start, name, keys, values in marshal.loads(payload):
+            starts.append(start)
+            entries[name] = start
+            records[name] = Monster.from_stored_form(keys, values)
+    names = tuple(entries)
+    kept = [records[name] for name in names]
+    flags = {flag for record in kept for flag in record.flag_tokens()}
+    profiler.count("records parsed in parallel", len(starts))
+    log.info(f"Parsed {len(starts)} records in {len(ranges)} chunks with {workers} workers")
+    return names, tuple(entries.values()), starts, kept, flags
+
+
+def _parse_chunk(task):
+    """ Parses the `name:` blocks starting in one byte range; returns marshalled (start, name, keys, values) rows. """
+    from monster_parser import parse_attributes  # ✅ Imported in the worker; the parser imports this module
+
+    filepath, start, end = task
+    rows = []
+    flags = set()  # ✅ Collected again from the kept records in the parent
+    with open(filepath, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        block_starts = record_starts(data, start, end)
+        for block_start, block_end in zip(block_starts, block_starts[1:] + [end]):
+            name, attributes = parse_attributes(data[block_start:block_end].decode("utf-8").split("\n"), flags)
+            keys, values = Monster(attributes).stored_form()
+            rows.append((block_start, name, keys, values))
+    return marshal.dumps(rows, MARSHAL_VERSION)
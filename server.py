@@ -0,0 +1,302 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import time
+
+from batch_editor import BatchEditor, PatchError
+from editor import MonsterEditor
+from instrumentation import get_logger
+from monster_parser import MonsterParser
+
+log = get_logger("server")
+
+DEFAULT_FLUSH_INTERVAL = 5.0  # seconds between batched saves
+MAX_LIST = 1000  # most names returned by one `list` call
+RELOAD = object()  # queued by the flusher when monster.txt or the game data changed on disk
+
+
+class RequestError(Exception):
+    """ Raised by a handler for a request the server understood but cannot satisfy. """
+
+
+class MonsterServer:
+    """ Keeps a parsed monster.txt and the game data in memory and serves them over a local socket.
+
+    The protocol is one JSON object per line in each direction:
+
+        → {"id": 1, "method": "get", "params": {"monster": "Grip, Farmer Maggot's Dog"}}
+        ← {"id": 1, "result": {"name": "...", "speed": 120, ...}}
+
+    Read methods (ping, get, list, search, stats) are answered directly on the event loop, so
+    any number of clients are served concurrently. Edits (`edit`, with operations in the batch
+    patch format) go through one writer task that applies them with BatchEditor — the same
+    validation and rename logic as the editor — and marks the file dirty. The writer saves at
+    most once per `flush_interval`, or immediately on `commit`; `validate` commits first and
+    checks the saved file.
+    """
+
+    def __init__(self, monster_file, game_data_loader, flush_interval=DEFAULT_FLUSH_INTERVAL, snapshot=True):
+        self.monster_parser = MonsterParser(monster_file, snapshot=snapshot)  # ✅ Eager: every read is served from memory
+        self.game_data_loader = game_data_loader
+        self.editor = MonsterEditor(self.monster_parser, game_data_loader)
+        self.batch_editor = BatchEditor(self.monster_parser, self.editor)
+        self.monster_parser.watch()  # ✅ Outside rewrites are picked up record by record, see _flusher
+        self.flush_interval = flush_interval
+        self.unsaved = 0  # edits applied since the last save
+        self.saves = 0
+        self._writes = None  # asyncio.Queue of (operation list | None for commit, future)
+        self._stopping = None
+        self._query = None
+        self._readers = {
+            "ping": self.ping,
+            "get": self.get,
+            "list": self.list,
+            "search": self.search,
+            "stats": self.stats,
+        }
+
+    # ----- read methods -----
+
+    def ping(self, params):
+        return {"monsters": len(self.monster_parser.monsters), "unsaved": self.unsaved, "saves": self.saves}
+
+    def get(self, params):
+        name = self._param(params, "monster")
+        if name not in self.monster_parser.monsters:
+            suggestions = self.editor.suggest_monsters(name, k=3)
+            raise RequestError(f"Monster '{name}' not found." +
+                               (f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""))
+        record = self.monster_parser.monsters[name]
+        return {"name": name, **{key: value for key, value in record.items() if key != "original_name"}}
+
+    def list(self, params):
+        """ Monster names in file order, or those matching a query filter (`depth 20..40, EVIL`). """
+        offset, limit = int(params.get("offset", 0)), min(int(params.get("limit", MAX_LIST)), MAX_LIST)
+        expression = params.get("filter")
+        if expression:
+            names = self.query().select(expression)
+        else:
+            names = list(self.monster_parser.monsters)
+        return {"total": len(names), "names": names[offset:offset + limit]}
+
+    def search(self, params):
+        """ Prefix, substring and typo-tolerant matches for a (partial) monster name. """
+        return self.editor.suggest_monsters(self._param(params, "query"), k=int(params.get("k", 10)))
+
+    def stats(self, params):
+        query = self.query()
+        mask = query.where(params.get("filter", ""))
+        return {field: query.stats(field, mask) for field in params.get("fields", ["depth", "speed", "hit-points"])}
+
+    def query(self):
+        if self._query is None:
+            try:
+                from monster_query import MonsterQuery
+            except ImportError:
+                raise RequestError("Filters need NumPy. Install it with: pip install numpy")
+            self._query = MonsterQuery(self.monster_parser)
+        return self._query
+
+    @staticmethod
+    def _param(params, name):
+        value = params.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise RequestError(f"Missing '{name}'.")
+        return value.strip()
+
+    # ----- the single writer -----
+
+    async def _writer(self):
+        """ Applies queued edits and commits one at a time, so no two writes ever interleave. """
+        while True:
+            operations, future = await self._writes.get()
+            try:
+                if operations is None:
+                    result = self._save()
+                elif operations is RELOAD:
+                    result = self._reload()
+                else:
+                    result = self._apply(operations)
+            except Exception as e:  # ✅ A failed save must not kill the writer
+                log.error(f"❌ Write failed: {e}")
+                result = e
+            if future is not None and not future.done():
+                if isinstance(result, Exception):
+                    future.set_exception(RequestError(str(result)))
+                else:
+                    future.set_result(result)
+
+    def _apply(self, operations):
+        results = []
+        for operation in operations:
+            try:
+                self.batch_editor.apply_operation(operation)
+                self.unsaved += 1
+                results.append({"ok": True})
+            except PatchError as e:
+                results.append({"ok": False, "error": str(e)})
+        return results
+
+    def _save(self):
+        if not self.unsaved:
+            return {"saved": 0}
+        saved, self.unsaved = self.unsaved, 0
+        self.monster_parser.save_monsters()
+        self.saves += 1
+        return {"saved": saved}
+
+    def _reload(self):
+        report = self.monster_parser.reload() if self.monster_parser.source_changed() else None
+        changed = self.game_data_loader.reload()
+        if report:
+            log.info(f"🔄 {self.monster_parser.filepath} changed on disk: {report.summary()}")
+        if changed:
+            log.info(f"🔄 Game data reloaded ({', '.join(changed)} changed)")
+        return report
+
+    async def _flusher(self):
+        """ Every `flush_interval`: picks up outside changes to the files, then saves pending edits. """
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.monster_parser.source_changed() or self.game_data_loader.changed_files():
+                await self._write(RELOAD)
+            if self.unsaved:
+                await self._write(None)
+
+    async def _write(self, operations):
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operations, future))
+        return await future
+
+    # ----- requests -----
+
+    async def handle(self, request):
+        """ Dispatches one decoded request to its method and returns the result. """
+        method = request.get("method")
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            raise RequestError("'params' must be an object.")
+        reader = self._readers.get(method)
+        if reader is not None:
+            return reader(params)
+        if method == "edit":
+            operations = params.get("operations", [params] if "op" in params else None)
+            if not isinstance(operations, list) or not operations:
+                raise RequestError("'edit' needs an operation or an 'operations' list.")
+            return await self._write(operations)
+        if method == "commit":
+            return await self._write(None)
+        if method == "validate":
+            return await self._validate()
+        if method == "shutdown":
+            self._stopping.set()
+            return {"stopping": True}
+        raise RequestError(f"Unknown method '{method}'.")
+
+    async def _validate(self):
+        from validator import MonsterValidator
+
+        await self._write(None)  # ✅ Validate what is on disk, including every edit so far
+        validator = MonsterValidator(self.game_data_loader)
+        report = await asyncio.get_running_loop().run_in_executor(
+            None, validator.validate, self.monster_parser.filepath, 1)
+        return {"monsters": report.monster_count, "counts": report.counts(),
+                "issues": [issue.as_dict() for issue in report.issues[:MAX_LIST]]}
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = {}
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise RequestError("Request must be a JSON object.")
+                    response["id"] = request.get("id")
+                    response["result"] = await self.handle(request)
+                except (RequestError, ValueError, KeyError, TypeError) as e:
+                    response.pop("result", None)
+                    response["error"] = str(e)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # ----- lifecycle -----
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=None, ready=None):
+        """ Serves until `shutdown` or SIGINT/SIGTERM, then saves any pending edits. """
+        self._writes = asyncio.Queue()
+        self._stopping = asyncio.Event()
+        if port is None:
+            if os.path.lexists(socket_path):
+                if not stale_socket(socket_path):
+                    raise FileExistsError(f"{socket_path} is in use or is not a socket; refusing to replace it.")
+                os.remove(socket_path)  # ✅ Left behind by a server that did not shut down cleanly
+            server = await asyncio.start_unix_server(self._connection, path=socket_path)
+            address = socket_path
+        else:
+            server = await asyncio.start_server(self._connection, host=host, port=port)
+            address = "%s:%d" % server.sockets[0].getsockname()[:2]
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._stopping.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # ✅ Not available on Windows or outside the main thread
+
+        tasks = [asyncio.create_task(self._writer()), asyncio.create_task(self._flusher())]
+        log.info(f"✅ Serving {len(self.monster_parser.monsters)} monsters from {self.monster_parser.filepath} "
+                 f"on {address}")
+        if ready is not None:
+            ready(address)
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            tasks[1].cancel()
+            if self.unsaved:
+                await self._write(None)
+            tasks[0].cancel()
+            if port is None and stale_socket(socket_path):
+                os.remove(socket_path)  # ✅ Not if another server has taken the path over since
+        log.info(f"✅ Server stopped after {self.saves} saves")
+
+
+def stale_socket(path):
+    """ True if `path` is a Unix socket nobody is listening on, so it is safe to remove. """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+    except OSError:
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            return True
+        except OSError:
+            return False
+    return False  # ✅ A live server answered
+
+
+def default_socket_path(monster_file):
+    return os.path.abspath(monster_file) + ".sock"
+
+
+def run(monster_file, game_data_loader, socket_path=None, port=None, flush_interval=DEFAULT_FLUSH_INTERVAL,
+        snapshot=True):
+    """ Loads the files once and serves them until stopped. """
+    start = time.perf_counter()
+    server = MonsterServer(monster_file, game_data_loader, flush_interval, snapshot)
+    log.info(f"Loaded in {time.perf_counter() - start:.2f}s")
+    asyncio.run(server.serve(socket_path or default_socket_path(monster_file), port=port))
+    return 0
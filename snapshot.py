@@ -0,0 +1,92 @@
+import gc
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+from instrumentation import get_logger, profiler
+from monster_record import Monster
+
+log = get_logger("snapshot")
+
+SNAPSHOT_SUFFIX = ".mfesnap"
+MAGIC = b"MFESNAP\0"
+FORMAT_VERSION = 1
+MARSHAL_VERSION = 4  # ✅ Version 4 writes each shared object (interned string, layout tuple) once and refers back to it
+
+# magic, format version, Python major/minor (marshal output is only guaranteed within one version), source digest
+_HEADER = struct.Struct("<8sHBB16s")
+
+
+def snapshot_path(filepath):
+    return filepath + SNAPSHOT_SUFFIX
+
+
+def write_snapshot(filepath, digest, names, entry_starts, starts, records, flags, friends_state):
+    """ Writes the compiled snapshot of a parsed monster file next to it (atomically).
+
+    The payload is one marshal blob: the name table, record and block offsets, the flags the
+    parse contributed, the friends index, and every record's key layout and stored values.
+    Keys, flag tokens and short values are interned, so marshal stores each of them once — the
+    string tables — and every record refers back to them.
+    """
+    path = snapshot_path(filepath)
+    temp_path = path + ".tmp"
+    payload = (names, entry_starts, starts, tuple(sorted(flags)), friends_state,
+               [record.stored_form() for record in records])
+    with profiler.span("snapshot write"):
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, *sys.version_info[:2], digest))
+                marshal.dump(payload, file, MARSHAL_VERSION)
+            os.replace(temp_path, path)
+        except OSError as e:
+            log.warning(f"⚠️ Warning: Could not write snapshot {path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+    log.info(f"✅ Snapshot written: {path}")
+    return True
+
+
+def read_snapshot(filepath, digest):
+    """ Returns (names, entry starts, block starts, flags, friends state, records) if fresh for `digest`, else None.
+
+    The snapshot is memory-mapped and unmarshalled straight from the map; a missing, stale
+    (different source digest), foreign (other Python version) or damaged snapshot yields None.
+    """
+    path = snapshot_path(filepath)
+    try:
+        file = open(path, "rb")
+    except OSError:
+        return None
+    with profiler.span("snapshot read"), file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+        with data:
+            if len(data) < _HEADER.size:
+                return None
+            magic, version, major, minor, source_digest = _HEADER.unpack_from(data)
+            if (magic, version, (major, minor)) != (MAGIC, FORMAT_VERSION, sys.version_info[:2]):
+                log.info(f"Snapshot {path} has an old format; rebuilding it")
+                return None
+            if source_digest != digest:
+                log.info(f"Snapshot {path} is stale; rebuilding it")
+                return None
+            # ✅ Nothing loaded here can form a cycle, so skip the collector passes the allocations would trigger
+            collecting = gc.isenabled()
+            gc.disable()
+            try:
+                with memoryview(data) as view:
+                    names, entry_starts, starts, flags, friends_state, stored = marshal.loads(view[_HEADER.size:])
+                records = [Monster.from_stored_form(keys, values) for keys, values in stored]
+            except (EOFError, ValueError, TypeError):
+                log.warning(f"⚠️ Warning: Snapshot {path} is damaged; rebuilding it")
+                return None
+            finally:
+                if collecting:
+                    gc.enable()
+    return names, entry_starts, starts, flags, friends_state, records
@@ -0,0 +1,941 @@
+from pathlib import Path
+
+import pytest
+
+from monster_parser import MonsterParser
+
+SAMPLE_MONSTERS = """# Monster file header
+# comments are ignored by the parser
+
+name:Grip, Farmer Maggot's Dog
+base:canine
+color:U
+speed:120
+hit-points:15
+blow:BITE:HURT:1d6
+flags:UNIQUE
+flags:RAND_25
+depth:2
+rarity:1
+experience:30
+desc:A rather vicious dog belonging to Farmer Maggot.
+
+name:Fang, Farmer Maggot's Dog
+base:canine
+color:U
+speed:120
+hit-points:28
+blow:BITE:HURT:1d8
+flags:UNIQUE | RAND_25
+depth:5
+rarity:1
+experience:30
+friends:100:1:Grip, Farmer Maggot's Dog
+desc:A rather vicious dog belonging to Farmer Maggot.
+desc:It is guarding the fields.
+
+name:Farmer Maggot
+base:person
+color:U
+speed:110
+hit-points:350
+blow:MOAN
+blow:MOAN
+flags:UNIQUE | MALE
+flags:NEVER_BLOW
+depth:2
+rarity:4
+experience:0
+friends:60:2d2:Grip, Farmer Maggot's Dog
+friends:60:2d2:Fang, Farmer Maggot's Dog
+desc:He's lost his dogs.
+"""
+
+
+@pytest.fixture
+def monster_file(tmp_path):
+    path = tmp_path / "monster.txt"
+    path.write_text(SAMPLE_MONSTERS, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def game_data_dir(tmp_path):
+    path = tmp_path / "gamedata"
+    path.mkdir()
+    (path / "blow_methods.txt").write_text("".join(f"name:{method}\n" for method in ["HIT", "BITE", "CLAW", "MOAN"]))
+    (path / "blow_effects.txt").write_text("".join(f"name:{effect}\n" for effect in ["HURT", "POISON", "TERRIFY"]))
+    (path / "object_property.txt").write_text("code:EVIL\ncode:NEVER_MOVE\n")
+    (path / "monster_property.txt").write_text("".join(f"code:{flag}\n" for flag in ["UNIQUE", "RAND_25", "MALE", "NEVER_BLOW"]))
+    return path
+
+
+def test_lazy_load_matches_eager_load(monster_file):
+    eager = MonsterParser(str(monster_file))
+    lazy = MonsterParser(str(monster_file), lazy=True)
+
+    assert list(lazy.monsters) == list(eager.monsters)
+    assert not any(lazy.monsters.is_loaded(name) for name in lazy.monsters)
+    assert lazy.monsters["Farmer Maggot"] == eager.monsters["Farmer Maggot"]
+    assert lazy.monsters.is_loaded("Farmer Maggot")
+    assert not lazy.monsters.is_loaded("Grip, Farmer Maggot's Dog")
+    assert eager.monsters["Fang, Farmer Maggot's Dog"]["desc"] == [
+        "A rather vicious dog belonging to Farmer Maggot.",
+        "It is guarding the fields.",
+    ]
+    assert {"UNIQUE", "RAND_25", "MALE", "NEVER_BLOW"} <= MonsterParser.valid_flags
+
+
+def test_lazy_rename_and_save(monster_file):
+    parser = MonsterParser(str(monster_file), lazy=True)
+    assert parser.rename_monster("Grip, Farmer Maggot's Dog", "Grip")
+    parser.save_monsters()
+
+    reloaded = MonsterParser(str(monster_file))
+    assert list(reloaded.monsters) == ["Grip", "Fang, Farmer Maggot's Dog", "Farmer Maggot"]
+    assert reloaded.monsters["Farmer Maggot"]["friends"][0] == "60:2d2:Grip"
+    assert reloaded.monsters["Grip"]["blow"] == "BITE:HURT:1d6"
+
+
+def test_save_only_rewrites_dirty_records(monster_file):
+    parser = MonsterParser(str(monster_file), lazy=True)
+    parser.monsters["Fang, Farmer Maggot's Dog"]["color"] = "r"
+    parser.mark_dirty("Fang, Farmer Maggot's Dog")
+    parser.save_monsters()
+
+    original_blocks = SAMPLE_MONSTERS.split("\n\n")
+    saved_blocks = monster_file.read_text(encoding="utf-8").split("\n\n")
+    assert saved_blocks[0] == original_blocks[0]
+    assert saved_blocks[1] == original_blocks[1]
+    assert saved_blocks[3] == original_blocks[3]
+    assert "color:r" in saved_blocks[2]
+    assert (monster_file.parent / "monster.txt.backup").read_text(encoding="utf-8") == SAMPLE_MONSTERS
+    assert not parser.monsters.is_loaded("Farmer Maggot")
+
+
+def test_save_without_changes_is_byte_identical(monster_file):
+    monster_file.chmod(0o644)
+    parser = MonsterParser(str(monster_file))
+    parser.save_monsters()
+    parser.save_monsters()
+    assert monster_file.read_text(encoding="utf-8") == SAMPLE_MONSTERS
+    assert monster_file.stat().st_mode & 0o777 == 0o644
+
+
+def test_save_keeps_symlinks_and_ownership(monster_file, tmp_path):
+    import os
+
+    real = tmp_path / "data" / "monster.txt"
+    real.parent.mkdir()
+    monster_file.replace(real)
+    monster_file.symlink_to(real)
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        os.chown(real, 1234, 5678)
+
+    parser = MonsterParser(str(monster_file), lazy=True)
+    parser.set_field("Farmer Maggot", "color", "r")
+    parser.save_monsters()
+    assert monster_file.is_symlink() and "color:r" in real.read_text(encoding="utf-8")
+    assert not list(real.parent.glob(".monster-*"))
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        assert (real.stat().st_uid, real.stat().st_gid) == (1234, 5678)
+
+
+def test_editor_marks_edited_monster_dirty(monster_file, monkeypatch):
+    from editor import MonsterEditor
+
+    parser = MonsterParser(str(monster_file), lazy=True)
+    editor = MonsterEditor(parser, game_data_loader=None)
+    answers = iter(["speed", "130", "done"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    editor.edit_monster("Farmer Maggot")
+
+    assert parser.monsters.dirty == {"Farmer Maggot"}
+    parser.save_monsters()
+    assert "name:Farmer Maggot\nbase:person\ncolor:U\nspeed:130\n" in monster_file.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_friends_reverse_index(monster_file, lazy):
+    parser = MonsterParser(str(monster_file), lazy=lazy)
+    assert sorted(parser.referrers_of("Grip, Farmer Maggot's Dog")) == [
+        ("Fang, Farmer Maggot's Dog", "100:1:Grip, Farmer Maggot's Dog"),
+        ("Farmer Maggot", "60:2d2:Grip, Farmer Maggot's Dog"),
+    ]
+    assert parser.dangling_friends() == []
+
+    parser.delete_monster("Fang, Farmer Maggot's Dog")
+    assert parser.dangling_friends() == [("Farmer Maggot", "60:2d2:Fang, Farmer Maggot's Dog")]
+
+    parser.add_monster("Fang", {"friends": ["100:1:Farmer Maggot"]})
+    assert parser.referrers_of("Farmer Maggot") == [("Fang", "100:1:Farmer Maggot")]
+
+
+def test_rename_only_touches_referrers(monster_file):
+    parser = MonsterParser(str(monster_file), lazy=True)
+    assert parser.rename_monster("Farmer Maggot", "Maggot")
+
+    assert parser.monsters.dirty == {"Maggot"}
+    assert not parser.monsters.is_loaded("Grip, Farmer Maggot's Dog")
+    assert parser.referrers_of("Grip, Farmer Maggot's Dog")[-1] == ("Maggot", "60:2d2:Grip, Farmer Maggot's Dog")
+
+    assert parser.rename_monster("Grip, Farmer Maggot's Dog", "Grip")
+    assert parser.monsters["Maggot"]["friends"] == ["60:2d2:Grip", "60:2d2:Fang, Farmer Maggot's Dog"]
+    assert parser.monsters["Fang, Farmer Maggot's Dog"]["friends"] == ["100:1:Grip"]
+    assert parser.referrers_of("Grip, Farmer Maggot's Dog") == []
+
+
+def test_fuzzy_index_suggestions_and_search():
+    from fuzzy_index import FuzzyIndex
+
+    index = FuzzyIndex(["EVIL", "UNIQUE", "NEVER_MOVE", "NEVER_BLOW", "IM_FIRE", "IM_COLD"])
+    assert index.suggest("UNIQEU", k=1) == ["UNIQUE"]
+    assert index.suggest("evil", k=1) == ["EVIL"]
+    assert index.suggest("NEVER_MOV", k=2)[0] == "NEVER_MOVE"
+    assert index.suggest("XYZZY") == []
+    assert index.prefix("never") == ["NEVER_BLOW", "NEVER_MOVE"]
+    assert index.substring("_co") == ["IM_COLD"]
+    assert index.substring("ve") == ["NEVER_BLOW", "NEVER_MOVE"]  # ✅ Same order for short and long queries
+    assert index.substring("never") == ["NEVER_BLOW", "NEVER_MOVE"]
+
+    index.discard("EVIL")
+    assert index.suggest("EVIL") == []
+
+
+def test_monster_name_suggestions_follow_renames(monster_file):
+    from editor import MonsterEditor
+
+    parser = MonsterParser(str(monster_file), lazy=True)
+    editor = MonsterEditor(parser, game_data_loader=None)
+    assert editor.suggest_monsters("Farmer Magot")[0] == "Farmer Maggot"
+    assert editor.suggest_monsters("grip") == ["Grip, Farmer Maggot's Dog"]
+    assert editor.suggest_correction("RAND_52", parser.valid_flags) == "RAND_25"
+
+    names = parser.monsters
+    assert editor.suggest_correction("Farmer Magot", names) == "Farmer Maggot"
+    parser.rename_monster("Grip, Farmer Maggot's Dog", "Grip")
+    assert editor.suggest_monsters("Grp")[0] == "Grip"
+    parser.rename_monster("Farmer Maggot", "Farmer Maggot the Hobbit")
+    assert editor.suggest_correction("Farmer Magot", names) == "Farmer Maggot the Hobbit"  # ✅ Same size, new names
+
+
+def test_batch_patch_applies_valid_operations(monster_file, game_data_dir, tmp_path):
+    import mfe
+
+    patch = tmp_path / "patch.jsonl"
+    patch.write_text("\n".join([
+        '{"op": "set", "monster": "Farmer Maggot", "field": "speed", "value": 115}',
+        '{"op": "set", "monster": "Farmer Maggot", "field": "depth", "value": "deep"}',
+        '{"op": "add_flag", "monster": "Farmer Maggot", "flag": "RAND_25"}',
+        '{"op": "remove_flag", "monster": "Farmer Maggot", "flag": "MALE"}',
+        '{"op": "add_blow", "monster": "Farmer Maggot", "method": "HIT", "effect": "TERRIFY"}',
+        '{"op": "edit_blow", "monster": "Farmer Maggot", "index": 1, "method": "BITE", "effect": "POISN"}',
+        '{"op": "remove_blow", "monster": "Farmer Maggot", "index": 2}',
+        '# comments are skipped',
+        '{"op": "rename", "monster": "Grip, Farmer Maggot\'s Dog", "new_name": "Grip"}',
+        '{"op": "set", "monster": "Frmer Maggot", "field": "color", "value": "r"}',
+    ]), encoding="utf-8")
+
+    assert mfe.main(["batch", str(monster_file), str(patch), "--gamedata", str(game_data_dir),
+                     "--log-file", str(tmp_path / "changes.log")]) == 1
+
+    parser = MonsterParser(str(monster_file))
+    maggot = parser.monsters["Farmer Maggot"]
+    assert maggot["speed"] == 115
+    assert maggot["depth"] == 2
+    assert maggot["flags"] == ["UNIQUE", "NEVER_BLOW", "RAND_25"]
+    assert maggot["blow"] == ["MOAN", "HIT:TERRIFY"]
+    assert maggot["friends"][0] == "60:2d2:Grip"
+    assert "Grip" in parser.monsters
+
+
+def test_batch_reports_errors_per_operation(monster_file, game_data_dir):
+    from batch_editor import BatchEditor
+    from editor import MonsterEditor
+    from game_data_loader import GameDataLoader
+
+    parser = MonsterParser(str(monster_file), lazy=True, journal=True)
+    batch = BatchEditor(parser, MonsterEditor(parser, GameDataLoader(str(game_data_dir))))
+    report = batch.apply(enumerate([
+        {"op": "add_blow", "monster": "Farmer Maggot", "method": "BITE", "effect": "POISN"},
+        {"op": "set", "monster": "Frmer Maggot", "field": "color", "value": "r"},
+        {"op": "explode", "monster": "Farmer Maggot"},
+        {"op": "add_blow", "monster": "Farmer Maggot", "method": "BITE"},
+        {"op": ["set"], "monster": "Farmer Maggot"},
+        {"op": "set", "monster": "Farmer Maggot", "field": "flags", "value": ["EVIL", 3]},
+    ], 1))
+
+    assert report.applied == 1
+    messages = [message for _, _, message in report.errors]
+    assert [line for line, _, _ in report.errors] == [1, 2, 3, 5, 6]  # ✅ Malformed values are reported, not raised
+    assert messages[0] == "Invalid blow effect 'POISN'. Did you mean 'POISON'?"
+    assert messages[1].startswith("Monster 'Frmer Maggot' not found. Did you mean: Farmer Maggot")
+    assert messages[2] == "Unknown operation 'explode'."
+    assert parser.monsters["Farmer Maggot"]["blow"] == ["MOAN", "MOAN", "BITE"]
+    assert parser.undo()["field"] == "blow"  # ✅ Batch edits are journaled like interactive ones
+    assert parser.monsters["Farmer Maggot"]["blow"] == ["MOAN", "MOAN"]
+
+
+def test_game_data_cache_reparses_only_changed_files(game_data_dir, monkeypatch):
+    import os
+    from game_data_loader import GameDataLoader
+
+    def read_blows(loader):
+        return loader.blow_methods, loader.blow_effects
+
+    cold = GameDataLoader(str(game_data_dir))
+    read_blows(cold)
+    assert cold.valid_flags == ["EVIL", "MALE", "NEVER_BLOW", "NEVER_MOVE", "RAND_25", "UNIQUE"]
+    assert (game_data_dir / ".mfe_cache.json").exists()
+
+    effects = game_data_dir / "blow_effects.txt"
+    effects.write_text(effects.read_text() + "name:PARALYZE\n")
+    os.utime(effects, ns=(0, 12345))
+
+    parsed = []
+    original_parse = GameDataLoader._parse_definitions
+    monkeypatch.setattr(GameDataLoader, "_parse_definitions",
+                        lambda self, path, filename: parsed.append(filename) or original_parse(self, path, filename))
+    warm = GameDataLoader(str(game_data_dir))
+    assert parsed == []  # ✅ Nothing is read until it is needed
+    assert warm.blow_methods == cold.blow_methods
+    assert warm.valid_flags == cold.valid_flags
+    assert warm.blow_effects[-1] == "PARALYZE"
+    assert parsed == ["blow_effects.txt"]
+
+    read_blows(GameDataLoader(str(game_data_dir), rebuild_cache=True))
+    read_blows(GameDataLoader(str(game_data_dir), use_cache=False))
+    assert parsed == ["blow_effects.txt", "blow_methods.txt", "blow_effects.txt", "blow_methods.txt", "blow_effects.txt"]
+
+
+def test_monster_record_is_compact_and_round_trips(monster_file):
+    from monster_record import Monster
+
+    parser = MonsterParser(str(monster_file))
+    fang = parser.monsters["Fang, Farmer Maggot's Dog"]
+    grip = parser.monsters["Grip, Farmer Maggot's Dog"]
+    assert isinstance(fang, Monster)
+    assert not hasattr(fang, "__dict__")
+    assert fang["speed"] == 120 and fang["hit-points"] == 28
+    assert fang["flags"] == ["UNIQUE | RAND_25"]
+    assert fang.flag_tokens() == ["UNIQUE", "RAND_25"]
+    assert fang.blow_tuples() == [("BITE", "HURT", "1d8")]
+    assert fang.flag_tokens()[0] is grip.flag_tokens()[0]
+
+    fang["flags"] = ["EVIL", "UNIQUE"]
+    fang["spell-power"] = "3"
+    del fang["desc"]
+    assert list(fang)[-1] == "spell-power"
+    assert parser.serialize_record("Fang", fang).endswith("flags:EVIL\nflags:UNIQUE\ndepth:5\nrarity:1\n"
+                                                          "experience:30\nfriends:100:1:Grip, Farmer Maggot's Dog\n"
+                                                          "spell-power:3\n")
+
+    odd = Monster({"original_name": "Odd", "speed": "+5", "flags": "A|B", "blow": "BEG"})
+    assert odd["speed"] == "+5" and odd["flags"] == ["A|B"] and odd["blow"] == "BEG"
+    assert odd.flag_tokens() == ["A", "B"]
+
+
+def test_query_filters_sorts_and_tracks_edits(monster_file):
+    from monster_query import MonsterQuery, QueryError
+
+    parser = MonsterParser(str(monster_file))
+    query = MonsterQuery(parser)
+    assert query.select("depth 2..5, UNIQUE, !MALE", sort_by="hit-points") == [
+        "Grip, Farmer Maggot's Dog", "Fang, Farmer Maggot's Dog"]
+    assert query.select("speed >= 120", sort_by="depth", descending=True) == [
+        "Fang, Farmer Maggot's Dog", "Grip, Farmer Maggot's Dog"]
+    assert query.stats("hit-points") == {"count": 3, "min": 15, "max": 350, "mean": 131.0}
+    assert query.histogram("depth", band=5) == [(0, 2), (5, 1)]
+    assert query.flag_mask(all_of=["UNIQUE", "RAND_25"]).sum() == 2
+
+    parser.monsters["Farmer Maggot"]["speed"] = 130
+    parser.monsters["Farmer Maggot"]["flags"] = ["EVIL", "UNIQUE"]
+    parser.mark_dirty("Farmer Maggot")
+    assert query.select("speed > 125, EVIL") == ["Farmer Maggot"]
+
+    parser.rename_monster("Farmer Maggot", "Maggot")
+    assert query.select("EVIL") == ["Maggot"]
+    parser.delete_monster("Maggot")
+    assert query.select("") == ["Grip, Farmer Maggot's Dog", "Fang, Farmer Maggot's Dog"]
+
+    with pytest.raises(QueryError):
+        query.where("speed is fast")
+
+
+def test_query_commands_explain_missing_numpy(monster_file, tmp_path, monkeypatch, capsys):
+    import sys
+
+    import mfe
+
+    monkeypatch.setitem(sys.modules, "numpy", None)  # ✅ Makes `import numpy` fail
+    for module in ("monster_query", "bulk_transform"):
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    log_file = str(tmp_path / "changes.log")
+    assert mfe.main(["query", str(monster_file), "UNIQUE", "--log-file", log_file]) == 1
+    assert mfe.main(["transform", str(monster_file), "--set", "speed=speed+1", "--log-file", log_file]) == 1
+    output = capsys.readouterr().out
+    assert "Queries need NumPy" in output and "Transforms need NumPy" in output
+
+
+def test_bulk_transform_previews_and_applies(monster_file):
+    from bulk_transform import BulkTransform, TransformError
+    from monster_query import MonsterQuery
+
+    parser = MonsterParser(str(monster_file), journal=True)
+    query = MonsterQuery(parser)
+    transform = BulkTransform(query)
+
+    plan = transform.run("UNIQUE, depth < 5", {"hit-points": "hit_points * 1.1", "speed": "min(speed, 115)"},
+                         dry_run=True)
+    assert sorted(plan.rows()) == [
+        ("Farmer Maggot", "hit-points", 350, 385),
+        ("Grip, Farmer Maggot's Dog", "hit-points", 15, 17),  # ✅ 16.5 rounds half up
+        ("Grip, Farmer Maggot's Dog", "speed", 120, 115),
+    ]
+    assert parser.monsters["Farmer Maggot"]["hit-points"] == 350
+    assert [new for *_, new in transform.plan("", {"speed": "speed + 0.5"}).rows()] == [121, 121, 111]  # ✅ Halves up
+
+    plan = transform.run("", {"experience": "experience - 10", "depth": "depth * 2"})
+    assert plan.errors == [("Farmer Maggot", "experience", "result is not a non-negative whole number")]
+    assert query.select("depth >= 10") == ["Fang, Farmer Maggot's Dog"]
+
+    reloaded = MonsterParser(str(monster_file))
+    assert [reloaded.monsters[name]["experience"] for name in reloaded.monsters] == [20, 20, 0]
+    assert reloaded.monsters["Grip, Farmer Maggot's Dog"]["depth"] == 4
+    entry = parser.undo()  # ✅ The whole transform is one journal entry
+    assert entry["op"] == "bulk" and len(entry["changes"]) == 5
+    assert sum(parser.monsters[name]["depth"] for name in parser.monsters) == 2 + 5 + 2
+    assert [parser.monsters[name]["experience"] for name in parser.monsters] == [30, 30, 0]
+    assert query.select("depth >= 5") == ["Fang, Farmer Maggot's Dog"]  # ✅ Undo patches the query columns
+
+    for bad in ({"color": "1"}, {"speed": "__import__('os')"}, {"speed": "speed if speed else 1"}):
+        with pytest.raises(TransformError):
+            transform.plan("", bad)
+
+
+BROKEN_MONSTER = """
+name:Grip, Farmer Maggot's Dog
+speed:fast
+blow:BITE:HURT:1d6
+blow:KICK:HURT:1d6
+blow:BITE:POISN:1d6
+blow:BITE
+blow:BITE
+flags:UNIQEU||EVIL
+friends:50:1:Wormtongue
+"""
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_validator_reports_every_problem_with_line_numbers(monster_file, game_data_dir, tmp_path, monkeypatch,
+                                                           workers):
+    import csv
+    import json
+
+    import mfe
+    import parallel_parse
+    import validator
+
+    from game_data_loader import GameDataLoader
+
+    monkeypatch.setattr(parallel_parse, "PARALLEL_MIN_BYTES", 0)
+    monster_file.write_text(SAMPLE_MONSTERS + BROKEN_MONSTER, encoding="utf-8")
+    lines = monster_file.read_text(encoding="utf-8").splitlines()
+    line_of = {line: number for number, line in reversed(list(enumerate(lines, 1)))}
+
+    checker = validator.MonsterValidator(GameDataLoader(str(game_data_dir)))
+    report = checker.validate(str(monster_file), workers=workers)
+
+    assert report.monster_count == 4
+    assert [(issue.line, issue.check) for issue in report.issues] == [
+        (len(SAMPLE_MONSTERS.splitlines()) + 2, "duplicate-name"),
+        (line_of["speed:fast"], "not-an-integer"),
+        (line_of["blow:KICK:HURT:1d6"], "invalid-blow-method"),
+        (line_of["blow:BITE:POISN:1d6"], "invalid-blow-effect"),
+        (line_of["blow:BITE"] + 1, "too-many-blows"),
+        (line_of["flags:UNIQEU||EVIL"], "unknown-flag"),  # ✅ A typo, though the file uses UNIQUE elsewhere
+        (line_of["friends:50:1:Wormtongue"], "dangling-friend"),
+    ]
+    assert report.issues[0].message == "'Grip, Farmer Maggot's Dog' is already defined on line 4."
+    assert report.issues[5].message == "'UNIQEU' is not a recognized flag."
+
+    assert mfe.main(["validate", str(monster_file), "--gamedata", str(game_data_dir),
+                     "--report", str(tmp_path / "report.csv"), "--workers", str(workers),
+                     "--log-file", str(tmp_path / "changes.log")]) == 1
+    with open(tmp_path / "report.csv", newline="", encoding="utf-8") as file:
+        checks = [row["check"] for row in csv.DictReader(file)]
+    # ✅ The game data defines the sample's flags, so only the typo is reported
+    assert checks.count("unknown-flag") == 1 and "dangling-friend" in checks
+    allowing = validator.MonsterValidator(GameDataLoader(str(game_data_dir)), allowed_flags={"UNIQEU"})
+    assert "unknown-flag" not in [issue.check for issue in allowing.validate(str(monster_file), workers).issues]
+
+    monster_file.write_text(SAMPLE_MONSTERS, encoding="utf-8")
+    report = checker.validate(str(monster_file), workers=workers)
+    assert report.issues == []
+    report.write(str(tmp_path / "report.json"))
+    assert json.loads((tmp_path / "report.json").read_text())["monsters"] == 3
+
+
+def test_journal_undo_redo_recovery_and_compaction(monster_file, monkeypatch):
+    import json
+
+    from editor import MonsterEditor
+
+    parser = MonsterParser(str(monster_file), lazy=True, journal=True)
+    editor = MonsterEditor(parser, game_data_loader=None)
+    answers = iter(["speed", "130", "color", "r", "", "undo", "redo", "name", "Maggot", "done"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    editor.edit_monster("Farmer Maggot")
+
+    journal_path = monster_file.parent / "monster.txt.journal"
+    ops = [json.loads(line)["op"] for line in journal_path.read_text(encoding="utf-8").splitlines()]
+    assert ops == ["base", "set", "set", "undo", "redo", "rename"]
+    assert parser.undo()["op"] == "rename" and parser.undo()["field"] == "color"
+    assert parser.monsters["Farmer Maggot"]["color"] == "U"
+
+    # ✅ Simulate a crash: nothing was saved, a new session replays the journal
+    recovered = MonsterParser(str(monster_file), lazy=True, journal=True)
+    assert recovered.recovered == 7
+    assert recovered.monsters["Farmer Maggot"]["speed"] == 130
+    assert recovered.monsters["Farmer Maggot"]["color"] == "U"
+    assert recovered.redo()["field"] == "color"
+    assert recovered.monsters["Farmer Maggot"]["color"] == "r"
+
+    recovered.save_monsters()
+    assert not (monster_file.parent / "monster.txt.backup").exists()
+    lines = journal_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["op"] for line in lines] == ["set", "set", "base"]
+
+    # ✅ After a save nothing is replayed, but the saved edits can still be undone
+    reopened = MonsterParser(str(monster_file), lazy=True, journal=True)
+    assert reopened.recovered == 0
+    assert reopened.monsters["Farmer Maggot"]["speed"] == 130
+    reopened.undo()
+    reopened.undo()
+    assert reopened.monsters["Farmer Maggot"]["speed"] == 110
+    reopened.save_monsters()
+    # ✅ Undoing every edit, the rename included, gives back the original file byte for byte
+    assert monster_file.read_text(encoding="utf-8") == SAMPLE_MONSTERS
+
+
+def test_synthetic_generator_writes_valid_linked_files(tmp_path):
+    import sys
+
+    sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+    from generate import generate
+    from game_data_loader import GameDataLoader
+    from validator import MonsterValidator
+
+    monster_path, game_data_path, names = generate(str(tmp_path), 300, seed=7)
+    assert generate(str(tmp_path / "again"), 300, seed=7)[2] == names
+
+    parser = MonsterParser(monster_path)
+    assert list(parser.monsters) == names
+    assert len(parser.friends_index) > 0 and parser.dangling_friends() == []
+    assert any(isinstance(monster.get("blow"), list) for monster in parser.monsters.values())
+
+    report = MonsterValidator(GameDataLoader(game_data_path)).validate(monster_path, workers=1)
+    assert report.issues == [] and report.monster_count == 300
+
+
+def test_quiet_startup_and_profile_report(monster_file, game_data_dir, tmp_path, capsys):
+    import json
+    import subprocess
+    import sys
+
+    import mfe
+
+    # ✅ Importing the parser no longer needs (or creates) a logs/ directory, yet its warnings still show
+    script = "import monster_parser; monster_parser.log.warning('careful'); monster_parser.log.info('chatter')"
+    result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, check=True, capture_output=True,
+                            text=True, env={"PYTHONPATH": str(Path(__file__).parent)})
+    assert result.stderr == "careful\n"
+    assert not (tmp_path / "logs").exists()
+
+    profile = tmp_path / "profile.json"
+    log_file = tmp_path / "logs" / "changes.log"
+    assert mfe.main(["validate", str(monster_file), "--gamedata", str(game_data_dir), "--log-file", str(log_file),
+                     "--profile", str(profile)]) == 0
+    output = capsys.readouterr()
+    assert "Valid Flags" not in output.out + output.err and "Checking file" not in output.out + output.err
+    report = json.loads(profile.read_text())
+    assert {"read", "validation"} <= set(report["spans"])
+    assert report["counters"]["records validated"] == 3
+    assert report["spans"]["validation"]["allocated_bytes"] >= 0
+
+    parser = MonsterParser(str(monster_file))
+    parser.set_field("Farmer Maggot", "speed", 115)
+    parser.rename_monster("Grip, Farmer Maggot's Dog", "Grip")
+    parser.save_monsters()
+    assert "Updating friend reference" not in capsys.readouterr().out
+    changes = log_file.read_text(encoding="utf-8")
+    assert "Farmer Maggot: speed 110 → 115" in changes and "(3 monsters changed)" in changes
+
+
+def test_compiled_snapshot_is_reused_until_the_source_changes(monster_file, monkeypatch):
+    snapshot = monster_file.parent / "monster.txt.mfesnap"
+    parsed = MonsterParser(str(monster_file))
+    assert snapshot.exists()
+
+    def no_parsing(self, lines):
+        raise AssertionError("a fresh snapshot must not be parsed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(MonsterParser, "parse_record", no_parsing)
+        loaded = MonsterParser(str(monster_file))
+    assert list(loaded.monsters.items()) == list(parsed.monsters.items())
+    assert loaded.referrers_of("Grip, Farmer Maggot's Dog") == parsed.referrers_of("Grip, Farmer Maggot's Dog")
+    assert loaded.monsters["Fang, Farmer Maggot's Dog"].flag_tokens() == ["UNIQUE", "RAND_25"]
+
+    loaded.monsters.mark_dirty("Fang, Farmer Maggot's Dog")
+    loaded.save_monsters()
+    assert monster_file.read_text(encoding="utf-8") == SAMPLE_MONSTERS
+
+    loaded.set_field("Fang, Farmer Maggot's Dog", "speed", 125)
+    loaded.save_monsters()
+    assert MonsterParser(str(monster_file)).monsters["Fang, Farmer Maggot's Dog"]["speed"] == 125  # ✅ stale: re-parsed
+
+    snapshot.write_bytes(snapshot.read_bytes()[:40])
+    assert MonsterParser(str(monster_file)).monsters["Farmer Maggot"]["hit-points"] == 350
+    assert len(snapshot.read_bytes()) > 40
+
+
+def test_server_serves_reads_and_batches_edits(monster_file, game_data_dir):
+    import asyncio
+    import threading
+
+    from game_data_loader import GameDataLoader
+    from mfe_client import MonsterClient, ServerError
+    from server import MonsterServer
+
+    server = MonsterServer(str(monster_file), GameDataLoader(str(game_data_dir)), flush_interval=3600)
+    socket_path = str(monster_file) + ".sock"
+    ready = threading.Event()
+    thread = threading.Thread(target=asyncio.run, args=(server.serve(socket_path, ready=lambda address: ready.set()),))
+    thread.start()
+    assert ready.wait(10)
+
+    second = MonsterServer(str(monster_file), GameDataLoader(str(game_data_dir)))
+    for path in (socket_path, str(monster_file)):  # ✅ Neither a live server's socket nor a data file is replaced
+        with pytest.raises(FileExistsError):
+            asyncio.run(second.serve(path))
+    assert monster_file.read_text(encoding="utf-8") == SAMPLE_MONSTERS
+
+    with MonsterClient(socket_path) as client, MonsterClient(socket_path) as other:
+        assert client.call("get", monster="Farmer Maggot")["hit-points"] == 350
+        assert other.call("search", query="fang") == ["Fang, Farmer Maggot's Dog"]
+        assert client.call("list", limit=2)["names"] == ["Grip, Farmer Maggot's Dog", "Fang, Farmer Maggot's Dog"]
+        with pytest.raises(ServerError, match="Did you mean: Farmer Maggot"):
+            client.call("get", monster="Frmer Maggot")
+
+        results = client.call("edit", operations=[
+            {"op": "set", "monster": "Farmer Maggot", "field": "speed", "value": 115},
+            {"op": "rename", "monster": "Grip, Farmer Maggot's Dog", "new_name": "Grip"},
+            {"op": "add_blow", "monster": "Grip", "method": "BITE", "effect": "POISN"},
+        ])
+        assert [result["ok"] for result in results] == [True, True, False]
+        assert other.call("get", monster="Fang, Farmer Maggot's Dog")["friends"] == ["100:1:Grip"]
+        assert "speed:115" not in monster_file.read_text(encoding="utf-8")  # ✅ Batched until a flush or commit
+
+        assert client.call("commit") == {"saved": 2}
+        assert "speed:115" in monster_file.read_text(encoding="utf-8")
+        client.call("edit", op="set", monster="Grip", field="depth", value=3)
+        assert client.call("shutdown") == {"stopping": True}
+    thread.join(10)
+
+    assert not thread.is_alive()
+    assert MonsterParser(str(monster_file)).monsters["Grip"]["depth"] == 3  # ✅ Pending edits saved on shutdown
+
+
+def test_diff_and_three_way_merge_follow_renames(monster_file, game_data_dir, tmp_path):
+    import mfe
+    from monster_diff import diff_monsters
+
+    base = tmp_path / "base.txt"
+    base.write_text(SAMPLE_MONSTERS, encoding="utf-8")
+    theirs = tmp_path / "theirs.txt"
+    theirs.write_text(SAMPLE_MONSTERS.replace("speed:120\nhit-points:28", "speed:125\nhit-points:28")
+                      + "\nname:Wolf\nbase:canine\nfriends:50:1:Grip, Farmer Maggot's Dog\n", encoding="utf-8")
+
+    ours = MonsterParser(str(monster_file))
+    ours.rename_monster("Grip, Farmer Maggot's Dog", "Grip")
+    ours.set_field("Farmer Maggot", "hit-points", 400)
+    ours.set_field("Fang, Farmer Maggot's Dog", "hit-points", 30)
+    ours.delete_monster("Fang, Farmer Maggot's Dog") and ours.add_monster("Fang", {"depth": 1})
+    ours.save_monsters()
+
+    result = diff_monsters(MonsterParser(str(base)).monsters, MonsterParser(str(monster_file)).monsters)
+    assert result.renamed == {"Grip, Farmer Maggot's Dog": "Grip"}
+    assert result.removed == ["Fang, Farmer Maggot's Dog"] and result.added == ["Fang"]
+    assert result.changed == {"Farmer Maggot": {"hit-points": (350, 400)}}  # ✅ Retargeted friends are not changes
+
+    output = tmp_path / "merged.txt"
+    assert mfe.main(["merge", str(base), str(monster_file), str(theirs), "-o", str(output),
+                     "--log-file", str(tmp_path / "changes.log")]) == 1
+    merged = MonsterParser(str(output)).monsters
+    assert merged["Farmer Maggot"]["hit-points"] == 400
+    assert merged["Wolf"]["friends"] == ["50:1:Grip"]
+    assert merged["Fang"]["depth"] == 1
+    assert merged["Fang, Farmer Maggot's Dog"]["speed"] == 125  # ✅ Their edit of a record we deleted is kept
+    assert "Grip, Farmer Maggot's Dog" not in merged
+
+    # ✅ Read-only inputs get no snapshot files; only the file a command writes does
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    for path in (base, theirs, monster_file):
+        (inputs / path.name).write_bytes(path.read_bytes())
+    log_file = str(tmp_path / "changes.log")
+    mfe.main(["diff", str(inputs / "base.txt"), str(inputs / "theirs.txt"), "--log-file", log_file])
+    mfe.main(["validate", str(inputs / "theirs.txt"), "--gamedata", str(game_data_dir), "--log-file", log_file])
+    mfe.main(["merge", str(inputs / "base.txt"), str(inputs / "monster.txt"), str(inputs / "theirs.txt"),
+              "-o", str(inputs / "merged.txt"), "--log-file", log_file])
+    assert [path.name for path in inputs.glob("*.mfesnap")] == ["merged.txt.mfesnap"]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_reload_picks_up_outside_changes_and_keeps_local_edits(monster_file, lazy, monkeypatch):
+    import os
+
+    parser = MonsterParser(str(monster_file), lazy=lazy)
+    parser.watch()
+    parser.set_field("Farmer Maggot", "speed", 115)
+    parser.set_field("Grip, Farmer Maggot's Dog", "depth", 3)
+    assert not parser.source_changed()
+
+    outside = (SAMPLE_MONSTERS.replace("hit-points:28", "hit-points:30")
+               .replace("depth:2\nrarity:1", "depth:4\nrarity:1") + "\nname:Wolf\nbase:canine\n")
+    monster_file.with_name("outside.txt").write_text(outside, encoding="utf-8")
+    os.replace(monster_file.with_name("outside.txt"), monster_file)
+    assert parser.source_changed()
+
+    parsed = []
+    monkeypatch.setattr(parser.monsters, "_parse_record", lambda lines: parsed.append(lines[0]) or parser.parse_record(lines))
+    parser.save_monsters()  # ✅ Reloads before saving instead of overwriting the outside change
+
+    assert parsed == ["name:Fang, Farmer Maggot's Dog", "name:Wolf"]
+    saved = MonsterParser(str(monster_file), snapshot=False).monsters
+    assert saved["Fang, Farmer Maggot's Dog"]["hit-points"] == 30 and "Wolf" in saved
+    assert saved["Farmer Maggot"]["speed"] == 115
+    assert saved["Grip, Farmer Maggot's Dog"]["depth"] == 3  # ✅ Conflict: the local edit wins
+    assert not parser.source_changed()
+
+
+def test_flag_bitmasks_answer_set_queries_and_round_trip(monster_file, game_data_dir):
+    from editor import MonsterEditor
+    from game_data_loader import GameDataLoader
+    from monster_query import MonsterQuery
+
+    monster_file.write_text(SAMPLE_MONSTERS.replace("flags:UNIQUE | MALE", "flags:UNIQUE|MALE"), encoding="utf-8")
+    parser = MonsterParser(str(monster_file), snapshot=False)
+    assert {"UNIQUE", "MALE"} <= parser.valid_flags and "UNIQUE|MALE" not in parser.valid_flags
+    MonsterEditor(parser, GameDataLoader(str(game_data_dir)))
+
+    flags = parser.flag_index
+    assert flags.vocabulary.names[:6] == ["EVIL", "MALE", "NEVER_BLOW", "NEVER_MOVE", "RAND_25", "UNIQUE"]
+    query = MonsterQuery(parser)
+    assert query.flag_bits is flags.vocabulary.bits
+    assert query.select("UNIQUE, !RAND_25") == ["Farmer Maggot"]
+    assert flags.flags_of("Farmer Maggot") == sorted(["UNIQUE", "MALE", "NEVER_BLOW"], key=flags.vocabulary.bits.get)
+    assert flags.select(all_of={"UNIQUE", "RAND_25"}) == ["Grip, Farmer Maggot's Dog", "Fang, Farmer Maggot's Dog"]
+    assert flags.select(all_of={"UNIQUE"}, none_of={"RAND_25"}) == ["Farmer Maggot"]
+    assert flags.select(any_of={"MALE", "NEVER_MOVE"}) == ["Farmer Maggot"]
+    assert flags.select(all_of={"NO_SUCH_FLAG"}) == [] and flags.count(none_of={"MALE"}) == 2
+    assert flags.counts() == {"UNIQUE": 3, "RAND_25": 2, "MALE": 1, "NEVER_BLOW": 1}
+
+    before = monster_file.read_bytes()
+    for name in list(parser.monsters):
+        assert parser.set_flags(name, flags.mask_of(name)) is False  # ✅ Same set: the lines are untouched
+    parser.save_monsters()
+    assert monster_file.read_bytes() == before
+
+    parser.set_flags("Farmer Maggot", flags.mask_of("Farmer Maggot") & ~flags.vocabulary.mask(["MALE"])
+                     | flags.vocabulary.mask(["EVIL"]))
+    assert parser.monsters["Farmer Maggot"]["flags"] == ["UNIQUE", "NEVER_BLOW", "EVIL"]
+    assert flags.counts()["EVIL"] == 1 and "MALE" not in flags.counts()
+    assert query.select("EVIL") == ["Farmer Maggot"]
+
+
+def test_parallel_parse_matches_serial_parse(tmp_path, monkeypatch):
+    import parallel_parse
+
+    duplicate = SAMPLE_MONSTERS.replace("name:Farmer Maggot\n", "name:Grip, Farmer Maggot's Dog\n")
+    path = tmp_path / "merged.txt"
+    path.write_text("".join(SAMPLE_MONSTERS.replace("Farmer", f"Farmer{pack}") for pack in range(20)) + duplicate
+                    + "name:Lone\nflags:EVIL|ANIMAL\n", encoding="utf-8")
+
+    monkeypatch.setattr(MonsterParser, "valid_flags", set())
+    serial = MonsterParser(str(path), snapshot=False, workers=1)
+    serial_flags = set(MonsterParser.valid_flags)
+    assert "EVIL|ANIMAL" not in serial_flags
+
+    monkeypatch.setattr(parallel_parse, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(MonsterParser, "valid_flags", set())
+    parallel = MonsterParser(str(path), snapshot=False, workers=3)
+    assert MonsterParser.valid_flags == serial_flags
+    assert list(parallel.monsters.items()) == list(serial.monsters.items())
+    assert parallel.monsters["Grip, Farmer Maggot's Dog"]["friends"] == [
+        "60:2d2:Grip, Farmer Maggot's Dog", "60:2d2:Fang, Farmer Maggot's Dog"]
+    assert parallel.referrers_of("Fang, Farmer Maggot's Dog") == serial.referrers_of("Fang, Farmer Maggot's Dog")
+
+    parallel.set_field("Lone", "depth", 9)
+    parallel.save_monsters()
+    assert path.read_text(encoding="utf-8").endswith("name:Lone\nflags:EVIL|ANIMAL\ndepth:9\n")
+    assert parallel_parse.parallel_workers(str(path), None) >= 1
+
+
+def test_full_text_search_ranks_highlights_and_follows_edits(monster_file):
+    parser = MonsterParser(str(monster_file), lazy=True)
+    assert parser._text_index is None  # ✅ Nobody searched yet, so nothing was built
+
+    index = parser.text_index
+    assert [hit.name for hit in index.search("maggot")] == [
+        "Farmer Maggot", "Grip, Farmer Maggot's Dog", "Fang, Farmer Maggot's Dog"]
+    hits = index.search('"guarding the" vic*')
+    assert [hit.name for hit in hits] == ["Fang, Farmer Maggot's Dog"]
+    assert hits[0].highlights["desc"] == ("A rather **vicious** dog belonging to Farmer Maggot. It is "
+                                          "**guarding the** fields.")
+    assert index.search('"the fields guarding"') == [] and index.count("dog canine") == 2
+    assert index.search("dogs lost")[0].highlights["desc"] == "He's **lost** his **dogs**."
+
+    parser.set_field("Farmer Maggot", "desc", ["He is looking for a wandering mushroom thief."])
+    parser.rename_monster("Fang, Farmer Maggot's Dog", "Fang")
+    assert [hit.name for hit in index.search("mushroom*")] == ["Farmer Maggot"]
+    assert index.search("dogs lost") == []
+    assert [hit.name for hit in index.search("fang guarding")] == ["Fang"]
+    parser.delete_monster("Fang")
+    assert index.search("guarding") == [] and len(index) == 2
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_saves_edit_records_in_place_and_keep_their_layout(tmp_path, lazy):
+    text = ("# Monster file header\r\n\r\n"
+            "name:Grip, Farmer Maggot's Dog\r\n"
+            "base:canine\r\n"
+            "# a comment inside the record\r\n"
+            "blow:BITE:HURT:1d6\r\n"
+            "speed: 120\r\n"
+            "blow:BITE:HURT:1d8\r\n"
+            "flags:UNIQUE\r\n"
+            "\r\n"
+            "# --- people ---\r\n"
+            "name:Farmer Maggot\r\n"
+            "depth:2\r\n"
+            "friends:60:2d2:Grip, Farmer Maggot's Dog\r\n")
+    path = tmp_path / "monster.txt"
+    path.write_bytes(text.encode("utf-8"))
+
+    parser = MonsterParser(str(path), lazy=lazy)
+    parser.mark_dirty("Grip, Farmer Maggot's Dog")  # ✅ Dirty but unchanged: still written back unchanged
+    parser.save_monsters()
+    assert path.read_bytes() == text.encode("utf-8")
+
+    parser.set_field("Grip, Farmer Maggot's Dog", "speed", 130)
+    parser.set_field("Grip, Farmer Maggot's Dog", "blow", ["BITE:HURT:1d6", "BITE:HURT:1d8", "CLAW:HURT:1d3"])
+    parser.set_field("Grip, Farmer Maggot's Dog", "flags", None)
+    parser.set_field("Grip, Farmer Maggot's Dog", "rarity", 2)
+    parser.rename_monster("Grip, Farmer Maggot's Dog", "Grip")
+    parser.save_monsters()
+    assert path.read_bytes() == (
+        "# Monster file header\r\n\r\n"
+        "name:Grip\r\n"
+        "base:canine\r\n"
+        "# a comment inside the record\r\n"
+        "blow:BITE:HURT:1d6\r\n"
+        "speed: 130\r\n"
+        "blow:BITE:HURT:1d8\r\n"
+        "blow:CLAW:HURT:1d3\r\n"
+        "rarity:2\r\n"
+        "\r\n"
+        "# --- people ---\r\n"
+        "name:Farmer Maggot\r\n"
+        "depth:2\r\n"
+        "friends:60:2d2:Grip\r\n").encode("utf-8")
+    assert list(MonsterParser(str(path)).monsters) == ["Grip", "Farmer Maggot"]
+
+
+def test_game_data_index_resolves_references_lazily(monster_file, game_data_dir, capsys):
+    import os
+
+    import validator
+    from game_data_loader import GameDataLoader
+
+    (game_data_dir / "monster_base.txt").write_text("# bases\nname:canine\nglyph:C\n\nname:person\nglyph:p\n")
+    (game_data_dir / "monster_spell.txt").write_text("name:BLINK\nmsgt:BLINK\nname:SCARE\n")
+    (game_data_dir / "object.txt").write_text("name:& Wooden Torch~\ntype:light\nlevel:1\n"
+                                              "name:Dagger\ntype:sword\nflags:THROWING\n")
+    loader = GameDataLoader(str(game_data_dir))
+    index = loader.index
+
+    assert index.lookup("base", "canine").location == "monster_base.txt:2"
+    assert index.loaded() == ["base"]  # ✅ Only the file that was asked about has been read
+    assert index.lookup("object", "light:Wooden Torch").fields == {"type": "light", "level": "1"}
+    assert index.lookup("object", "sword:Wooden Torch") is None
+    assert [definition is not None for _, _, definition in index.resolve("spells", "BLINK | TPORT")] == [True, False]
+
+    parser = MonsterParser(str(monster_file))
+    parser.set_field("Farmer Maggot", "spells", "SCARE | SHRIEK")
+    parser.set_field("Farmer Maggot", "drop", ["light:Wooden Torch:50:1:1", "sword:Dagger~:20:1:1"])
+    parser.set_field("Grip, Farmer Maggot's Dog", "base", "canine dog")
+    assert index.unresolved(parser.monsters["Farmer Maggot"]) == [("spells", "SCARE | SHRIEK", "spell", "SHRIEK")]
+    assert index.unresolved(parser.monsters["Grip, Farmer Maggot's Dog"]) == [
+        ("base", "canine dog", "base", "canine dog")]
+    parser.save_monsters()
+
+    checks = [issue.check for issue in validator.MonsterValidator(loader).validate(str(monster_file), 1).issues]
+    assert checks.count("unknown-base") == 1 and checks.count("unknown-spell") == 1
+    assert "unknown-drop" not in checks
+
+    loader.list_available_options()
+    output = capsys.readouterr().out
+    assert "Blow methods (4):\nHIT, BITE, CLAW, MOAN" in output and "Monster bases (2):\ncanine, person" in output
+
+    bases = game_data_dir / "monster_base.txt"
+    bases.write_text(bases.read_text() + "name:spider\n")
+    os.utime(bases, ns=(0, 12345))
+    methods = loader.blow_methods
+    assert loader.reload() == ["monster_base.txt"]
+    assert loader.blow_methods is methods and "base" not in index.loaded()
+    assert index.lookup("base", "spider").line == 7
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv", "mfecol"])
+def test_export_import_round_trip_loses_nothing(monster_file, game_data_dir, tmp_path, extension):
+    import mfe
+    import monster_export
+
+    parser = MonsterParser(str(monster_file), lazy=True)
+    parser.set_field("Farmer Maggot", "blow", ["MOAN", "HIT::1d2", "BITE:HURT:1d6", "HIT:"])
+    parser.set_field("Fang, Farmer Maggot's Dog", "blow", "BITE:HURT")
+    parser.set_field("Fang, Farmer Maggot's Dog", "desc", "")  # ✅ An empty value is not an absent field
+    parser.set_field("Grip, Farmer Maggot's Dog", "spell-power", "0130")  # ✅ Not canonical, so it stays text
+    parser.save_monsters()
+    original = MonsterParser(str(monster_file))
+    exported = tmp_path / f"monsters.{extension}"
+    assert mfe.main(["export", str(monster_file), str(exported), "--log-file", str(tmp_path / "changes.log")]) == 0
+    streamed = MonsterParser(str(monster_file), lazy=True)
+    assert monster_export.export_monsters(streamed, str(tmp_path / f"again.{extension}")) == 3
+    assert not any(streamed.monsters.is_loaded(name) for name in streamed.monsters)  # ✅ Parsed, then let go
+
+    target = tmp_path / "imported.txt"
+    target.write_text("")
+    assert mfe.main(["import", str(target), str(exported), "--gamedata", str(game_data_dir),
+                     "--log-file", str(tmp_path / "changes.log")]) == 0
+    imported = MonsterParser(str(target))
+    assert list(imported.monsters) == list(original.monsters)
+    for name, record in original.monsters.items():
+        assert dict(imported.monsters[name]) == dict(record)
+
+    # ✅ Importing the same export again changes nothing; a bad row is reported and skipped
+    importer = mfe.BatchEditor(imported, mfe.MonsterEditor(imported, mfe.GameDataLoader(str(game_data_dir))))
+    assert monster_export.import_monsters(importer, str(exported)).applied == 3 and not imported.monsters.dirty
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text('{"name": "Fang", "speed": "fast"}\n{"name": "Wolf", "blow": "BITE:BURN"}\n'
+                   '{"name": "Cub", "flags": ["UNIQUE"], "depth": 3}\n')
+    report = monster_export.import_monsters(importer, str(bad))
+    assert [message for _, _, message in report.errors] == [
+        "'fast' is not a valid number for speed.", "Invalid blow effect 'BURN'."]
+    assert imported.monsters["Cub"]["depth"] == 3 and "Fang" not in imported.monsters
+
+    if extension == "mfecol":
+        with open(exported, "rb") as file:
+            assert list(monster_export.read_columns(file, {"depth"})) == [{"depth": [2, 5, 2]}]
@@ -0,0 +1,282 @@
+import heapq
+import math
+import re
+from bisect import bisect_left
+
+from instrumentation import profiler
+
+# Free-text fields that are indexed, with the weight a match in each one carries in the ranking
+TEXT_FIELDS = {"name": 3, "base": 2, "plural": 2, "desc": 1}
+PREFIX_EXPANSIONS = 64  # most vocabulary terms one `prefix*` query expands to
+SNIPPET_CONTEXT = 40  # characters kept on each side of the first match in long fields
+HIGHLIGHT = ("**", "**")
+
+# BM25 parameters: term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text):
+    """ Lowercased words of `text`; punctuation and apostrophes separate words ("Maggot's" -> maggot, s). """
+    return _TOKEN.findall(text.lower())
+
+
+class SearchHit:
+    """ One ranked search result: the monster, its score and a highlighted snippet per matching field. """
+
+    __slots__ = ("name", "score", "highlights")
+
+    def __init__(self, name, score, highlights):
+        self.name = name
+        self.score = score
+        self.highlights = highlights
+
+    def __repr__(self):
+        return f"SearchHit({self.name!r}, {self.score:.3f})"
+
+
+class TextIndex:
+    """ Inverted index over monster names, descriptions and other free-text fields.
+
+    Queries are space-separated clauses that must all match: plain terms (`vicious`),
+    prefixes (`drag*`) and quoted phrases (`"farmer maggot"`). Results are ranked with BM25,
+    weighting matches by field (TEXT_FIELDS), and carry highlighted snippets.
+
+    Postings hold per-monster term frequencies only. Phrases are checked by re-reading the
+    candidate records, best-scoring first, until enough hits are found. The index is built
+    on first use and kept current through the parser's change notifications.
+    """
+
+    def __init__(self, monster_parser, fields=None):
+        self.monster_parser = monster_parser
+        self.fields = dict(fields or TEXT_FIELDS)
+        self._names = []  # doc id -> monster name (None once removed)
+        self._ids = {}  # monster name -> doc id
+        self._lengths = []  # doc id -> weighted token count
+        self._terms = []  # doc id -> distinct terms, for removal
+        self._postings = {}  # term -> {doc id: weighted term frequency}
+        self._total_length = 0
+        self._vocabulary = None  # sorted terms for prefix queries, rebuilt on demand
+        with profiler.span("text index build"):
+            for name in monster_parser.monsters:
+                self._add(name)
+        monster_parser.add_listener(self._on_change)
+
+    # ----- maintenance -----
+
+    def field_texts(self, name):
+        """ (field, text) pairs of a monster's indexed fields; repeated lines (desc) are joined with spaces. """
+        record = self.monster_parser.monsters[name]
+        for field in self.fields:
+            value = name if field == "name" else record.get(field)
+            if value is None:
+                continue
+            yield field, value if isinstance(value, str) else " ".join(str(line) for line in value)
+
+    def _add(self, name, doc_id=None):
+        frequencies = {}
+        length = 0
+        for field, text in self.field_texts(name):
+            weight = self.fields[field]
+            for token in tokenize(text):
+                frequencies[token] = frequencies.get(token, 0) + weight
+                length += weight
+        if doc_id is None:
+            doc_id = len(self._names)
+            self._names.append(name)
+            self._lengths.append(length)
+            self._terms.append(tuple(frequencies))
+        else:
+            self._names[doc_id] = name
+            self._lengths[doc_id] = length
+            self._terms[doc_id] = tuple(frequencies)
+        self._ids[name] = doc_id
+        self._total_length += length
+        postings = self._postings
+        for term, frequency in frequencies.items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = {}
+                self._vocabulary = None
+            posting[doc_id] = frequency
+
+    def _remove(self, name):
+        """ Unindexes a monster and returns its doc id (free for reuse), or None if it was not indexed. """
+        doc_id = self._ids.pop(name, None)
+        if doc_id is None:
+            return None
+        for term in self._terms[doc_id]:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+                self._vocabulary = None
+        self._total_length -= self._lengths[doc_id]
+        self._names[doc_id] = None
+        self._lengths[doc_id] = 0
+        self._terms[doc_id] = ()
+        return doc_id
+
+    def _on_change(self, event, name, new_name=None):
+        if event == "changed_many":
+            if not self.fields.keys() & new_name:
+                return
+            for each in name:
+                self._on_change("changed", each)
+            return
+        doc_id = self._remove(name)
+        if event in ("changed", "added"):
+            self._add(name, doc_id)
+        elif event == "renamed":
+            self._add(new_name, doc_id)  # ✅ The name is indexed text too
+
+    # ----- queries -----
+
+    @staticmethod
+    def parse_query(query):
+        """ Splits a query into ("term" | "prefix" | "phrase", tokens) clauses. """
+        clauses = []
+        for phrase, word in _QUERY.findall(query):
+            if phrase:
+                tokens = tokenize(phrase)
+            elif word.endswith("*") and tokenize(word):
+                tokens = tokenize(word)
+                if len(tokens) == 1:
+                    clauses.append(("prefix", tokens))
+                    continue
+                clauses.append(("phrase", tokens[:-1]))
+                clauses.append(("prefix", tokens[-1:]))
+                continue
+            else:
+                tokens = tokenize(word)
+            if len(tokens) == 1:
+                clauses.append(("term", tokens))
+            elif tokens:
+                clauses.append(("phrase", tokens))  # ✅ `maggot's` is the phrase "maggot s"
+        return clauses
+
+    def expand_prefix(self, prefix):
+        """ Vocabulary terms starting with `prefix` (at most PREFIX_EXPANSIONS of them). """
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        terms = []
+        for position in range(bisect_left(vocabulary, prefix), len(vocabulary)):
+            term = vocabulary[position]
+            if not term.startswith(prefix) or len(terms) == PREFIX_EXPANSIONS:
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query, limit=10):
+        """ Monsters matching every clause of `query`, best first, as SearchHits. """
+        clauses = self.parse_query(query)
+        if not clauses:
+            return []
+        with profiler.span("text search"):
+            return self._search(clauses, limit)
+
+    def count(self, query):
+        """ Number of monsters containing every term of `query` (phrases are counted by their words). """
+        clauses = self.parse_query(query)
+        candidates = self._candidates(self._scored_postings(clauses)) if clauses else set()
+        return len(candidates)
+
+    def _scored_postings(self, clauses):
+        """ One {doc id: frequency} mapping per required word; a prefix merges its expansions. """
+        required = []
+        for kind, tokens in clauses:
+            if kind == "prefix":
+                merged = {}
+                for term in self.expand_prefix(tokens[0]):
+                    for doc_id, frequency in self._postings[term].items():
+                        merged[doc_id] = merged.get(doc_id, 0) + frequency
+                required.append(merged)
+            else:
+                required.extend(self._postings.get(token, {}) for token in tokens)
+        return required
+
+    @staticmethod
+    def _candidates(required):
+        required = sorted(required, key=len)
+        if not required or not required[0]:
+            return set()
+        candidates = set(required[0])
+        for posting in required[1:]:
+            candidates.intersection_update(posting.keys())
+            if not candidates:
+                break
+        return candidates
+
+    def _search(self, clauses, limit):
+        required = self._scored_postings(clauses)
+        candidates = self._candidates(required)
+        if not candidates:
+            return []
+
+        documents = len(self._ids)
+        average = self._total_length / documents if documents else 0
+        lengths = self._lengths
+        weights = [(posting, math.log(1 + (documents - len(posting) + 0.5) / (len(posting) + 0.5)))
+                   for posting in required]
+        scored = []
+        for doc_id in candidates:
+            norm = K1 * (1 - B + B * lengths[doc_id] / average) if average else K1
+            score = 0.0
+            for posting, idf in weights:
+                frequency = posting[doc_id]
+                score += idf * frequency * (K1 + 1) / (frequency + norm)
+            scored.append((-score, doc_id))
+
+        phrases = [tokens for kind, tokens in clauses if kind == "phrase"]
+        heapq.heapify(scored)
+        hits = []
+        while scored and len(hits) < limit:
+            score, doc_id = heapq.heappop(scored)
+            name = self._names[doc_id]
+            texts = dict(self.field_texts(name))
+            if phrases and not all(self._has_phrase(texts.values(), phrase) for phrase in phrases):
+                continue
+            hits.append(SearchHit(name, -score, self.highlight(texts, clauses)))
+        return hits
+
+    @staticmethod
+    def _has_phrase(texts, phrase):
+        size = len(phrase)
+        for text in texts:
+            tokens = tokenize(text)
+            for start in range(len(tokens) - size + 1):
+                if tokens[start:start + size] == phrase:
+                    return True
+        return False
+
+    @staticmethod
+    def highlight(texts, clauses):
+        """ {field: text with matched words wrapped in HIGHLIGHT} for the fields that match; long text is cut to a snippet. """
+        words = []
+        for kind, tokens in clauses:
+            if kind == "phrase":
+                words.append(r"[^a-z0-9]+".join(re.escape(token) for token in tokens))
+            else:
+                words.extend(re.escape(token) + (r"[a-z0-9]*" if kind == "prefix" else "") for token in tokens)
+        pattern = re.compile(r"(?<![a-z0-9])(?:" + "|".join(words) + r")(?![a-z0-9])", re.I)
+        opening, closing = HIGHLIGHT
+        highlights = {}
+        for field, text in texts.items():
+            match = pattern.search(text)
+            if match is None:
+                continue
+            prefix = suffix = ""
+            if len(text) > 2 * SNIPPET_CONTEXT + len(match.group()):
+                start = max(0, match.start() - SNIPPET_CONTEXT)
+                end = min(len(text), match.end() + SNIPPET_CONTEXT)
+                prefix, suffix = ("…" if start else ""), ("…" if end < len(text) else "")
+                text = text[start:end]
+            highlights[field] = prefix + pattern.sub(lambda m: f"{opening}{m.group()}{closing}", text) + suffix
+        return highlights
+
+    def __len__(self):
+        return len(self._ids)
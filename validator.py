@@ -0,0 +1,215 @@
+import csv
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import MAX_BLOWS, NUMERIC_FIELDS
+from friends_index import FriendsIndex
+from game_data_index import DEFINITION_FILES, references
+from instrumentation import get_logger, profiler
+from monster_record import split_flags
+from parallel_parse import chunk_ranges, parallel_workers
+
+log = get_logger("validator")
+
+REPORT_FIELDS = ("line", "monster", "check", "message")
+
+_rules = None  # ✅ Set once per worker process by _init_worker
+
+
+class Issue:
+    """ One problem found in monster.txt, with the 1-based line it was found on. """
+
+    __slots__ = REPORT_FIELDS
+
+    def __init__(self, line, monster, check, message):
+        self.line = line
+        self.monster = monster
+        self.check = check
+        self.message = message
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in REPORT_FIELDS}
+
+    def __repr__(self):
+        return f"Issue({self.line}, {self.monster!r}, {self.check!r}, {self.message!r})"
+
+
+class ValidationReport:
+    """ Every issue found in a file, sorted by line, plus timing. """
+
+    def __init__(self, filepath, issues, monster_count, elapsed, workers):
+        self.filepath = filepath
+        self.issues = issues
+        self.monster_count = monster_count
+        self.elapsed = elapsed
+        self.workers = workers
+
+    def counts(self):
+        """ Number of issues per check. """
+        counts = {}
+        for issue in self.issues:
+            counts[issue.check] = counts.get(issue.check, 0) + 1
+        return counts
+
+    def summary(self):
+        status = "✅ No problems found" if not self.issues else f"❌ {len(self.issues)} problems found"
+        return (f"{status} in {self.monster_count} monsters ({self.filepath}) "
+                f"in {self.elapsed:.3f}s using {self.workers} worker(s)")
+
+    def write(self, path, report_format=None):
+        """ Writes the report as JSON or CSV (chosen from the file extension unless given). """
+        report_format = report_format or ("csv" if path.lower().endswith(".csv") else "json")
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            if report_format == "csv":
+                writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(issue.as_dict() for issue in self.issues)
+            else:
+                json.dump({"file": self.filepath, "monsters": self.monster_count, "counts": self.counts(),
+                           "issues": [issue.as_dict() for issue in self.issues]}, file, indent=2)
+
+
+class MonsterValidator:
+    """ Checks a whole monster.txt against the game data before it ships.
+
+    Each record is checked for flags defined neither in the game data (FLAG_FILES) nor in
+    `allowed_flags`, blow methods and effects missing from
+    blow_methods.txt / blow_effects.txt, more than MAX_BLOWS blows and numeric fields that
+    are not whole numbers (the same rules as the interactive editor), and `base:`, `spells:`
+    and `drop:` entries naming nothing in monster_base.txt, monster_spell.txt or object.txt. Across records it
+    reports duplicate names and `friends` entries naming a monster that does not exist.
+
+    Large files are split at record boundaries and the chunks are checked in a process pool;
+    each worker reads its own byte range, so only the findings travel between processes.
+    """
+
+    def __init__(self, game_data_loader, allowed_flags=()):
+        # ✅ Monster bases, spells and drops are checked against their files only where those exist
+        definitions = {kind: frozenset(game_data_loader.index.names(kind)) for kind in ("base", "spell", "object")}
+        # ✅ Never taken from the file under check, or every flag it uses would count as known
+        self.rules = (frozenset(game_data_loader.valid_flags) | frozenset(allowed_flags),
+                      frozenset(game_data_loader.blow_methods),
+                      frozenset(game_data_loader.blow_effects),
+                      {kind: names for kind, names in definitions.items() if names})
+        for vocabulary, filename in zip(self.rules[1:], ("blow_methods.txt", "blow_effects.txt")):
+            if not vocabulary:
+                log.warning(f"⚠️ Warning: {filename} is empty or missing; that check is skipped.")
+
+    def validate(self, filepath, workers=None):
+        """ Validates `filepath` and returns a ValidationReport. `workers=1` forces a serial run. """
+        with profiler.span("validation"):
+            report = self._validate(filepath, workers)
+        profiler.count("records validated", report.monster_count)
+        profiler.count("validation issues", len(report.issues))
+        return report
+
+    def _validate(self, filepath, workers):
+        start = time.perf_counter()
+        workers = parallel_workers(filepath, workers)  # ✅ Same size threshold as parallel parsing
+        chunks = self.chunks(filepath, workers)
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.rules,)) as pool:
+                results = list(pool.map(_check_chunk, [(filepath,) + chunk for chunk in chunks]))
+        else:
+            workers = 1
+            _init_worker(self.rules)
+            results = [_check_chunk((filepath,) + chunk) for chunk in chunks]
+
+        issues, names, friends = [], [], []
+        for chunk_issues, chunk_names, chunk_friends in results:
+            issues.extend(chunk_issues)
+            names.extend(chunk_names)
+            friends.extend(chunk_friends)
+        issues.extend(self.cross_record_issues(names, friends))
+        issues.sort(key=lambda issue: issue.line)
+        return ValidationReport(filepath, issues, len(names), time.perf_counter() - start, workers)
+
+    @staticmethod
+    def chunks(filepath, workers):
+        """ Splits a file into (start, end, first line) ranges for `workers` processes, each at a `name:` line. """
+        size = os.path.getsize(filepath)
+        if size == 0:
+            return []
+        with open(filepath, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ranges, line = [], 1
+            for start, end in chunk_ranges(data, workers):
+                ranges.append((start, end, line))
+                line += data[start:end].count(b"\n")
+        return ranges
+
+    @staticmethod
+    def cross_record_issues(names, friends):
+        """ Duplicate names and dangling friends, from (name, line) and (monster, line, entry) lists. """
+        issues, first_seen = [], {}
+        for name, line in names:
+            if name in first_seen:
+                issues.append(Issue(line, name, "duplicate-name",
+                                    f"'{name}' is already defined on line {first_seen[name]}."))
+            else:
+                first_seen[name] = line
+        for monster, line, entry in friends:
+            target = FriendsIndex.target_of(entry)
+            if target not in first_seen:
+                issues.append(Issue(line, monster, "dangling-friend",
+                                    f"friends entry '{entry}' names unknown monster '{target}'."))
+        return issues
+
+
+def _init_worker(rules):
+    global _rules
+    _rules = rules
+
+
+def _check_chunk(task):
+    """ Checks the records in one byte range; returns (issues, (name, line) pairs, friends entries). """
+    filepath, start, end, line_number = task
+    valid_flags, blow_methods, blow_effects, definitions = _rules
+    with open(filepath, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+
+    issues, names, friends = [], [], []
+    monster, blows = None, 0
+    for line_number, line in enumerate(text.split("\n"), line_number):
+        line = line.strip()
+        if not line or line.startswith("#") or ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        key, value = key.strip(), value.strip()
+
+        if key == "name":
+            monster, blows = value, 0
+            names.append((monster, line_number))
+        elif monster is None:
+            continue
+        elif key == "flags":
+            for flag in split_flags(value):
+                if flag not in valid_flags:
+                    issues.append(Issue(line_number, monster, "unknown-flag", f"'{flag}' is not a recognized flag."))
+        elif key == "blow":
+            blows += 1
+            if blows == MAX_BLOWS + 1:
+                issues.append(Issue(line_number, monster, "too-many-blows", f"More than {MAX_BLOWS} blows."))
+            parts = value.split(":")
+            if blow_methods and parts[0] not in blow_methods:
+                issues.append(Issue(line_number, monster, "invalid-blow-method",
+                                    f"Invalid blow method '{parts[0]}'."))
+            if blow_effects and len(parts) > 1 and parts[1] and parts[1] not in blow_effects:
+                issues.append(Issue(line_number, monster, "invalid-blow-effect",
+                                    f"Invalid blow effect '{parts[1]}'."))
+        elif key in NUMERIC_FIELDS:
+            if not value.isdigit():
+                issues.append(Issue(line_number, monster, "not-an-integer",
+                                    f"'{value}' is not a valid number for {key}."))
+        elif key == "friends":
+            friends.append((monster, line_number, value))
+        elif key in ("base", "spells", "drop"):
+            for kind, name in references(key, value):
+                if kind in definitions and name not in definitions[kind]:
+                    issues.append(Issue(line_number, monster, f"unknown-{key.rstrip('s')}",
+                                        f"'{name}' is not defined in {DEFINITION_FILES[kind]}."))
+    return issues, names, friends